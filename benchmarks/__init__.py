@@ -0,0 +1,90 @@
+"""
+Micro-benchmarks for django_base_model.  They run against an in-memory SQLite
+database and can be invoked from the root of the repository, e.g.:
+
+python -m benchmarks.descriptor
+"""
+
+import json
+import os
+import sys
+import traceback
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def setup():
+    """
+    Configures Django with the benchmark settings and creates the database
+    tables for the benchmark models.
+    """
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+
+    from django.core.management import call_command
+
+    call_command('syncdb', interactive=False, verbosity=0)
+
+
+def get_peak_memory():
+    """
+    Returns the peak resident set size of this process in bytes, or None
+    where it can't be measured (i.e., without the resource module).
+    """
+
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # ru_maxrss is in bytes on Mac OS X and in kilobytes elsewhere.
+    if sys.platform != 'darwin':
+        peak *= 1024
+
+    return peak
+
+
+def run_in_child(func, *args):
+    """
+    Runs func with the given arguments in a child process and returns its
+    result, which must be serializable as JSON.  The child starts out with a
+    copy of this process's memory (including an in-memory database), so the
+    growth of its peak memory measures func alone, and whatever func changes
+    is discarded with it.  Without os.fork, func is run in this process.
+    """
+
+    if not hasattr(os, 'fork'):
+        return func(*args)
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+
+    if not pid:
+        os.close(read_fd)
+
+        try:
+            output = json.dumps({'result': func(*args)})
+        except BaseException:
+            output = json.dumps({'error': traceback.format_exc()})
+
+        with os.fdopen(write_fd, 'w') as pipe:
+            pipe.write(output)
+
+        os._exit(0)
+
+    os.close(write_fd)
+
+    with os.fdopen(read_fd) as pipe:
+        output = json.loads(pipe.read())
+
+    os.waitpid(pid, 0)
+
+    if 'error' in output:
+        raise RuntimeError(
+            'The benchmark failed in the child process:\n' + output['error']
+        )
+
+    return output['result']
@@ -0,0 +1,23 @@
+from django.db import models
+
+from django_base_model.models import BaseModel
+
+
+class Plan(BaseModel):
+    """
+    A synthetic model inheriting from BaseModel used by the benchmarks.
+    """
+
+    title = models.CharField(max_length=255)
+
+
+class CompactPlan(BaseModel):
+    """
+    A synthetic model like Plan whose attributes are kept in a
+    CompactAttributes container.
+    """
+
+    title = models.CharField(max_length=255)
+
+    class AttributeMeta:
+        compact = True
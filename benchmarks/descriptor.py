@@ -0,0 +1,66 @@
+"""
+Compares the cost of accessing obj.attributes when the related manager class
+and ContentType are built on every access (the previous behavior) against the
+memoized BaseReverseGenericRelatedObjectsDescriptor.
+"""
+
+import timeit
+
+from benchmarks import setup
+
+
+def uncached_access(descriptor, instance):
+    """
+    Reproduces the work BaseReverseGenericRelatedObjectsDescriptor.__get__
+    used to do on every access.
+    """
+
+    from django.contrib.contenttypes.models import ContentType
+    from django.db import connection
+
+    from django_base_model.generic import create_generic_related_manager
+
+    rel_model = descriptor.field.rel.to
+    RelatedManager = create_generic_related_manager(
+        rel_model._default_manager.__class__
+    )
+    qn = connection.ops.quote_name
+
+    return RelatedManager(
+        model=rel_model,
+        instance=instance,
+        symmetrical=(
+            descriptor.field.rel.symmetrical and instance.__class__ == rel_model
+        ),
+        source_col_name=qn(descriptor.field.m2m_column_name()),
+        target_col_name=qn(descriptor.field.m2m_reverse_name()),
+        content_type=ContentType.objects.db_manager(
+            instance._state.db
+        ).get_for_model(instance),
+        content_type_field_name=descriptor.field.content_type_field_name,
+        object_id_field_name=descriptor.field.object_id_field_name,
+        prefetch_cache_name=descriptor.field.attname,
+    )
+
+
+def main(number=10000):
+    setup()
+
+    from benchmarks.bench_app.models import Plan
+
+    plan = Plan.objects.create(title='Benchmark')
+    descriptor = Plan.__dict__['attributes']
+
+    before = timeit.timeit(
+        lambda: uncached_access(descriptor, plan),
+        number=number
+    )
+    after = timeit.timeit(lambda: plan.attributes, number=number)
+
+    print('obj.attributes access (%d iterations)' % number)
+    print('  uncached: %8.2f us/access' % (before / number * 1e6))
+    print('  cached:   %8.2f us/access' % (after / number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
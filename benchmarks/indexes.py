@@ -0,0 +1,92 @@
+"""
+Compares the query plans and timings of the queries issued for the attributes
+of a set of objects with the former ModelAttribute index layout (a unique index
+led by name, plus the content_type foreign key index) against the layout led by
+content_type and object_id, optionally with the covering index.
+
+Each layout gets its own copy of the ModelAttribute table in the in-memory
+SQLite database, populated with the same rows.
+"""
+
+import random
+import timeit
+
+from benchmarks import setup
+
+LAYOUTS = (
+    ('former', [
+        'CREATE UNIQUE INDEX %(table)s_unique ON %(table)s (name, content_type_id, object_id)',
+        'CREATE INDEX %(table)s_content_type ON %(table)s (content_type_id)',
+    ]),
+    ('content_object', [
+        'CREATE UNIQUE INDEX %(table)s_unique ON %(table)s (content_type_id, object_id, name)',
+    ]),
+    ('covering', [
+        'CREATE UNIQUE INDEX %(table)s_unique ON %(table)s (content_type_id, object_id, name)',
+        'CREATE INDEX %(table)s_covering ON %(table)s (content_type_id, object_id, name, value)',
+    ]),
+)
+
+QUERY = (
+    'SELECT object_id, name, value FROM %(table)s '
+    'WHERE content_type_id = %%s AND object_id IN (%(object_ids)s)'
+)
+
+
+def populate(cursor, table, rows, statements):
+    cursor.execute(
+        'CREATE TABLE %s (id integer PRIMARY KEY, name varchar(255), '
+        'value text, content_type_id integer, object_id integer)' % table
+    )
+
+    for statement in statements:
+        cursor.execute(statement % {'table': table})
+
+    cursor.executemany(
+        'INSERT INTO %s (name, value, content_type_id, object_id) '
+        'VALUES (%%s, %%s, %%s, %%s)' % table,
+        rows
+    )
+    cursor.execute('ANALYZE')
+
+
+def main(content_types=20, objects=2000, attributes=10, page=50, number=200):
+    setup()
+
+    from django.db import connection
+
+    rows = [
+        ('attribute_%d' % a, 'value %d' % o, c, o)
+        for c in range(content_types)
+        for o in range(objects)
+        for a in range(attributes)
+    ]
+    object_ids = random.sample(range(objects), page)
+    cursor = connection.cursor()
+
+    print('%d ModelAttribute rows, %d objects per query' % (len(rows), page))
+
+    for name, statements in LAYOUTS:
+        table = 'attributes_%s' % name
+        populate(cursor, table, rows, statements)
+
+        query = QUERY % {
+            'table': table,
+            'object_ids': ', '.join(['%s'] * page),
+        }
+        params = [content_types // 2] + object_ids
+
+        cursor.execute('EXPLAIN QUERY PLAN ' + query, params)
+        plan = '; '.join(str(row[-1]) for row in cursor.fetchall())
+        elapsed = timeit.timeit(
+            lambda: cursor.execute(query, params).fetchall(),
+            number=number
+        )
+
+        print('%s layout' % name)
+        print('  plan:  %s' % plan)
+        print('  time:  %8.2f us/query' % (elapsed / number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+Compares the memory held by objects whose attributes are set up as a property
+per attribute (Plan) against objects whose attributes are kept in a compact
+container (CompactPlan), along with the cost of reading an attribute:
+
+python -m benchmarks.memory --objects 5000 --attributes 20
+
+The objects of each model are loaded in a child process, and the memory they
+take is the growth of the child's peak resident set size while loading them.
+The estimated overhead per object (the object's dictionary and the containers
+and names of its attributes, but not the values themselves) is reported as
+well.
+"""
+
+import gc
+import sys
+import timeit
+from optparse import OptionParser
+
+from benchmarks import get_peak_memory, run_in_child, setup
+
+
+def populate(model, objects, attributes):
+    for index in range(objects):
+        obj = model.objects.create(title='Plan %d' % index)
+        obj.create_attributes(
+            attributes=dict(
+                ('attribute_%d' % a, index + a) for a in range(attributes)
+            ),
+            bulk=True
+        )
+
+
+def load(model):
+    return list(model.objects.all_with_attributes())
+
+
+def estimate_overhead(obj):
+    """
+    Returns the estimated size in bytes of the containers of the attributes
+    of the given object and of the object's own dictionary, excluding the
+    attribute values.
+    """
+
+    from django_base_model.compact import CompactAttributes
+
+    cache = obj.__dict__['_attribute_cache']
+    size = sys.getsizeof(obj.__dict__) + sys.getsizeof(cache)
+
+    if isinstance(cache, CompactAttributes):
+        # The names are shared by every object of the model.
+        return size + sys.getsizeof(cache._values)
+
+    return size + sum(sys.getsizeof(name) for name in cache)
+
+
+def measure(model):
+    """
+    Loads every object of the given model with its attributes in a child
+    process and returns the growth of its peak memory in bytes (None if it
+    can't be measured), the average estimated overhead per object and the
+    time in seconds to read one attribute of every object.
+    """
+
+    return run_in_child(measure_in_process, model)
+
+
+def measure_in_process(model):
+    gc.collect()
+    start_peak = get_peak_memory()
+    objs = load(model)
+    gc.collect()
+    peak = None
+
+    if start_peak is not None:
+        peak = get_peak_memory() - start_peak
+
+    overhead = sum(estimate_overhead(obj) for obj in objs) / float(len(objs))
+    duration = timeit.timeit(
+        lambda: [obj.attribute_0 for obj in objs],
+        number=1
+    )
+
+    return peak, overhead, duration
+
+
+def format_memory(size):
+    if size is None:
+        return '-'
+
+    return '%.1f KiB' % (size / 1024.0)
+
+
+def main(argv=None):
+    parser = OptionParser(usage='%prog [options]')
+    parser.add_option('--objects', type='int', default=2000,
+        help='The number of objects of each model to load.')
+    parser.add_option('--attributes', type='int', default=20,
+        help='The number of attributes per object.')
+    options, args = parser.parse_args(argv)
+
+    setup()
+
+    from benchmarks.bench_app.models import CompactPlan, Plan
+
+    print('%d objects, %d attributes per object (Python %s)' % (
+        options.objects,
+        options.attributes,
+        sys.version.split()[0]
+    ))
+    print('%-12s %14s %18s %14s' % (
+        'storage', 'memory', 'overhead/object', 'read all'
+    ))
+
+    for label, model in (('setattr', Plan), ('compact', CompactPlan)):
+        populate(model, options.objects, options.attributes)
+        peak, overhead, duration = measure(model)
+
+        print('%-12s %14s %12d bytes %11.2f ms' % (
+            label,
+            format_memory(peak),
+            overhead,
+            duration * 1000
+        ))
+
+
+if __name__ == '__main__':
+    main()
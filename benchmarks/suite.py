@@ -0,0 +1,340 @@
+"""
+Measures the attribute hot paths of BaseModel (creating, setting, updating and
+retrieving attributes, the *_with_attributes QuerySets and the attributes
+descriptor) with a given number of objects and attributes per object,
+reporting the number of queries, wall time and peak memory of each operation.
+
+The results of a run can be saved as JSON and compared against a later run:
+
+python -m benchmarks.suite --objects 200 --attributes 10 --output before.json
+python -m benchmarks.suite --objects 200 --attributes 10 --output after.json
+python -m benchmarks.suite --compare before.json after.json
+
+Each operation is run in a child process, where its peak memory is the growth
+of the child's peak resident set size while the operation runs.
+"""
+
+import gc
+import json
+import sys
+import time
+from optparse import OptionParser
+
+from benchmarks import get_peak_memory, run_in_child, setup
+
+
+def make_attributes(index, attributes, offset=0):
+    return dict(
+        ('attribute_%d' % a, index + a + offset) for a in range(attributes)
+    )
+
+
+def populate(objects, attributes):
+    """
+    Replaces the benchmark objects with the given number of objects, each with
+    the given number of attributes, and returns their primary keys.
+    """
+
+    from django_base_model.models import ModelAttribute
+
+    from benchmarks.bench_app.models import Plan
+
+    ModelAttribute.objects.all().delete()
+    Plan.objects.all().delete()
+
+    pks = []
+
+    for index in range(objects):
+        plan = Plan.objects.create(title='Plan %d' % index)
+        plan.create_attributes(
+            attributes=make_attributes(index, attributes),
+            bulk=True
+        )
+        pks.append(plan.pk)
+
+    return pks
+
+
+def create(objects, attributes):
+    from benchmarks.bench_app.models import Plan
+
+    for index in range(objects):
+        Plan.objects.create(
+            title='Plan %d' % index,
+            attributes=make_attributes(index, attributes),
+            bulk_attributes=False
+        )
+
+
+def create_bulk(objects, attributes):
+    from benchmarks.bench_app.models import Plan
+
+    for index in range(objects):
+        plan = Plan.objects.create(title='Plan %d' % index)
+        plan.create_attributes(
+            attributes=make_attributes(index, attributes),
+            bulk=True
+        )
+
+
+def get(pks, attributes):
+    from benchmarks.bench_app.models import Plan
+
+    for pk in pks:
+        Plan.objects.get(pk=pk)
+
+
+def set_attributes(plans, attributes):
+    for plan in plans:
+        plan.set_attributes()
+
+
+def update_attributes(plans, attributes):
+    for index, plan in enumerate(plans):
+        plan.update_attributes(
+            attributes=make_attributes(index, attributes, offset=1)
+        )
+
+
+def bulk_set_attributes(plans, attributes):
+    from benchmarks.bench_app.models import Plan
+
+    Plan.objects.bulk_set_attributes(dict(
+        (plan.pk, make_attributes(index, attributes, offset=1))
+        for index, plan in enumerate(plans)
+    ))
+
+
+def all_with_attributes(pks, attributes):
+    from benchmarks.bench_app.models import Plan
+
+    list(Plan.objects.all_with_attributes())
+
+
+def filter_with_attributes(pks, attributes):
+    from benchmarks.bench_app.models import Plan
+
+    list(Plan.objects.filter_with_attributes(pk__in=pks[::2]))
+
+
+def descriptor(plans, attributes):
+    for plan in plans:
+        plan.attributes.all()
+
+
+def no_objects(objects, attributes):
+    populate(0, 0)
+    return objects
+
+
+def primary_keys(objects, attributes):
+    return populate(objects, attributes)
+
+
+def fresh_objects(objects, attributes):
+    from benchmarks.bench_app.models import Plan
+
+    pks = populate(objects, attributes)
+    return list(Plan.objects.filter(pk__in=pks))
+
+
+# Each operation is run with the result of its setup function, which is
+# called before every repetition and isn't measured.
+OPERATIONS = (
+    ('create', no_objects, create),
+    ('create_bulk', no_objects, create_bulk),
+    ('get', primary_keys, get),
+    ('set_attributes', fresh_objects, set_attributes),
+    ('update_attributes', fresh_objects, update_attributes),
+    ('bulk_set_attributes', fresh_objects, bulk_set_attributes),
+    ('all_with_attributes', primary_keys, all_with_attributes),
+    ('filter_with_attributes', primary_keys, filter_with_attributes),
+    ('descriptor', fresh_objects, descriptor),
+)
+
+
+def measure(func, argument, attributes):
+    """
+    Runs func once in a child process and returns its number of queries,
+    wall time in seconds and peak memory growth in bytes (None if it can't be
+    measured).
+    """
+
+    return run_in_child(measure_in_process, func, argument, attributes)
+
+
+def measure_in_process(func, argument, attributes):
+    from django.db import connection
+
+    use_debug_cursor = connection.use_debug_cursor
+    connection.use_debug_cursor = True
+    count = len(connection.queries)
+    gc.collect()
+    start_peak = get_peak_memory()
+
+    try:
+        start = time.time()
+        func(argument, attributes)
+        duration = time.time() - start
+        queries = len(connection.queries) - count
+        peak = None
+
+        if start_peak is not None:
+            peak = get_peak_memory() - start_peak
+    finally:
+        connection.use_debug_cursor = use_debug_cursor
+        del connection.queries[count:]
+
+    return queries, duration, peak
+
+
+def run(objects, attributes, repeat, names=None):
+    """
+    Runs the operations (only the named ones if names are given) and returns
+    their results, keeping the fastest of the repetitions of each.
+    """
+
+    results = {}
+
+    for name, prepare, func in OPERATIONS:
+        if names and name not in names:
+            continue
+
+        best = None
+
+        for repetition in range(repeat):
+            measured = measure(func, prepare(objects, attributes), attributes)
+
+            if best is None or measured[1] < best[1]:
+                best = measured
+
+        results[name] = {
+            'queries': best[0],
+            'time': best[1],
+            'peak_memory': best[2],
+        }
+
+    return {
+        'objects': objects,
+        'attributes': attributes,
+        'repeat': repeat,
+        'python': sys.version.split()[0],
+        'results': results,
+    }
+
+
+def format_memory(peak):
+    if peak is None:
+        return '-'
+
+    return '%.1f KiB' % (peak / 1024.0)
+
+
+def report(run_results):
+    print('%(objects)d objects, %(attributes)d attributes per object, '
+          'best of %(repeat)d (Python %(python)s)' % run_results)
+    print('%-24s %8s %12s %12s' % ('operation', 'queries', 'time', 'peak memory'))
+
+    for name, prepare, func in OPERATIONS:
+        result = run_results['results'].get(name)
+
+        if result is not None:
+            print('%-24s %8d %9.2f ms %12s' % (
+                name,
+                result['queries'],
+                result['time'] * 1000,
+                format_memory(result['peak_memory'])
+            ))
+
+
+def format_change(before, after, format_value):
+    if before is None or after is None:
+        return '-'
+
+    if before:
+        return '%s -> %s (%+.0f%%)' % (
+            format_value(before),
+            format_value(after),
+            (after - before) * 100.0 / before
+        )
+
+    return '%s -> %s' % (format_value(before), format_value(after))
+
+
+def compare(before, after):
+    """
+    Prints the change in queries, time and peak memory of every operation
+    present in both of the given runs.
+    """
+
+    for key in ('objects', 'attributes'):
+        if before[key] != after[key]:
+            print('Warning: the runs used a different number of %s '
+                  '(%s and %s)' % (key, before[key], after[key]))
+
+    print('%-24s %-22s %-28s %s' % ('operation', 'queries', 'time', 'peak memory'))
+
+    for name, prepare, func in OPERATIONS:
+        old = before['results'].get(name)
+        new = after['results'].get(name)
+
+        if old is None or new is None:
+            continue
+
+        print('%-24s %-22s %-28s %s' % (
+            name,
+            format_change(old['queries'], new['queries'], str),
+            format_change(
+                old['time'],
+                new['time'],
+                lambda value: '%.2f ms' % (value * 1000)
+            ),
+            format_change(old['peak_memory'], new['peak_memory'], format_memory)
+        ))
+
+
+def main(argv=None):
+    parser = OptionParser(
+        usage='%prog [options] [operation ...]\n'
+              '       %prog --compare BEFORE.json AFTER.json'
+    )
+    parser.add_option('--objects', type='int', default=100,
+        help='The number of objects to run each operation with.')
+    parser.add_option('--attributes', type='int', default=10,
+        help='The number of attributes per object.')
+    parser.add_option('--repeat', type='int', default=3,
+        help='The number of times to run each operation, the fastest of '
+             'which is reported.')
+    parser.add_option('--output', dest='output',
+        help='A file to write the results to as JSON.')
+    parser.add_option('--compare', action='store_true', default=False,
+        help='Compare the results saved in two JSON files instead of '
+             'running the operations.')
+    options, args = parser.parse_args(argv)
+
+    if options.compare:
+        if len(args) != 2:
+            parser.error('--compare requires two result files')
+
+        with open(args[0]) as before, open(args[1]) as after:
+            compare(json.load(before), json.load(after))
+
+        return
+
+    unknown = set(args) - set(name for name, prepare, func in OPERATIONS)
+
+    if unknown:
+        parser.error('unknown operations: %s' % ', '.join(sorted(unknown)))
+
+    setup()
+
+    run_results = run(options.objects, options.attributes, options.repeat, args)
+    report(run_results)
+
+    if options.output:
+        with open(options.output, 'w') as output:
+            json.dump(run_results, output, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
 from django.contrib.contenttypes import generic
 
 from django_base_model.models import ModelAttribute
@@ -14,6 +15,86 @@ class ModelAttributeInline(generic.GenericTabularInline):
     model = ModelAttribute
     extra = 0
 
+    def queryset(self, request):
+        """
+        Overridden queryset method to retrieve the ContentType of each
+        ModelAttribute along with it rather than with a query per row.
+        """
+
+        query_set = super(ModelAttributeInline, self).queryset(request)
+        return query_set.select_related('content_type')
+
+
+class AttributeColumn(object):
+    """
+    Defines a column that can be used in the list_display property of a
+    BaseModelAdmin to display the value of the ModelAttribute with the given
+    name, or an empty string for objects that don't have it.  It can be
+    listed directly or assigned to a property of the BaseModelAdmin whose
+    name is listed.
+
+    The ModelAttributes of all of the objects on a changelist page are
+    retrieved together whenever one of these columns is listed.
+    """
+
+    def __init__(self, attribute_name, short_description=None):
+        """
+        Keyword arguments:
+        attribute_name -- the name of the ModelAttribute to display
+        short_description -- the column header to use, defaults to the name
+        """
+
+        self.attribute_name = attribute_name
+        self.short_description = (
+            short_description or attribute_name.replace('_', ' ')
+        )
+        self.__name__ = attribute_name
+
+    def __call__(self, obj):
+        return obj.get_attributes_as_dict().get(self.attribute_name, '')
+
+
+class BaseModelChangeList(ChangeList):
+    """
+    Defines a ChangeList that retrieves the last_modified_by Users of the
+    listed objects in a single query, and retrieves their ModelAttributes in
+    a single query when any attribute columns are listed.
+    """
+
+    def get_query_set(self, request):
+        query_set = super(BaseModelChangeList, self).get_query_set(request)
+        select_related = query_set.query.select_related
+
+        # select_related() without fields (which ChangeList uses when
+        # list_select_related is set or a foreign key is listed) doesn't
+        # follow nullable foreign keys such as last_modified_by, so unless it
+        # was named the users are retrieved with one more query instead.
+        if not isinstance(select_related, dict):
+            select_related = {}
+
+        if 'last_modified_by' not in select_related:
+            query_set = query_set.prefetch_related('last_modified_by')
+
+        if self.has_attribute_columns():
+            query_set = query_set.with_attributes()
+
+        return query_set
+
+    def has_attribute_columns(self):
+        """
+        Returns whether any of the columns in list_display display a
+        ModelAttribute.
+        """
+
+        for column in self.list_display:
+            if not callable(column):
+                column = getattr(self.model_admin, column, None)
+
+            if isinstance(column, AttributeColumn):
+                return True
+
+        return False
+
 
 class BaseModelAdmin(admin.ModelAdmin):
     """
@@ -40,6 +121,9 @@ class BaseModelAdmin(admin.ModelAdmin):
         Django admin for the last_modified_by property.
         """
 
+        if obj.last_modified_by_id is None:
+            return ''
+
         return obj.last_modified_by.get_full_name()
     last_modified_by_name.short_description = 'Last Modified By'
 
@@ -61,6 +145,14 @@ class BaseModelAdmin(admin.ModelAdmin):
         return obj.time_created.strftime('%m/%d/%Y %I:%M %p')
     created_on.short_description = 'Created On'
 
+    def get_changelist(self, request, **kwargs):
+        """
+        Overridden get_changelist method to list objects without a query per
+        row for their last_modified_by User or ModelAttributes.
+        """
+
+        return BaseModelChangeList
+
     def save_model(self, request, obj, form, change):
         """
         Overridden save_model method to add support for tracking who has last
@@ -78,8 +170,14 @@ class BaseModelAdmin(admin.ModelAdmin):
         Overridden save_formset method to add support for tracking who has last
         modified a batch of objects that inherits from BaseModel via the admin
         interface.
+
+        Formsets of ModelAttributes are saved in bulk with
+        save_attribute_formset.
         """
 
+        if issubclass(formset.model, ModelAttribute):
+            return self.save_attribute_formset(request, form, formset, change)
+
         instances = formset.save(commit=False)
 
         for instance in instances:
@@ -89,3 +187,46 @@ class BaseModelAdmin(admin.ModelAdmin):
             instance.save()
 
         formset.save_m2m()
+
+    def save_attribute_formset(self, request, form, formset, change):
+        """
+        Saves a formset of ModelAttributes with a handful of queries rather
+        than several per ModelAttribute, using
+        ModelAttributeManager.bulk_save_attributes.  The forms of the formset
+        have already validated each ModelAttribute, so only the uniqueness of
+        their names is checked again.
+
+        The last_modified_by property of the object the ModelAttributes belong
+        to is tracked by save_model, and the formset is left set up the same
+        way formset.save would leave it for the admin's change messages.
+        """
+
+        formset.new_objects = []
+        formset.changed_objects = []
+        formset.deleted_objects = []
+
+        for inline_form in formset.initial_forms:
+            if formset.can_delete and formset._should_delete_form(inline_form):
+                formset.deleted_objects.append(inline_form.instance)
+            elif inline_form.has_changed():
+                formset.changed_objects.append(
+                    (inline_form.instance, inline_form.changed_data)
+                )
+
+        for inline_form in formset.extra_forms:
+            if not inline_form.has_changed():
+                continue
+
+            if formset.can_delete and formset._should_delete_form(inline_form):
+                continue
+
+            formset.new_objects.append(
+                formset.save_new(inline_form, commit=False)
+            )
+
+        ModelAttribute.objects.bulk_save_attributes(
+            created=formset.new_objects,
+            changed=[obj for obj, changed_data in formset.changed_objects],
+            deleted=formset.deleted_objects,
+            using=formset.instance._state.db
+        )
@@ -0,0 +1,116 @@
+"""
+Runs the blocking attribute operations of BaseModel and its managers on a
+bounded pool of threads, so that code that can't block on them (e.g., in an
+event loop) doesn't have to (see the a-prefixed methods, e.g.,
+BaseModel.aget_attributes_as_dict and BaseModelManager.aget).
+
+The pool has as many threads as the BASE_MODEL_ASYNC_WORKERS setting (4 if it
+is not set), each with its own database connections, which are closed once
+each operation is done just as they are at the end of a request.  The
+operations return concurrent.futures.Future objects (from the futures
+package), whose results can be waited for with result() or handed to an event
+loop that accepts them (e.g., Tornado's IOLoop.add_future).
+"""
+
+import threading
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from django.conf import settings
+from django.db import connections
+
+DEFAULT_WORKERS = 4
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Retrieves the pool of threads the operations are run on, creating it
+    only the first time it is requested.
+    """
+
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(
+                        settings,
+                        'BASE_MODEL_ASYNC_WORKERS',
+                        DEFAULT_WORKERS
+                    )
+                )
+
+    return _executor
+
+
+def shutdown_executor(wait=True):
+    """
+    Shuts down the pool of threads, e.g., when the event loop is closed.  A
+    new one is created the next time an operation is run.
+
+    Keyword arguments:
+    wait -- whether or not to wait for the pending operations to finish.
+    """
+
+    global _executor
+
+    with _executor_lock:
+        executor, _executor = _executor, None
+
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+def _call(func, args, kwargs):
+    try:
+        return func(*args, **kwargs)
+    finally:
+        for connection in connections.all():
+            connection.close()
+
+
+def run_async(func, *args, **kwargs):
+    """
+    Runs func with the given arguments on the pool of threads and returns a
+    future of its result.
+    """
+
+    return get_executor().submit(_call, func, args, kwargs)
+
+
+def gather(futures):
+    """
+    Returns a future of the list of results of the given futures, as
+    returned by run_async, which fails with the first exception raised by
+    any of them.  No thread of the pool is held while waiting for them.
+    """
+
+    futures = list(futures)
+    result = Future()
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def done(future):
+        with lock:
+            remaining[0] -= 1
+
+            if result.done():
+                return
+
+            if future.cancelled():
+                result.cancel()
+            elif future.exception() is not None:
+                result.set_exception(future.exception())
+            elif not remaining[0]:
+                result.set_result([each.result() for each in futures])
+
+    if not futures:
+        result.set_result([])
+
+    for future in futures:
+        future.add_done_callback(done)
+
+    return result
@@ -0,0 +1,284 @@
+"""
+Buffers the attribute writes made within a block of code (or a request, with
+AttributeWriteBufferMiddleware) and writes them to the database all at once
+at the end of it, instead of with separate statements for every call:
+
+with buffered_attributes():
+    obj.update_attributes(attributes={'tier': 2})
+    obj.update_attributes(attributes={'tier': 3, 'region': 'east'}, create=True)
+
+While a buffer is active, BaseModel.update_attributes, create_attributes and
+the create method of the attributes related manager record the values in the
+buffer, keyed by object and attribute name so that repeated writes to the same
+attribute are coalesced, and set them up on the given object right away.  The
+buffered values are written at the end of the outermost block with
+BaseModelManager.bulk_set_attributes, in a single transaction per database
+(joining the transaction of the enclosing code, if there is one), and
+discarded if the block raises an exception.  The values that were written are
+then read back with a single query per model and set up on the objects again,
+with the value types they were stored with.
+
+Until then, other objects and queries don't see the buffered values, and a
+buffered create of an attribute that already exists updates it instead.
+"""
+
+import threading
+from contextlib import contextmanager
+
+from django.utils.datastructures import SortedDict
+
+from django_base_model.utils import managed_transaction
+
+_local = threading.local()
+
+
+def get_native_value(value):
+    """
+    Retrieves the value a ModelAttribute created with the given value will
+    have once it is written, which is stored as text as it isn't given a
+    value type.
+    """
+
+    # Avoid a circular import.
+    from django_base_model.models import convert_value
+
+    return convert_value('', value)[0]
+
+
+class AttributeWriteBuffer(object):
+    """
+    Defines the attribute writes buffered for a block of code, keyed by the
+    model and database of each object and then by the object's primary key
+    and the attribute name, along with the objects they were made on.
+    """
+
+    def __init__(self):
+        self.writes = SortedDict()
+        self.objects = {}
+
+    def __len__(self):
+        return sum(len(writes) for writes in self.writes.values())
+
+    def write(self, obj, attributes, create=False):
+        """
+        Buffers new values for attributes of the given object and sets them
+        up on it: as properties, in its cached attributes if they have been
+        loaded and, for models with compact attributes, in their container,
+        which is loaded first if it hasn't been yet.
+
+        Keyword arguments:
+        obj -- a saved object that inherits from BaseModel.
+        attributes -- a dictionary of name/value pairs.
+        create -- a boolean indicating whether or not attributes that don't
+                  exist should be created.
+        """
+
+        key = (obj._meta.concrete_model, obj._state.db)
+        writes = self.writes.setdefault(key, SortedDict())
+        self.objects.setdefault(key, {})[id(obj)] = obj
+
+        if obj.get_attribute_option('compact'):
+            # Compact attributes are only ever resolved from their container.
+            obj._get_attribute_cache()
+
+        cached_names = None
+
+        if '_attribute_cache' in obj.__dict__:
+            cached_names = set(obj.get_cached_attribute_names())
+
+        native_values = {}
+
+        for name, value in attributes.items():
+            write_key = (obj._get_pk_val(), name)
+            write_create = create or writes.get(write_key, (None, False))[1]
+            writes[write_key] = (value, write_create)
+
+            # Updates of attributes that the object is known not to have are
+            # left out, as nothing will be written for them.
+            if write_create or cached_names is None or name in cached_names:
+                native_values[name] = get_native_value(value)
+
+        self.apply(obj, native_values)
+
+    def apply(self, obj, attributes, missing=()):
+        """
+        Sets up attribute values on an object, as properties and in its cached
+        attributes, and removes the attributes it doesn't have.
+
+        Keyword arguments:
+        obj -- an object that inherits from BaseModel.
+        attributes -- a dictionary of name/value pairs.
+        missing -- a list of the names of attributes the object doesn't have.
+        """
+
+        if missing:
+            obj.uncache_attributes(missing)
+            obj.unset_attributes(missing)
+
+        obj.cache_attributes(attributes)
+
+        for name, value in attributes.items():
+            obj.set_attribute(name=name, value=value, overwrite=True)
+
+    def flush(self):
+        """
+        Writes the buffered values to the database, sets up the values that
+        were written on the objects they were buffered for and empties the
+        buffer.
+
+        Returns a dictionary with the number of attributes that were created,
+        updated and left unchanged.
+        """
+
+        writes, self.writes = self.writes, SortedDict()
+        objects, self.objects = self.objects, {}
+        summary = {'created': 0, 'updated': 0, 'unchanged': 0}
+        databases = SortedDict()
+
+        for (model, db), model_writes in writes.items():
+            databases.setdefault(db, []).append((model, model_writes))
+
+        for db, models in databases.items():
+            with managed_transaction(using=db):
+                for model, model_writes in models:
+                    manager = model._default_manager.db_manager(db)
+                    names = {}
+
+                    for object_id, name in model_writes:
+                        names.setdefault(object_id, []).append(name)
+
+                    for create in (False, True):
+                        attributes = {}
+
+                        for (object_id, name), value in model_writes.items():
+                            if value[1] == create:
+                                attributes.setdefault(object_id, {})[name] = value[0]
+
+                        if not attributes:
+                            continue
+
+                        result = manager.bulk_set_attributes(
+                            attributes,
+                            create=create
+                        )
+
+                        for count in summary:
+                            summary[count] += result[count]
+
+                    written = manager.bulk_get_attributes(
+                        names.keys(),
+                        names=set(name for object_id, name in model_writes)
+                    )
+
+                    for obj in objects.get((model, db), {}).values():
+                        object_id = obj._get_pk_val()
+                        values = written.get(object_id, {})
+                        self.apply(
+                            obj,
+                            dict(
+                                (name, values[name])
+                                for name in names[object_id] if name in values
+                            ),
+                            missing=[
+                                name for name in names[object_id]
+                                if name not in values
+                            ]
+                        )
+
+        return summary
+
+    def discard(self):
+        """
+        Empties the buffer without writing anything.
+        """
+
+        self.writes = SortedDict()
+        self.objects = {}
+
+
+def get_current_buffer():
+    """
+    Retrieves the buffer of the current thread, or None if attribute writes
+    aren't being buffered.
+    """
+
+    return getattr(_local, 'buffer', None)
+
+
+def start_buffering():
+    """
+    Starts buffering the attribute writes of the current thread, returning
+    True if a new buffer was started or False if one was already active.
+    """
+
+    if get_current_buffer() is not None:
+        return False
+
+    _local.buffer = AttributeWriteBuffer()
+    return True
+
+
+def stop_buffering(flush=True):
+    """
+    Stops buffering the attribute writes of the current thread, writing the
+    buffered values to the database unless flush is False.
+
+    Returns the summary of the flush, or None if nothing was flushed.
+    """
+
+    buffer = get_current_buffer()
+
+    if buffer is None:
+        return None
+
+    _local.buffer = None
+
+    if flush:
+        return buffer.flush()
+
+    buffer.discard()
+    return None
+
+
+@contextmanager
+def buffered_attributes():
+    """
+    Buffers the attribute writes of the current thread within the enclosed
+    block, yielding the AttributeWriteBuffer.  A block nested in another one
+    joins the outer buffer, which is only written at the end of the
+    outermost block.
+    """
+
+    started = start_buffering()
+
+    try:
+        yield get_current_buffer()
+    except:
+        if started:
+            stop_buffering(flush=False)
+
+        raise
+    else:
+        if started:
+            stop_buffering()
+
+
+class AttributeWriteBufferMiddleware(object):
+    """
+    Defines a middleware that buffers the attribute writes made while
+    handling each request, writing them once the response has been built.
+    Requests that raise an exception discard them.
+
+    Put it after TransactionMiddleware so that the writes are made in the
+    transaction of the request.
+    """
+
+    def process_request(self, request):
+        start_buffering()
+
+    def process_response(self, request, response):
+        stop_buffering()
+        return response
+
+    def process_exception(self, request, exception):
+        stop_buffering(flush=False)
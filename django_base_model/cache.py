@@ -0,0 +1,182 @@
+"""
+An optional cache of the attributes of objects that inherit from BaseModel,
+stored through Django's cache framework so that it can be shared between
+processes.
+
+It is enabled per model with the cache option of the model's AttributeMeta
+class, and uses the cache named by the BASE_MODEL_ATTRIBUTE_CACHE setting
+(the default cache if it is not set).  Keys are versioned per content type so
+that every cached attribute set of a model can be invalidated at once with
+invalidate_model_attributes.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, get_cache
+from django.db import transaction
+
+from django_base_model.registry import get_model_for_id
+from django_base_model.utils import run_on_commit
+
+ATTRIBUTES_KEY = 'django_base_model:attributes:%s:%s:%s'
+VERSION_KEY = 'django_base_model:attributes:%s:version'
+
+_cache = None
+
+
+def get_attribute_cache():
+    """
+    Retrieves the cache backend the attributes are stored in, creating it
+    only the first time it is requested.
+    """
+
+    global _cache
+
+    if _cache is None:
+        _cache = get_cache(
+            getattr(settings, 'BASE_MODEL_ATTRIBUTE_CACHE', DEFAULT_CACHE_ALIAS)
+        )
+
+    return _cache
+
+
+def is_cached_content_type(content_type_id):
+    """
+    Determines whether or not the attributes of the model with the given
+    content type are cached.
+    """
+
+    model = get_model_for_id(content_type_id)
+
+    return (
+        hasattr(model, 'get_attribute_option') and
+        model.get_attribute_option('cache')
+    )
+
+
+def get_version(content_type_id):
+    """
+    Retrieves the current version of the keys of the given content type.
+
+    New versions are based on the current time rather than starting over at 1,
+    so that attribute sets cached under an older version can't be served again
+    if the version key itself is evicted from the cache.
+    """
+
+    cache = get_attribute_cache()
+    key = VERSION_KEY % content_type_id
+    version = cache.get(key)
+
+    if version is None:
+        cache.add(key, int(time.time() * 1000))
+        version = cache.get(key)
+
+    return version
+
+
+def get_keys(content_type_id, object_ids):
+    """
+    Retrieves a dictionary mapping the cache key of each object to its id.
+    """
+
+    version = get_version(content_type_id)
+
+    return dict(
+        (ATTRIBUTES_KEY % (content_type_id, version, object_id), object_id)
+        for object_id in object_ids
+    )
+
+
+def get_cached_attributes(content_type_id, object_ids):
+    """
+    Retrieves the cached attributes of the given objects as a dictionary
+    mapping object ids to dictionaries of name/value pairs.  Objects whose
+    attributes are not cached are left out.
+    """
+
+    keys = get_keys(content_type_id, object_ids)
+
+    return dict(
+        (keys[key], attributes)
+        for key, attributes in get_attribute_cache().get_many(keys.keys()).items()
+    )
+
+
+def set_cached_attributes(content_type_id, attributes):
+    """
+    Caches the attributes of the given objects.
+
+    Keyword arguments:
+    content_type_id -- the id of the ContentType of the objects.
+    attributes -- a dictionary mapping object ids to dictionaries of
+                  name/value pairs.
+    """
+
+    keys = get_keys(content_type_id, attributes.keys())
+
+    get_attribute_cache().set_many(
+        dict((key, attributes[object_id]) for key, object_id in keys.items()),
+        timeout=getattr(settings, 'BASE_MODEL_ATTRIBUTE_CACHE_TIMEOUT', None)
+    )
+
+
+def invalidate_attributes(content_type_id, object_ids, using=None):
+    """
+    Removes the cached attributes of the given objects, if their model has
+    cached attributes.  This must be called whenever ModelAttributes are
+    written without going through ModelAttribute.save or delete.
+
+    Within a transaction, the attributes are removed again once it has been
+    committed, as another process may have cached the rows it read before
+    then in the meantime.
+
+    Keyword arguments:
+    content_type_id -- the id of the ContentType of the objects.
+    object_ids -- a list of primary keys of the objects.
+    using -- the database alias the ModelAttributes were written to.
+    """
+
+    object_ids = list(object_ids)
+
+    if not object_ids or not is_cached_content_type(content_type_id):
+        return
+
+    keys = get_keys(content_type_id, object_ids).keys()
+    get_attribute_cache().delete_many(keys)
+
+    if transaction.is_managed(using=using):
+        run_on_commit(
+            lambda: get_attribute_cache().delete_many(keys),
+            using=using
+        )
+
+
+def invalidate_deleted_attributes(sender, instance, using, **kwargs):
+    """
+    Removes the cached attributes of the object a ModelAttribute belonged to
+    after it was deleted with its delete() method, a QuerySet or along with
+    the object.  This is connected to the post_delete signal of
+    ModelAttribute.
+    """
+
+    invalidate_attributes(
+        instance.content_type_id,
+        [instance.object_id],
+        using=using
+    )
+
+
+def invalidate_model_attributes(content_type_id):
+    """
+    Invalidates the cached attributes of every object of the model with the
+    given content type at once by moving its keys to a new version.
+    """
+
+    cache = get_attribute_cache()
+    key = VERSION_KEY % content_type_id
+
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, int(time.time() * 1000))
@@ -0,0 +1,198 @@
+"""
+A compact container for the attributes of objects that inherit from BaseModel,
+used instead of a dictionary per object and a property per attribute for
+models whose AttributeMeta class sets compact to True.
+
+The attribute names of a model are stored once, in a key table shared by
+every object of the model that maps each name to a position.  Each object only
+keeps a CompactAttributes instance holding a list of its values in those
+positions, so that holding many objects in memory doesn't cost a dictionary
+entry and a reference to each name per attribute per object.
+"""
+
+import threading
+
+# Marks the positions of a key table that have no value in a given object.
+_MISSING = object()
+
+# Key tables keyed by the concrete model they belong to.
+_key_tables = {}
+_key_tables_lock = threading.Lock()
+
+
+class AttributeKeyTable(object):
+    """
+    Defines the positions of the attribute names of a model, shared by the
+    CompactAttributes of all of its objects.  Positions are only ever added.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.names = []
+        self.indexes = {}
+        self.lock = threading.Lock()
+
+    def get_index(self, name):
+        """
+        Retrieves the position of the given attribute name, adding it to the
+        table if it isn't in it yet.
+        """
+
+        try:
+            return self.indexes[name]
+        except KeyError:
+            with self.lock:
+                if name not in self.indexes:
+                    self.names.append(name)
+                    self.indexes[name] = len(self.names) - 1
+
+                return self.indexes[name]
+
+
+def get_key_table(model):
+    """
+    Retrieves the key table shared by the objects of the given model (and of
+    its deferred subclasses), creating it the first time it is requested.
+    """
+
+    model = model._meta.concrete_model
+
+    try:
+        return _key_tables[model]
+    except KeyError:
+        with _key_tables_lock:
+            return _key_tables.setdefault(model, AttributeKeyTable(model))
+
+
+def restore_compact_attributes(model, items):
+    """
+    Recreates pickled CompactAttributes with the key table of the given model
+    in the current process.
+    """
+
+    return CompactAttributes(get_key_table(model), items)
+
+
+class CompactAttributes(object):
+    """
+    Defines the attributes of a single object as a mapping of names to values,
+    stored as a list of values in the positions of the key table of the
+    object's model.
+    """
+
+    __slots__ = ('_table', '_values')
+
+    def __init__(self, table, attributes=()):
+        """
+        Keyword arguments:
+        table -- the AttributeKeyTable of the object's model.
+        attributes -- a dictionary or iterable of name/value pairs.
+        """
+
+        self._table = table
+        self._values = []
+        self.update(attributes)
+
+    def _get_value(self, name):
+        try:
+            return self._values[self._table.indexes[name]]
+        except (KeyError, IndexError):
+            return _MISSING
+
+    def __getitem__(self, name):
+        try:
+            value = self._values[self._table.indexes[name]]
+        except (KeyError, IndexError):
+            raise KeyError(name)
+
+        if value is _MISSING:
+            raise KeyError(name)
+
+        return value
+
+    def __setitem__(self, name, value):
+        index = self._table.get_index(name)
+        missing = index + 1 - len(self._values)
+
+        if missing > 0:
+            self._values.extend([_MISSING] * missing)
+
+        self._values[index] = value
+
+    def __delitem__(self, name):
+        if self._get_value(name) is _MISSING:
+            raise KeyError(name)
+
+        self._values[self._table.indexes[name]] = _MISSING
+
+    def __contains__(self, name):
+        return self._get_value(name) is not _MISSING
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __eq__(self, other):
+        return dict(self.items()) == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '<CompactAttributes: %r>' % dict(self.items())
+
+    def __reduce__(self):
+        return (
+            restore_compact_attributes,
+            (self._table.model, self.items())
+        )
+
+    def get(self, name, default=None):
+        value = self._get_value(name)
+
+        if value is _MISSING:
+            return default
+
+        return value
+
+    def pop(self, name, *default):
+        value = self._get_value(name)
+
+        if value is _MISSING:
+            if default:
+                return default[0]
+
+            raise KeyError(name)
+
+        self._values[self._table.indexes[name]] = _MISSING
+        return value
+
+    def update(self, attributes):
+        if hasattr(attributes, 'items'):
+            attributes = attributes.items()
+
+        for name, value in attributes:
+            self[name] = value
+
+    def keys(self):
+        names = self._table.names
+
+        return [
+            names[index] for index, value in enumerate(self._values)
+            if value is not _MISSING
+        ]
+
+    def items(self):
+        names = self._table.names
+
+        return [
+            (names[index], value) for index, value in enumerate(self._values)
+            if value is not _MISSING
+        ]
+
+    def values(self):
+        return [value for value in self._values if value is not _MISSING]
@@ -1,11 +1,49 @@
 from operator import attrgetter
 
 from django.contrib.contenttypes.generic import (
+    GenericForeignKey,
     GenericRelation,
     ReverseGenericRelatedObjectsDescriptor
 )
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
 from django.db import connection, router
 
+from django_base_model import cache as attribute_cache
+from django_base_model import journal as attribute_journal
+from django_base_model import snapshot as attribute_snapshot
+from django_base_model.buffer import get_current_buffer, get_native_value
+from django_base_model.instrumentation import instrumented
+from django_base_model.registry import get_content_type, get_content_type_for_id
+from django_base_model.utils import managed_transaction, raw_delete
+
+# The maximum number of objects added or removed with a single statement.
+RELATED_OBJECTS_CHUNK_SIZE = 500
+
+# Related manager classes created by create_generic_related_manager, keyed by
+# the manager class they subclass.
+_related_manager_classes = {}
+
+
+class BaseGenericForeignKey(GenericForeignKey):
+    """
+    Overridden GenericForeignKey class that resolves ContentTypes through the
+    registry of BaseModel ContentTypes rather than ContentType's own cache, so
+    that walking from a ModelAttribute back to its object doesn't query for
+    the ContentType again whenever that cache has been cleared.
+    """
+
+    def get_content_type(self, obj=None, id=None, using=None):
+        if obj is not None:
+            return get_content_type(obj.__class__, obj._state.db)
+        elif id:
+            return get_content_type_for_id(id, using)
+
+        return super(BaseGenericForeignKey, self).get_content_type(
+            obj=obj,
+            id=id,
+            using=using
+        )
+
 
 class BaseGenericRelation(GenericRelation):
     """
@@ -54,30 +92,17 @@ class BaseReverseGenericRelatedObjectsDescriptor(ReverseGenericRelatedObjectsDes
         if instance is None:
             return self
 
-        # This import is done here to avoid circular import importing this
-        # module.
-        from django.contrib.contenttypes.models import ContentType
-
-        # Dynamically create a class that subclasses the related model's
-        # default manager.
         rel_model = self.field.rel.to
-        superclass = rel_model._default_manager.__class__
-        RelatedManager = create_generic_related_manager(superclass)
-
-        qn = connection.ops.quote_name
-        content_type = ContentType.objects.db_manager(
-            instance._state.db
-        ).get_for_model(instance)
 
-        manager = RelatedManager(
+        manager = self.related_manager_class(
             model=rel_model,
             instance=instance,
             symmetrical=(
                 self.field.rel.symmetrical and instance.__class__ == rel_model
             ),
-            source_col_name=qn(self.field.m2m_column_name()),
-            target_col_name=qn(self.field.m2m_reverse_name()),
-            content_type=content_type,
+            source_col_name=self.source_col_name,
+            target_col_name=self.target_col_name,
+            content_type=get_content_type(instance.__class__, instance._state.db),
             content_type_field_name=self.field.content_type_field_name,
             object_id_field_name=self.field.object_id_field_name,
             prefetch_cache_name=self.field.attname,
@@ -85,6 +110,52 @@ class BaseReverseGenericRelatedObjectsDescriptor(ReverseGenericRelatedObjectsDes
 
         return manager
 
+    @property
+    def related_manager_class(self):
+        """
+        The class of the manager returned by this descriptor, which subclasses
+        the related model's default manager.  It is only created once per
+        default manager class.
+        """
+
+        return get_generic_related_manager(
+            self.field.rel.to._default_manager.__class__
+        )
+
+    @property
+    def source_col_name(self):
+        try:
+            return self._source_col_name
+        except AttributeError:
+            self._source_col_name = connection.ops.quote_name(
+                self.field.m2m_column_name()
+            )
+            return self._source_col_name
+
+    @property
+    def target_col_name(self):
+        try:
+            return self._target_col_name
+        except AttributeError:
+            self._target_col_name = connection.ops.quote_name(
+                self.field.m2m_reverse_name()
+            )
+            return self._target_col_name
+
+
+def get_generic_related_manager(superclass):
+    """
+    Retrieves the manager class created by create_generic_related_manager for
+    the given superclass, creating it only the first time it is requested.
+    """
+
+    try:
+        return _related_manager_classes[superclass]
+    except KeyError:
+        manager_class = create_generic_related_manager(superclass)
+        _related_manager_classes[superclass] = manager_class
+        return manager_class
+
 
 def create_generic_related_manager(superclass):
     """
@@ -157,32 +228,321 @@ def create_generic_related_manager(superclass):
                     False,
                     self.prefetch_cache_name)
 
-        def add(self, *objs):
+        @instrumented('related_add')
+        def add(self, *objs, **kwargs):
+            """
+            Associates the given objects with the instance this manager belongs
+            to.  Objects that have already been saved are moved with a single
+            UPDATE statement, without calling save() on them.
+
+            Keyword arguments:
+            bulk -- a boolean indicating whether or not saved objects should
+                    be moved with a single UPDATE statement; set it to False
+                    to call save() on each object instead.
+            """
+
+            bulk = kwargs.get('bulk', True)
+            saved_objs = []
+            content_type_attname = self.model._meta.get_field(
+                self.content_type_field_name
+            ).attname
+            # The content types of the objects before and after being moved.
+            content_type_ids = set([self.content_type.id])
+
             for obj in objs:
                 if not isinstance(obj, self.model):
                     raise TypeError(
                         "'%s' instance expected" % self.model._meta.object_name
                     )
 
+            if bulk:
+                saved_objs = [obj for obj in objs if obj._get_pk_val() is not None]
+
+            if saved_objs:
+                db = router.db_for_write(self.model, instance=self.instance)
+                pks = [obj._get_pk_val() for obj in saved_objs]
+                self._validate_unique_names(saved_objs, pks, db)
+
+            for obj in objs:
+                if getattr(obj, content_type_attname) is not None:
+                    content_type_ids.add(getattr(obj, content_type_attname))
+
                 setattr(obj, self.content_type_field_name, self.content_type)
                 setattr(obj, self.object_id_field_name, self.pk_val)
-                obj.save()
+
+                if not bulk or obj._get_pk_val() is None:
+                    obj.save()
+                    self._set_attribute(obj)
+
+            if saved_objs:
+                # The objects the moved objects belonged to before, keyed by
+                # content type id, whose snapshots and cached attributes need
+                # to be refreshed as well.
+                previous_owners = {}
+                refresh_owners = any(
+                    attribute_cache.is_cached_content_type(content_type_id) or
+                    attribute_snapshot.get_snapshot_model(content_type_id, db)
+                    for content_type_id in content_type_ids
+                )
+
+                with managed_transaction(using=db):
+                    for start in range(0, len(pks), RELATED_OBJECTS_CHUNK_SIZE):
+                        chunk_query_set = self.model._base_manager.using(db).filter(
+                            pk__in=pks[start:start + RELATED_OBJECTS_CHUNK_SIZE]
+                        )
+                        previous = attribute_journal.get_rows(
+                            chunk_query_set,
+                            content_type_ids=content_type_ids
+                        )
+
+                        if not refresh_owners:
+                            owners = []
+                        elif previous:
+                            owners = [row[:2] for row in previous.values()]
+                        else:
+                            owners = chunk_query_set.values_list(
+                                content_type_attname,
+                                self.object_id_field_name
+                            )
+
+                        for content_type_id, object_id in owners:
+                            previous_owners.setdefault(
+                                content_type_id,
+                                set()
+                            ).add(object_id)
+
+                        chunk_query_set.update(**{
+                            self.content_type_field_name: self.content_type,
+                            self.object_id_field_name: self.pk_val,
+                        })
+                        attribute_journal.record_changes(
+                            previous,
+                            attribute_journal.get_updated_rows(
+                                previous,
+                                dict(
+                                    (pk, {
+                                        'content_type': self.content_type.id,
+                                        'object_id': self.pk_val,
+                                    })
+                                    for pk in previous
+                                )
+                            ),
+                            using=db
+                        )
+
+                    previous_owners.setdefault(
+                        self.content_type.id,
+                        set()
+                    ).discard(self.pk_val)
+
+                    for content_type_id, object_ids in previous_owners.items():
+                        if object_ids:
+                            attribute_snapshot.refresh_snapshots(
+                                content_type_id,
+                                object_ids,
+                                using=db
+                            )
+                            attribute_cache.invalidate_attributes(
+                                content_type_id,
+                                object_ids,
+                                using=db
+                            )
+
+                    self._attributes_changed(db)
+
+                # The instance is only changed once the objects were moved.
+                for obj in saved_objs:
+                    self._set_attribute(obj)
         add.alters_data = True
 
-        def remove(self, *objs):
-            db = router.db_for_write(self.model, instance=self.instance)
+        @instrumented('related_remove')
+        def remove(self, *objs, **kwargs):
+            """
+            Deletes the given objects, which must belong to the instance this
+            manager belongs to, with one DELETE statement per chunk of objects.
+
+            As with the related managers of foreign keys, DoesNotExist is
+            raised, and nothing is deleted, if any of the objects belongs to
+            another object.
+
+            Keyword arguments:
+            send_signals -- a boolean indicating whether or not each object
+                            should be deleted individually so that its
+                            delete() method is called and the pre/post delete
+                            signals are sent.
+            """
+
+            content_type_attname = self.model._meta.get_field(
+                self.content_type_field_name
+            ).attname
 
             for obj in objs:
-                obj.delete(using=db)
+                if (getattr(obj, content_type_attname) != self.content_type.id or
+                        getattr(obj, self.object_id_field_name) != self.pk_val):
+                    raise self.model.DoesNotExist(
+                        '%r is not related to %r.' % (obj, self.instance)
+                    )
+
+            db = router.db_for_write(self.model, instance=self.instance)
+
+            if kwargs.get('send_signals', False):
+                for obj in objs:
+                    obj.delete(using=db)
+            else:
+                pks = [obj._get_pk_val() for obj in objs]
+
+                with managed_transaction(using=db):
+                    for start in range(0, len(pks), RELATED_OBJECTS_CHUNK_SIZE):
+                        chunk_query_set = self._owned_query_set(db).filter(
+                            pk__in=pks[start:start + RELATED_OBJECTS_CHUNK_SIZE]
+                        )
+                        attribute_journal.record_changes(
+                            attribute_journal.get_rows(
+                                chunk_query_set,
+                                content_type_ids=[self.content_type.id]
+                            ),
+                            {},
+                            using=db
+                        )
+                        raw_delete(chunk_query_set)
+
+                    self._attributes_changed(db)
+
+            self._uncache_attributes([obj.name for obj in objs])
         remove.alters_data = True
 
-        def clear(self):
+        @instrumented('related_clear')
+        def clear(self, **kwargs):
+            """
+            Deletes all of the objects belonging to the instance this manager
+            belongs to with a single DELETE statement.
+
+            Keyword arguments:
+            send_signals -- a boolean indicating whether or not each object
+                            should be deleted individually so that its
+                            delete() method is called and the pre/post delete
+                            signals are sent.
+            """
+
             db = router.db_for_write(self.model, instance=self.instance)
 
-            for obj in self.all():
-                obj.delete(using=db)
+            if kwargs.get('send_signals', False):
+                for obj in self._owned_query_set(db):
+                    obj.delete(using=db)
+            else:
+                with managed_transaction(using=db):
+                    attribute_journal.record_changes(
+                        attribute_journal.get_rows(
+                            self._owned_query_set(db),
+                            content_type_ids=[self.content_type.id]
+                        ),
+                        {},
+                        using=db
+                    )
+                    raw_delete(self._owned_query_set(db))
+                    self._attributes_changed(db)
+
+            self._uncache_attributes()
         clear.alters_data = True
 
+        def _owned_query_set(self, db):
+            """
+            Retrieves a QuerySet of the objects belonging to the instance this
+            manager belongs to, bypassing any prefetched objects.
+            """
+
+            return super(
+                BaseGenericRelatedObjectManager,
+                self
+            ).get_query_set().using(db).filter(**self.core_filters)
+
+        def _validate_unique_names(self, objs, pks, db):
+            """
+            Checks, with a single query, that the given saved objects can be
+            moved to the instance this manager belongs to without clashing
+            with the names of its other objects, raising a ValidationError
+            the same way validate_unique would otherwise.
+            """
+
+            unique_fields = self.model._meta.unique_together[0]
+            names = {}
+
+            for obj in objs:
+                if obj.name in names:
+                    raise ValidationError({
+                        NON_FIELD_ERRORS: [
+                            obj.unique_error_message(self.model, unique_fields)
+                        ]
+                    })
+
+                names[obj.name] = obj
+
+            existing = list(self._owned_query_set(db).filter(
+                name__in=names.keys()
+            ).exclude(pk__in=pks).values_list('name', flat=True)[:1])
+
+            if existing:
+                raise ValidationError({
+                    NON_FIELD_ERRORS: [
+                        names[existing[0]].unique_error_message(
+                            self.model,
+                            unique_fields
+                        )
+                    ]
+                })
+
+        def _set_attribute(self, obj):
+            """
+            Caches an object that now belongs to the instance this manager
+            belongs to and sets it up as a property of the instance.
+            """
+
+            self._cache_attribute(obj)
+
+            if hasattr(self.instance, 'set_attribute'):
+                self.instance.set_attribute(obj.name, obj.native_value)
+
+        def _uncache_attributes(self, names=None):
+            """
+            Keeps the attributes cached and set up as properties on the
+            instance this manager belongs to coherent with deleted objects.
+            """
+
+            if hasattr(self.instance, 'uncache_attributes'):
+                if names is None:
+                    names = self.instance.get_cached_attribute_names()
+
+                self.instance.uncache_attributes(names)
+                self.instance.unset_attributes(names)
+
+        def _attributes_changed(self, db):
+            """
+            Rebuilds the attribute snapshot and invalidates the shared attribute
+            cache of the instance this manager belongs to after its objects
+            were changed without save/delete.
+            """
+
+            attribute_snapshot.refresh_snapshots(
+                self.content_type.id,
+                [self.pk_val],
+                using=db
+            )
+            attribute_cache.invalidate_attributes(
+                self.content_type.id,
+                [self.pk_val],
+                using=db
+            )
+
+        def _cache_attribute(self, obj):
+            """
+            Keeps the attributes cached on the instance this manager belongs
+            to coherent with a ModelAttribute that was just saved.
+            """
+
+            if hasattr(self.instance, 'cache_attributes'):
+                self.instance.cache_attributes({obj.name: obj.native_value})
+
+        @instrumented('related_get_or_create')
         def get_or_create(self, content_object=None, **kwargs):
             """
             This get_or_create method takes in an optional argument of the
@@ -207,12 +567,16 @@ def create_generic_related_manager(superclass):
                 self
             ).using(db).get_or_create(**kwargs)
 
+            if created:
+                self._cache_attribute(obj)
+
             if created and content_object and hasattr(content_object, 'set_attribute'):
-                content_object.set_attribute(obj.name, obj.value)
+                content_object.set_attribute(obj.name, obj.native_value)
 
             return (obj, created)
         get_or_create.alters_data = True
 
+        @instrumented('related_create')
         def create(self, content_object=None, **kwargs):
             """
             This create method takes in an optional argument of the object that
@@ -224,11 +588,35 @@ def create_generic_related_manager(superclass):
             object in memory must be used in order for the property to be
             assigned to the correct instance of the object in memory.
 
+            While attribute writes are being buffered (see
+            django_base_model.buffer), a ModelAttribute given only a name and
+            a value is created when the buffer is flushed, and the
+            ModelAttribute returned is never saved.
+
             Keyword arguments:
             content_object -- the object that the property should be added to,
                               which must inherit from BaseModel.
             """
 
+            buffer = get_current_buffer()
+
+            if (buffer is not None and hasattr(self.instance, 'update_attributes')
+                    and set(kwargs) <= set(['name', 'value'])):
+                name = kwargs.get('name')
+                value = kwargs.get('value', '')
+                buffer.write(self.instance, {name: value}, create=True)
+
+                if (content_object is not None and
+                        content_object is not self.instance and
+                        hasattr(content_object, 'set_attribute')):
+                    content_object.set_attribute(name, get_native_value(value))
+
+                # Only the value is buffered, so the ModelAttribute returned
+                # is never saved.
+                kwargs[self.content_type_field_name] = self.content_type
+                kwargs[self.object_id_field_name] = self.pk_val
+                return self.model(**kwargs)
+
             kwargs[self.content_type_field_name] = self.content_type
             kwargs[self.object_id_field_name] = self.pk_val
             db = router.db_for_write(self.model, instance=self.instance)
@@ -237,8 +625,10 @@ def create_generic_related_manager(superclass):
                 self
             ).using(db).create(**kwargs)
 
+            self._cache_attribute(obj)
+
             if content_object and hasattr(content_object, 'set_attribute'):
-                content_object.set_attribute(obj.name, obj.value)
+                content_object.set_attribute(obj.name, obj.native_value)
 
             return obj
         create.alters_data = True
@@ -0,0 +1,395 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.db import connections, models
+from django.dispatch import Signal
+
+
+# Sent after every instrumented operation, with the model class the operation
+# was run for as the sender.  Receivers are only given the stats when they are
+# connected (or stats are being collected), otherwise instrumented operations
+# run without measuring anything.
+attribute_operation = Signal(
+    providing_args=['operation', 'queries', 'rows', 'duration']
+)
+
+_local = threading.local()
+
+
+class OperationStats(object):
+    """
+    Defines the totals recorded for a single operation on a single model by
+    collect_stats.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.queries = 0
+        self.rows = 0
+        self.duration = 0.0
+
+    def add(self, queries, rows, duration):
+        self.calls += 1
+        self.queries += queries
+        self.rows += rows or 0
+        self.duration += duration
+
+    def as_dict(self):
+        return {
+            'calls': self.calls,
+            'queries': self.queries,
+            'rows': self.rows,
+            'duration': self.duration
+        }
+
+
+class StatsCollector(object):
+    """
+    Defines the stats recorded by collect_stats, keyed by the label of the
+    model (e.g., "myapp.MyModel") and the name of the operation.
+
+    Operations that run other instrumented operations (e.g.,
+    update_attributes creating ModelAttributes) are recorded along with the
+    operations they run, so the totals of different operations can overlap.
+    """
+
+    def __init__(self):
+        self.operations = {}
+
+    def record(self, model, operation, queries, rows, duration):
+        key = (get_model_label(model), operation)
+        self.operations.setdefault(key, OperationStats()).add(
+            queries,
+            rows,
+            duration
+        )
+
+    def get(self, operation, model=None):
+        """
+        Returns the totals of the given operation, for the given model only if
+        one is given.
+
+        Keyword arguments:
+        operation -- the name of the operation (e.g., "set_attributes").
+        model -- the model class to return the totals of.
+        """
+
+        totals = OperationStats()
+
+        for (label, name), stats in self.operations.items():
+            if name == operation and (
+                model is None or label == get_model_label(model)
+            ):
+                totals.calls += stats.calls
+                totals.queries += stats.queries
+                totals.rows += stats.rows
+                totals.duration += stats.duration
+
+        return totals
+
+    def as_dict(self):
+        """
+        Returns the recorded stats as a dictionary mapping (model label,
+        operation) tuples to dictionaries of their totals.
+        """
+
+        return dict(
+            (key, stats.as_dict()) for key, stats in self.operations.items()
+        )
+
+    def export(self, exporter):
+        """
+        Hands the totals of every recorded operation to the given exporter
+        (e.g., a LoggingExporter or StatsdExporter).
+        """
+
+        for (label, operation), stats in sorted(self.operations.items()):
+            exporter.export(label, operation, stats.as_dict())
+
+
+class LoggingExporter(object):
+    """
+    Defines an exporter that writes the stats of instrumented operations to a
+    logger, one message per operation.
+
+    It can be connected to attribute_operation to log every operation as it
+    happens, or given to StatsCollector.export to log the totals of a block
+    of code.
+    """
+
+    def __init__(self, logger=None, level=logging.DEBUG):
+        """
+        Keyword arguments:
+        logger -- the logger to write to, defaults to the
+                  "django_base_model.instrumentation" logger.
+        level -- the level to log the messages with.
+        """
+
+        self.logger = logger or logging.getLogger(__name__)
+        self.level = level
+
+    def __call__(self, sender, operation, **kwargs):
+        self.export(get_model_label(sender), operation, kwargs)
+
+    def connect(self):
+        """
+        Connects the exporter to attribute_operation.  A strong reference is
+        kept so that the exporter doesn't need to be referenced elsewhere.
+        """
+
+        attribute_operation.connect(self, weak=False)
+
+    def disconnect(self):
+        attribute_operation.disconnect(self)
+
+    def export(self, label, operation, stats):
+        self.logger.log(
+            self.level,
+            '%s %s: %s',
+            label,
+            operation,
+            ' '.join(
+                '%s=%s' % (key, stats[key])
+                for key in ('calls', 'queries', 'rows', 'duration')
+                if stats.get(key) is not None
+            )
+        )
+
+
+class StatsdExporter(LoggingExporter):
+    """
+    Defines an exporter that sends the stats of instrumented operations to a
+    statsd client (any object with incr and timing methods, such as the
+    client of the statsd package), as counters of calls, queries and rows
+    and a timer of the duration in milliseconds.
+
+    The stats are named "<prefix>.<app label>.<model>.<operation>.<stat>".
+    """
+
+    def __init__(self, client, prefix='django_base_model'):
+        """
+        Keyword arguments:
+        client -- the statsd client to send the stats to.
+        prefix -- the prefix of the names of the stats.
+        """
+
+        self.client = client
+        self.prefix = prefix
+
+    def export(self, label, operation, stats):
+        name = '%s.%s.%s' % (self.prefix, label.lower(), operation)
+
+        self.client.incr('%s.calls' % name, stats.get('calls', 1))
+
+        for key in ('queries', 'rows'):
+            if stats.get(key) is not None:
+                self.client.incr('%s.%s' % (name, key), stats[key])
+
+        self.client.timing('%s.duration' % name, stats['duration'] * 1000)
+
+
+def get_model_label(model):
+    """
+    Returns the label used for a model in recorded stats (e.g.,
+    "myapp.MyModel").
+    """
+
+    if model is None:
+        return 'unknown'
+
+    return '%s.%s' % (model._meta.app_label, model._meta.object_name)
+
+
+def get_operation_model(obj):
+    """
+    Returns the model class an instrumented operation is run for, given the
+    object it is a method of: the model class of a model instance, the model
+    of the object related to a related manager, the model of any other
+    manager, or the model class itself.
+    """
+
+    if isinstance(obj, type):
+        return obj
+
+    if isinstance(obj, models.Model):
+        return obj.__class__
+
+    instance = getattr(obj, 'instance', None)
+
+    if instance is not None:
+        return instance.__class__
+
+    return getattr(obj, 'model', None)
+
+
+def is_enabled():
+    """
+    Returns whether instrumented operations should be measured, i.e.,
+    whether anything is connected to attribute_operation or stats are being
+    collected in the current thread.
+    """
+
+    return bool(attribute_operation.receivers or getattr(_local, 'collectors', None))
+
+
+@contextmanager
+def collect_stats():
+    """
+    Collects the stats of every instrumented operation run in the current
+    thread within the enclosed block, yielding a StatsCollector:
+
+    with collect_stats() as stats:
+        obj.update_attributes(attributes={'tier': 2})
+
+    stats.get('update_attributes').queries
+    """
+
+    collector = StatsCollector()
+
+    if not hasattr(_local, 'collectors'):
+        _local.collectors = []
+
+    _local.collectors.append(collector)
+
+    try:
+        yield collector
+    finally:
+        _local.collectors.remove(collector)
+
+
+def _count_queries():
+    return sum(len(connection.queries) for connection in connections.all())
+
+
+@contextmanager
+def _debug_cursors():
+    """
+    Records the queries of every database connection for the enclosed block,
+    discarding the ones that would otherwise not have been recorded once the
+    outermost instrumented operation ends.
+    """
+
+    depth = getattr(_local, 'depth', 0)
+    _local.depth = depth + 1
+
+    if depth:
+        try:
+            yield
+        finally:
+            _local.depth = depth
+
+        return
+
+    states = []
+
+    for connection in connections.all():
+        states.append((
+            connection,
+            connection.use_debug_cursor,
+            len(connection.queries)
+        ))
+        connection.use_debug_cursor = True
+
+    try:
+        yield
+    finally:
+        _local.depth = depth
+
+        for connection, use_debug_cursor, count in states:
+            connection.use_debug_cursor = use_debug_cursor
+
+            if not (use_debug_cursor or
+                    (use_debug_cursor is None and settings.DEBUG)):
+                del connection.queries[count:]
+
+
+def record(model, operation, queries, rows, duration):
+    """
+    Records the stats of an operation with the collectors of the current
+    thread and sends them with attribute_operation.
+
+    Keyword arguments:
+    model -- the model class the operation was run for.
+    operation -- the name of the operation.
+    queries -- the number of queries the operation issued.
+    rows -- the number of rows the operation read or wrote, or None if it
+            isn't known.
+    duration -- the wall time the operation took, in seconds.
+    """
+
+    for collector in getattr(_local, 'collectors', ()):
+        collector.record(model, operation, queries, rows, duration)
+
+    if attribute_operation.receivers:
+        attribute_operation.send(
+            sender=model,
+            operation=operation,
+            queries=queries,
+            rows=rows,
+            duration=duration
+        )
+
+
+def instrumented(operation, rows=None):
+    """
+    Decorates a method of a model or manager (or a function whose first
+    argument is a model class) so that its number of queries, rows and wall
+    time are recorded whenever instrumentation is enabled.  Otherwise the
+    method is called directly.
+
+    Keyword arguments:
+    operation -- the name to record the operation under.
+    rows -- a function returning the number of rows read or written given
+            the return value of the method.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(obj, *args, **kwargs):
+            if not is_enabled():
+                return func(obj, *args, **kwargs)
+
+            with _debug_cursors():
+                queries = _count_queries()
+                start = time.time()
+                result = func(obj, *args, **kwargs)
+                duration = time.time() - start
+                queries = _count_queries() - queries
+
+            record(
+                get_operation_model(obj),
+                operation,
+                queries,
+                rows(result) if rows is not None else None,
+                duration
+            )
+
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def count_items(result):
+    return len(result)
+
+
+def count_object_attributes(result):
+    return sum(len(attributes) for attributes in result.values())
+
+
+def count_changes(result):
+    return result['created'] + result['updated']
+
+
+def count_result(result):
+    return result
+
+
+def count_one(result):
+    return 1
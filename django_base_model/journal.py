@@ -0,0 +1,260 @@
+"""
+An optional append-only journal of the changes made to the ModelAttributes of
+objects that inherit from BaseModel, so that copies of them kept elsewhere
+(e.g., a search index) can be brought up to date incrementally.
+
+It is enabled per model with the journal option of the model's AttributeMeta
+class.  Every change made through this module is recorded as an
+AttributeChange in the same transaction as the change itself, with an
+increasing sequence number; changes are read back in order with
+AttributeChange.objects.changes_since and removed once they are no longer
+needed with compact_changes (or the compact_attribute_changes management
+command).
+
+Changes are described by comparing the rows of the changed ModelAttributes
+before and after each operation, as (content_type_id, object_id, name, value,
+value_type) tuples keyed by primary key.  Rows are only read for this when at
+least one installed model keeps a journal.
+"""
+
+from django.db.models import Max
+
+from django_base_model.registry import get_base_models, get_model_for_id
+from django_base_model.utils import raw_delete
+
+JOURNAL_CHUNK_SIZE = 500
+
+JOURNAL_FIELDS = ('content_type', 'object_id', 'name', 'value', 'value_type')
+
+
+def is_active():
+    """
+    Determines whether or not any installed model keeps a journal, i.e.,
+    whether changes to ModelAttributes need to be described at all.
+    """
+
+    return any(
+        model.get_attribute_option('journal') for model in get_base_models()
+    )
+
+
+def is_journaled(content_type_id, using=None):
+    """
+    Determines whether or not changes to the attributes of the model with the
+    given content type are recorded.
+    """
+
+    model = get_model_for_id(content_type_id, using)
+
+    return bool(
+        hasattr(model, 'get_attribute_option') and
+        model.get_attribute_option('journal')
+    )
+
+
+def get_row(attribute):
+    """
+    Retrieves the row describing the given ModelAttribute as it is in memory.
+    """
+
+    return (
+        attribute.content_type_id,
+        attribute.object_id,
+        attribute.name,
+        attribute.value,
+        attribute.value_type
+    )
+
+
+def get_rows(query_set, content_type_ids=None):
+    """
+    Retrieves the rows describing the ModelAttributes of the given QuerySet
+    as they are in the database, keyed by primary key, or nothing if none of
+    their models keeps a journal.
+
+    Keyword arguments:
+    query_set -- a QuerySet of ModelAttributes.
+    content_type_ids -- the ids of the content types of the ModelAttributes,
+                        if they are known, which spares reading them when
+                        none of their models keeps a journal.
+    """
+
+    if content_type_ids is None:
+        if not is_active():
+            return {}
+    elif not any(
+        is_journaled(content_type_id, query_set.db)
+        for content_type_id in set(content_type_ids)
+    ):
+        return {}
+
+    return dict(
+        (row[0], row[1:])
+        for row in query_set.values_list('pk', *JOURNAL_FIELDS)
+    )
+
+
+def get_updated_rows(rows, values):
+    """
+    Applies the field values of a bulk update to the given rows.
+
+    Keyword arguments:
+    rows -- a dictionary mapping primary keys to rows.
+    values -- a dictionary mapping primary keys to dictionaries of field
+              names and their new values.
+    """
+
+    updated = {}
+
+    for pk, row in rows.items():
+        fields = values.get(pk, {})
+        updated[pk] = tuple(
+            fields.get(name, current)
+            for name, current in zip(JOURNAL_FIELDS, row)
+        )
+
+    return updated
+
+
+def record_changes(previous, current, using=None):
+    """
+    Records the changes between two sets of ModelAttribute rows, for the
+    models that keep a journal: a ModelAttribute that only exists in the
+    previous rows was deleted, one that only exists in the current rows was
+    created, and one whose value changed was updated.  A ModelAttribute that
+    was moved to another object or renamed is recorded as deleted and created.
+
+    Keyword arguments:
+    previous -- a dictionary mapping primary keys to rows before the change.
+    current -- a dictionary mapping primary keys to rows after the change.
+    using -- the database alias the ModelAttributes are in.
+    """
+
+    # Avoid a circular import.
+    from django_base_model.models import AttributeChange
+
+    changes = []
+
+    for pk in sorted(set(previous) | set(current)):
+        old = previous.get(pk)
+        new = current.get(pk)
+
+        if old is not None and new is not None and old[:3] == new[:3]:
+            if old[3:] != new[3:]:
+                changes.append(AttributeChange.from_rows('update', old, new))
+
+            continue
+
+        if old is not None:
+            changes.append(AttributeChange.from_rows('delete', old, None))
+
+        if new is not None:
+            changes.append(AttributeChange.from_rows('create', None, new))
+
+    journaled = {}
+    changes = [
+        change for change in changes
+        if journaled.setdefault(
+            change.content_type_id,
+            is_journaled(change.content_type_id, using)
+        )
+    ]
+
+    if changes:
+        AttributeChange.objects.using(using).bulk_create(
+            changes,
+            batch_size=JOURNAL_CHUNK_SIZE
+        )
+
+    return changes
+
+
+def record_deletion(sender, instance, using, **kwargs):
+    """
+    Records the deletion of a ModelAttribute that was deleted with its
+    delete() method, a QuerySet or along with the object it belongs to.  This
+    is connected to the post_delete signal of ModelAttribute.
+    """
+
+    if is_journaled(instance.content_type_id, using):
+        record_changes({instance.pk: get_row(instance)}, {}, using=using)
+
+
+def compact_changes(before=None, using=None, chunk_size=JOURNAL_CHUNK_SIZE):
+    """
+    Removes every change that was superseded by a later change to the same
+    attribute of the same object, leaving only the latest change of each
+    attribute, chunk_size changes at a time.
+
+    Returns the number of changes removed.
+
+    Keyword arguments:
+    before -- only changes with a lower sequence number are removed.
+    using -- the database alias the changes are in.
+    chunk_size -- the number of changes examined per query.
+    """
+
+    # Avoid a circular import.
+    from django_base_model.models import AttributeChange
+
+    query_set = AttributeChange.objects.using(using).order_by('seq')
+
+    if before is not None:
+        query_set = query_set.filter(seq__lt=before)
+
+    last_seq = None
+    count = 0
+
+    while True:
+        chunk_query_set = query_set
+
+        if last_seq is not None:
+            chunk_query_set = chunk_query_set.filter(seq__gt=last_seq)
+
+        chunk = list(chunk_query_set.values_list(
+            'seq',
+            'content_type',
+            'object_id',
+            'name'
+        )[:chunk_size])
+
+        if not chunk:
+            return count
+
+        latest = dict(
+            (
+                (row['content_type'], row['object_id'], row['name']),
+                row['latest']
+            )
+            for row in AttributeChange.objects.using(using).filter(
+                content_type__in=set(row[1] for row in chunk),
+                object_id__in=set(row[2] for row in chunk),
+                name__in=set(row[3] for row in chunk)
+            ).order_by().values('content_type', 'object_id', 'name').annotate(
+                latest=Max('seq')
+            )
+        )
+        superseded = [row[0] for row in chunk if row[0] < latest[row[1:]]]
+
+        if superseded:
+            count += raw_delete(
+                AttributeChange.objects.using(using).filter(seq__in=superseded)
+            )
+
+        last_seq = chunk[-1][0]
+
+
+def purge_changes(before, using=None):
+    """
+    Removes every change with a sequence number lower than the given one,
+    e.g., once every consumer of the journal has read past it.
+
+    Returns the number of changes removed.
+    """
+
+    # Avoid a circular import.
+    from django_base_model.models import AttributeChange
+
+    return raw_delete(
+        AttributeChange.objects.using(using).filter(seq__lt=before)
+    )
@@ -0,0 +1,70 @@
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from django_base_model.journal import (
+    JOURNAL_CHUNK_SIZE, compact_changes, purge_changes
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Compacts the journal of changes to ModelAttributes, removing every '
+        'change superseded by a later change to the same attribute.'
+    )
+
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--database',
+            action='store',
+            dest='database',
+            default=DEFAULT_DB_ALIAS,
+            help='Nominates the database to compact the journal in. '
+                 'Defaults to the "default" database.'
+        ),
+        make_option(
+            '--before',
+            action='store',
+            type='int',
+            dest='before',
+            default=None,
+            help='Only compact the changes with a lower sequence number.'
+        ),
+        make_option(
+            '--purge',
+            action='store_true',
+            dest='purge',
+            default=False,
+            help='Remove every change with a sequence number lower than '
+                 '--before instead, e.g., once every consumer has read '
+                 'past it.'
+        ),
+        make_option(
+            '--chunk-size',
+            action='store',
+            type='int',
+            dest='chunk_size',
+            default=JOURNAL_CHUNK_SIZE,
+            help='The number of changes to examine per query.'
+        ),
+    )
+
+    def handle(self, *args, **options):
+        database = options.get('database')
+        before = options.get('before')
+
+        if options.get('purge'):
+            if before is None:
+                raise CommandError('--purge requires --before.')
+
+            count = purge_changes(before, using=database)
+        else:
+            count = compact_changes(
+                before=before,
+                using=database,
+                chunk_size=options.get('chunk_size')
+            )
+
+        if int(options.get('verbosity', 1)) >= 1:
+            self.stdout.write('Removed %d attribute changes.\n' % count)
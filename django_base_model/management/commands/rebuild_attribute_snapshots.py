@@ -0,0 +1,77 @@
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import get_model, get_models
+
+from django_base_model.snapshot import (
+    SNAPSHOT_CHUNK_SIZE, get_snapshot_field, rebuild_snapshots
+)
+
+
+class Command(BaseCommand):
+    args = '[app_label.ModelName ...]'
+    help = (
+        'Rebuilds the attribute snapshots of the objects of the given models, '
+        'or of every model that keeps attribute snapshots if none are given.'
+    )
+
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--database',
+            action='store',
+            dest='database',
+            default=DEFAULT_DB_ALIAS,
+            help='Nominates the database to rebuild the snapshots in. '
+                 'Defaults to the "default" database.'
+        ),
+        make_option(
+            '--chunk-size',
+            action='store',
+            type='int',
+            dest='chunk_size',
+            default=SNAPSHOT_CHUNK_SIZE,
+            help='The number of objects to rebuild per transaction.'
+        ),
+    )
+
+    def handle(self, *labels, **options):
+        if labels:
+            models = []
+
+            for label in labels:
+                try:
+                    app_label, model_name = label.split('.')
+                except ValueError:
+                    raise CommandError(
+                        'Models must be given as app_label.ModelName, not "%s".' % label
+                    )
+
+                model = get_model(app_label, model_name)
+
+                if model is None or get_snapshot_field(model) is None:
+                    raise CommandError(
+                        '"%s" is not a model that keeps attribute snapshots.' % label
+                    )
+
+                models.append(model)
+        else:
+            models = [
+                model for model in get_models()
+                if get_snapshot_field(model) is not None
+            ]
+
+        for model in models:
+            count = rebuild_snapshots(
+                model,
+                using=options.get('database'),
+                chunk_size=options.get('chunk_size')
+            )
+
+            if int(options.get('verbosity', 1)) >= 1:
+                self.stdout.write(
+                    'Rebuilt the attribute snapshots of %d %s objects.\n' % (
+                        count,
+                        model._meta.object_name
+                    )
+                )
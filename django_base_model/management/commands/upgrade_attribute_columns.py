@@ -0,0 +1,217 @@
+from optparse import make_option
+
+from django.core.management.base import CommandError, NoArgsCommand
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+
+from django_base_model.models import (
+    ATTRIBUTE_TYPED_VALUE_FIELDS, ATTRIBUTE_UPDATE_BATCH_SIZE, ModelAttribute,
+    infer_typed_value
+)
+from django_base_model.utils import bulk_update_rows, managed_transaction
+
+# The number of ModelAttributes examined per query, and updated per
+# transaction, when existing ModelAttributes are backfilled.
+BACKFILL_CHUNK_SIZE = 2000
+
+# The ModelAttribute fields that were added after the table was first created.
+ADDED_FIELDS = (
+    'value_type',
+    'value_integer',
+    'value_decimal',
+    'value_boolean',
+    'value_datetime',
+)
+
+
+def get_column_statements(connection, existing_columns=()):
+    """
+    Builds the ALTER TABLE and CREATE INDEX statements that add the
+    ModelAttribute fields missing from an existing table.
+
+    Keyword arguments:
+    connection -- the database connection the statements are built for.
+    existing_columns -- the names of the columns already in the table.
+    """
+
+    qn = connection.ops.quote_name
+    opts = ModelAttribute._meta
+    statements = []
+
+    for name in ADDED_FIELDS:
+        field = opts.get_field(name)
+
+        if field.column in existing_columns:
+            continue
+
+        if field.null:
+            constraint = 'NULL'
+        else:
+            constraint = "NOT NULL DEFAULT '%s'" % field.get_default()
+
+        statements.append(
+            'ALTER TABLE %s ADD COLUMN %s %s %s' % (
+                qn(opts.db_table),
+                qn(field.column),
+                field.db_type(connection=connection),
+                constraint
+            )
+        )
+        statements.extend(
+            statement.rstrip(';')
+            for statement in connection.creation.sql_indexes_for_field(
+                ModelAttribute,
+                field,
+                no_style()
+            )
+        )
+
+    return statements
+
+
+def backfill_value_types(using, chunk_size=BACKFILL_CHUNK_SIZE):
+    """
+    Fills in the typed value field of the ModelAttributes stored as text
+    wherever their text is a valid integer, decimal, boolean or datetime
+    value (see infer_typed_value), chunk_size ModelAttributes at a time in
+    order of primary key, so that they can be filtered and ordered on as
+    typed values.
+
+    The ModelAttributes are left without a value type, and their text values
+    are left as they are, so no changes are journaled and the snapshots and
+    cached attributes of their objects stay valid.
+
+    Returns the number of ModelAttributes whose typed value field was filled
+    in.
+
+    Keyword arguments:
+    using -- the database alias the ModelAttributes are in.
+    chunk_size -- the number of ModelAttributes examined per query.
+    """
+
+    query_set = ModelAttribute.objects.using(using).filter(
+        value_type='',
+        **dict(
+            ('%s__isnull' % field_name, True)
+            for field_name in ATTRIBUTE_TYPED_VALUE_FIELDS.values()
+        )
+    ).order_by('pk')
+    last_pk = None
+    count = 0
+
+    while True:
+        chunk_query_set = query_set
+
+        if last_pk is not None:
+            chunk_query_set = chunk_query_set.filter(pk__gt=last_pk)
+
+        chunk = list(chunk_query_set.values_list('pk', 'value')[:chunk_size])
+
+        if not chunk:
+            return count
+
+        values = {}
+
+        for pk, value in chunk:
+            value_type, typed_value = infer_typed_value(value)
+
+            if value_type:
+                values[pk] = {
+                    ATTRIBUTE_TYPED_VALUE_FIELDS[value_type]: typed_value
+                }
+
+        with managed_transaction(using=using):
+            bulk_update_rows(
+                ModelAttribute,
+                values,
+                using=using,
+                batch_size=ATTRIBUTE_UPDATE_BATCH_SIZE
+            )
+
+        count += len(values)
+        last_pk = chunk[-1][0]
+
+
+class Command(NoArgsCommand):
+    help = (
+        'Adds the typed value columns to the ModelAttribute table of installs '
+        'created before ModelAttributes had value types, and optionally fills '
+        'in the typed values of the existing ModelAttributes.'
+    )
+
+    option_list = NoArgsCommand.option_list + (
+        make_option(
+            '--database',
+            action='store',
+            dest='database',
+            default=DEFAULT_DB_ALIAS,
+            help='Nominates the database to add the columns to. Defaults to '
+                 'the "default" database.'
+        ),
+        make_option(
+            '--sql',
+            action='store_true',
+            dest='sql',
+            default=False,
+            help='Prints the statements instead of executing them.'
+        ),
+        make_option(
+            '--backfill',
+            action='store_true',
+            dest='backfill',
+            default=False,
+            help='Also fills in the typed value of the existing '
+                 'ModelAttributes whose text is a valid integer, decimal, '
+                 'boolean or datetime value.'
+        ),
+        make_option(
+            '--chunk-size',
+            action='store',
+            type='int',
+            dest='chunk_size',
+            default=BACKFILL_CHUNK_SIZE,
+            help='The number of ModelAttributes to backfill per transaction.'
+        ),
+    )
+
+    def handle_noargs(self, **options):
+        db = options.get('database')
+
+        if options.get('sql') and options.get('backfill'):
+            raise CommandError('--backfill can\'t be combined with --sql.')
+
+        if not router.allow_syncdb(db, ModelAttribute):
+            return
+
+        connection = connections[db]
+        cursor = connection.cursor()
+        existing_columns = [
+            row[0]
+            for row in connection.introspection.get_table_description(
+                cursor,
+                ModelAttribute._meta.db_table
+            )
+        ]
+        statements = get_column_statements(connection, existing_columns)
+
+        if options.get('sql'):
+            for statement in statements:
+                self.stdout.write('%s;\n' % statement)
+
+            return
+
+        for statement in statements:
+            cursor.execute(statement)
+
+        transaction.commit_unless_managed(using=db)
+
+        if options.get('backfill'):
+            count = backfill_value_types(
+                using=db,
+                chunk_size=options.get('chunk_size')
+            )
+
+            if int(options.get('verbosity', 1)) >= 1:
+                self.stdout.write(
+                    'Filled in the typed values of %d attributes.\n' % count
+                )
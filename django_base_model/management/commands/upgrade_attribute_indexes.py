@@ -0,0 +1,264 @@
+from optparse import make_option
+
+from django.core.management.base import CommandError, NoArgsCommand
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.utils.datastructures import SortedDict
+
+from django_base_model.models import ModelAttribute
+
+
+# The fields of the unique constraint of ModelAttribute tables created before
+# it was reordered, in their former order.
+FORMER_UNIQUE_FIELDS = ('name', 'content_type', 'object_id')
+
+
+def get_indexes(connection, cursor):
+    """
+    Retrieves the indexes of the ModelAttribute table, including those of its
+    unique constraints, as a dictionary of (unique, columns) tuples keyed by
+    index name, with the columns in the order of the index.
+
+    Keyword arguments:
+    connection -- the database connection to introspect.
+    cursor -- a cursor of that connection.
+    """
+
+    qn = connection.ops.quote_name
+    table = ModelAttribute._meta.db_table
+    indexes = SortedDict()
+
+    if connection.vendor == 'sqlite':
+        cursor.execute('PRAGMA index_list(%s)' % qn(table))
+
+        for row in cursor.fetchall():
+            cursor.execute('PRAGMA index_info(%s)' % qn(row[1]))
+            indexes[row[1]] = (
+                bool(row[2]),
+                [info[2] for info in sorted(cursor.fetchall())]
+            )
+
+        return indexes
+
+    if connection.vendor == 'postgresql':
+        cursor.execute(
+            'SELECT index_class.relname, pg_index.indisunique, attname '
+            'FROM pg_index '
+            'JOIN pg_class AS index_class '
+            'ON index_class.oid = pg_index.indexrelid '
+            'JOIN pg_class AS table_class '
+            'ON table_class.oid = pg_index.indrelid '
+            'CROSS JOIN generate_subscripts(pg_index.indkey::int2[], 1) '
+            'AS position '
+            'JOIN pg_attribute ON attrelid = table_class.oid '
+            'AND attnum = pg_index.indkey[position] '
+            'WHERE table_class.relname = %s '
+            'ORDER BY index_class.relname, position',
+            [table]
+        )
+        rows = cursor.fetchall()
+    elif connection.vendor == 'mysql':
+        cursor.execute('SHOW INDEX FROM %s' % qn(table))
+        rows = [
+            (row[2], not row[1], row[4])
+            for row in sorted(cursor.fetchall(), key=lambda row: row[2:4])
+        ]
+    else:
+        cursor.execute(
+            'SELECT user_indexes.index_name, user_indexes.uniqueness, '
+            'LOWER(column_name) '
+            'FROM user_indexes '
+            'JOIN user_ind_columns '
+            'ON user_ind_columns.index_name = user_indexes.index_name '
+            'WHERE user_indexes.table_name = %s '
+            'ORDER BY user_indexes.index_name, column_position',
+            [table.upper()]
+        )
+        rows = [
+            (row[0], row[1] == 'UNIQUE', row[2])
+            for row in cursor.fetchall()
+        ]
+
+    for name, unique, column in rows:
+        indexes.setdefault(name, (bool(unique), []))[1].append(column)
+
+    return indexes
+
+
+def get_index_statements(connection, covering=False, existing_indexes=()):
+    """
+    Builds the CREATE INDEX statements for the ModelAttribute indexes led by
+    the content type and object id, which match the lookups of the generic
+    relation.
+
+    Keyword arguments:
+    connection -- the database connection the statements are built for.
+    covering -- a boolean indicating whether or not a covering index that
+                also includes the value should be built, so that reading the
+                attributes of an object can be served from the index alone.
+    existing_indexes -- the names of the indexes already in the table, which
+                        aren't created again.
+    """
+
+    qn = connection.ops.quote_name
+    opts = ModelAttribute._meta
+    columns = [
+        qn(opts.get_field(name).column)
+        for name in ('content_type', 'object_id', 'name')
+    ]
+    value_column = qn(opts.get_field('value').column)
+    existing_indexes = set(name.lower() for name in existing_indexes)
+    create_index = 'CREATE %sINDEX %s ON %s (%s)%s'
+    statements = []
+
+    if '%s_content_object' % opts.db_table not in existing_indexes:
+        statements.append(
+            create_index % (
+                'UNIQUE ',
+                qn('%s_content_object' % opts.db_table),
+                qn(opts.db_table),
+                ', '.join(columns),
+                ''
+            )
+        )
+
+    if covering and '%s_covering' % opts.db_table not in existing_indexes:
+        if connection.vendor == 'postgresql':
+            # Values may be too long for a btree key, so they are only stored
+            # in the index rather than being part of the key (PostgreSQL 11+).
+            key_columns = columns
+            suffix = ' INCLUDE (%s)' % value_column
+        elif connection.vendor == 'mysql':
+            key_columns = columns + ['%s(255)' % value_column]
+            suffix = ''
+        else:
+            key_columns = columns + [value_column]
+            suffix = ''
+
+        statements.append(
+            create_index % (
+                '',
+                qn('%s_covering' % opts.db_table),
+                qn(opts.db_table),
+                ', '.join(key_columns),
+                suffix
+            )
+        )
+
+    return statements
+
+
+def get_drop_former_statements(connection, indexes):
+    """
+    Builds the statements that drop the former unique index of the
+    ModelAttribute table, led by the name column, which is redundant once
+    the index led by the content type and object id exists.
+
+    Keyword arguments:
+    connection -- the database connection the statements are built for.
+    indexes -- the indexes of the table, as returned by get_indexes.
+    """
+
+    qn = connection.ops.quote_name
+    opts = ModelAttribute._meta
+    former_columns = [
+        opts.get_field(name).column for name in FORMER_UNIQUE_FIELDS
+    ]
+    statements = []
+
+    for name, (unique, columns) in indexes.items():
+        if not unique or columns != former_columns:
+            continue
+
+        if connection.vendor == 'sqlite':
+            if name.startswith('sqlite_autoindex_'):
+                raise CommandError(
+                    'The former unique index of %s was created along with '
+                    'the table and can\'t be dropped on SQLite.' % opts.db_table
+                )
+
+            statements.append('DROP INDEX %s' % qn(name))
+        elif connection.vendor == 'mysql':
+            statements.append(
+                'ALTER TABLE %s DROP INDEX %s' % (qn(opts.db_table), qn(name))
+            )
+        else:
+            # The index of a unique constraint (on PostgreSQL, named
+            # <table>_name_content_type_id_object_id_key) is dropped along
+            # with the constraint.
+            statements.append(
+                'ALTER TABLE %s DROP CONSTRAINT %s' % (
+                    qn(opts.db_table),
+                    qn(name)
+                )
+            )
+
+    return statements
+
+
+class Command(NoArgsCommand):
+    help = (
+        'Creates the ModelAttribute indexes led by content_type and object_id '
+        'on installs created before the unique constraint was reordered, and '
+        'optionally drops the former unique index.'
+    )
+
+    option_list = NoArgsCommand.option_list + (
+        make_option(
+            '--database',
+            action='store',
+            dest='database',
+            default=DEFAULT_DB_ALIAS,
+            help='Nominates the database to create the indexes in. Defaults '
+                 'to the "default" database.'
+        ),
+        make_option(
+            '--covering',
+            action='store_true',
+            dest='covering',
+            default=False,
+            help='Also creates a covering index including the value.'
+        ),
+        make_option(
+            '--drop-former',
+            action='store_true',
+            dest='drop_former',
+            default=False,
+            help='Also drops the former unique index led by the name.'
+        ),
+        make_option(
+            '--sql',
+            action='store_true',
+            dest='sql',
+            default=False,
+            help='Prints the statements instead of executing them.'
+        ),
+    )
+
+    def handle_noargs(self, **options):
+        db = options.get('database')
+
+        if not router.allow_syncdb(db, ModelAttribute):
+            return
+
+        connection = connections[db]
+        cursor = connection.cursor()
+        indexes = get_indexes(connection, cursor)
+        statements = get_index_statements(
+            connection,
+            covering=options.get('covering'),
+            existing_indexes=indexes.keys()
+        )
+
+        if options.get('drop_former'):
+            statements.extend(get_drop_former_statements(connection, indexes))
+
+        if options.get('sql'):
+            for statement in statements:
+                self.stdout.write('%s;\n' % statement)
+
+            return
+
+        for statement in statements:
+            cursor.execute(statement)
+
+        transaction.commit_unless_managed(using=db)
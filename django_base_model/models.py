@@ -1,15 +1,315 @@
+import datetime
+import decimal
+import numbers
 import re
 
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.contrib.contenttypes import generic
 from django.contrib.contenttypes.models import ContentType
-from django.core.exceptions import ValidationError
-from django.db import models
-
+from django.core.exceptions import FieldError, NON_FIELD_ERRORS, ValidationError
+from django.db import connections, models, router
+from django.db.models.query import QuerySet
+from django.db.models.signals import post_delete
+from django.utils import timezone
+from django.utils.datastructures import SortedDict
+from django.utils.dateparse import parse_datetime
+from django.utils.encoding import force_unicode
+
+from django_base_model import cache as attribute_cache
 from django_base_model import generic as base_generic
+from django_base_model import journal as attribute_journal
+from django_base_model import snapshot as attribute_snapshot
+from django_base_model.buffer import get_current_buffer
+from django_base_model.compact import CompactAttributes, get_key_table
+from django_base_model.registry import get_content_type
+from django_base_model.snapshot import AttributeSnapshotField
+from django_base_model.instrumentation import (
+    count_changes, count_items, count_object_attributes, count_one,
+    count_result, instrumented
+)
+from django_base_model.utils import (
+    bulk_update_rows, managed_transaction, raw_delete
+)
 
 ATTRIBUTE_MODEL_NAME_PATTERN = re.compile('^[a-z0-9_]+$')
 
+# The maximum number of objects whose ModelAttributes are loaded with a single
+# query when attributes are being prefetched for a set of objects.
+ATTRIBUTE_PREFETCH_CHUNK_SIZE = 500
+
+# The maximum number of ModelAttributes whose values are changed with a single
+# UPDATE statement.  Each ModelAttribute takes three query parameters, which
+# keeps every statement below SQLite's limit of 999 parameters.
+ATTRIBUTE_UPDATE_BATCH_SIZE = 300
+
+# The maximum number of objects whose fields are changed with a single UPDATE
+# statement by BaseModelManager.audited_bulk_update when a single field is
+# changed, for the same reason.
+AUDITED_UPDATE_BATCH_SIZE = 300
+
+ATTRIBUTE_CHANGE_OPERATION_CHOICES = (
+    ('create', 'Create'),
+    ('update', 'Update'),
+    ('delete', 'Delete'),
+)
+
+ATTRIBUTE_VALUE_TYPE_CHOICES = (
+    ('', 'Text'),
+    ('integer', 'Integer'),
+    ('decimal', 'Decimal'),
+    ('boolean', 'Boolean'),
+    ('datetime', 'Date/Time'),
+)
+
+# The ModelAttribute field that holds the typed copy of the value for each
+# value type other than text.
+ATTRIBUTE_TYPED_VALUE_FIELDS = {
+    'integer': 'value_integer',
+    'decimal': 'value_decimal',
+    'boolean': 'value_boolean',
+    'datetime': 'value_datetime',
+}
+
+# The lookups supported when filtering objects by their attributes.
+ATTRIBUTE_FILTER_LOOKUPS = (
+    'exact',
+    'iexact',
+    'contains',
+    'icontains',
+    'startswith',
+    'istartswith',
+    'endswith',
+    'iendswith',
+    'gt',
+    'gte',
+    'lt',
+    'lte',
+    'in',
+    'isnull',
+)
+
+# The lookups that always compare against the text representation of values.
+ATTRIBUTE_TEXT_LOOKUPS = (
+    'iexact',
+    'contains',
+    'icontains',
+    'startswith',
+    'istartswith',
+    'endswith',
+    'iendswith',
+)
+
+# The lookups that compare the order of values, for which integers and
+# decimals are compared with each other.
+ATTRIBUTE_RANGE_LOOKUPS = ('gt', 'gte', 'lt', 'lte')
+ATTRIBUTE_NUMERIC_VALUE_TYPES = ('integer', 'decimal')
+
+ATTRIBUTE_TRUE_VALUES = ('true', 't', 'yes', 'y', 'on', '1')
+ATTRIBUTE_FALSE_VALUES = ('false', 'f', 'no', 'n', 'off', '0', '')
+
+# The range of values held by ModelAttribute.value_integer, a BigIntegerField,
+# and the digits held by ModelAttribute.value_decimal.  Integers and decimals
+# that don't fit are stored as text.
+ATTRIBUTE_INTEGER_MIN = -2 ** 63
+ATTRIBUTE_INTEGER_MAX = 2 ** 63 - 1
+ATTRIBUTE_DECIMAL_MAX_DIGITS = 30
+ATTRIBUTE_DECIMAL_PLACES = 10
+
+# The text representations of integer and decimal values that are given a
+# value type when existing ModelAttributes are backfilled.  Anything with a
+# leading zero (e.g., a ZIP code) or more digits than the typed value fields
+# hold is left as text.
+ATTRIBUTE_INTEGER_PATTERN = re.compile(r'^-?(0|[1-9][0-9]{0,17})$')
+ATTRIBUTE_DECIMAL_PATTERN = re.compile(r'^-?(0|[1-9][0-9]{0,19})\.[0-9]{1,10}$')
+
+
+def fits_value_type(value_type, typed_value):
+    """
+    Determines whether a typed value can be stored in the field for its value
+    type: integers must be within the range of a BigIntegerField, and decimals
+    must be finite and have no more digits than value_decimal holds, in total
+    and after the decimal point.
+    """
+
+    if value_type == 'integer':
+        return ATTRIBUTE_INTEGER_MIN <= typed_value <= ATTRIBUTE_INTEGER_MAX
+    elif value_type == 'decimal':
+        if not typed_value.is_finite():
+            return False
+
+        try:
+            rounded = typed_value.quantize(
+                decimal.Decimal(1).scaleb(-ATTRIBUTE_DECIMAL_PLACES),
+                context=decimal.Context(prec=ATTRIBUTE_DECIMAL_MAX_DIGITS)
+            )
+        except decimal.InvalidOperation:
+            return False
+
+        return rounded == typed_value
+
+    return True
+
+
+def infer_value_type(value):
+    """
+    Determines the value type a value is compared as when filtering by
+    attributes from its Python type.  Strings, numbers that don't fit the
+    field for their value type (see fits_value_type), and anything else that
+    isn't a number, boolean or datetime, are compared as text.
+    """
+
+    if isinstance(value, bool):
+        return 'boolean'
+    elif isinstance(value, numbers.Integral):
+        if fits_value_type('integer', value):
+            return 'integer'
+    elif isinstance(value, (decimal.Decimal, float)):
+        if fits_value_type('decimal', decimal.Decimal(force_unicode(value))):
+            return 'decimal'
+    elif isinstance(value, datetime.datetime):
+        return 'datetime'
+
+    return ''
+
+
+def infer_text_value_type(value):
+    """
+    Determines the value type a ModelAttribute stored as text reads as from
+    the text itself, to decide which typed value field its typed copy is
+    stored in.  Only text that reads back as the same value has a value type
+    (e.g., "42", "1.50", "True" or "2012-06-01 10:30:00"); anything else is
+    text.
+    """
+
+    if not value:
+        return ''
+    elif value in ('True', 'False'):
+        return 'boolean'
+    elif ATTRIBUTE_INTEGER_PATTERN.match(value):
+        return 'integer'
+    elif ATTRIBUTE_DECIMAL_PATTERN.match(value):
+        return 'decimal'
+
+    try:
+        if parse_datetime(value) is not None:
+            return 'datetime'
+    except ValueError:
+        pass
+
+    return ''
+
+
+def infer_typed_value(text_value):
+    """
+    Determines the typed copy stored for a ModelAttribute that has no value
+    type, from the text its value is stored as, returning a tuple of the
+    value type whose field it is stored in and the typed value, or
+    ('', None) if the text isn't a valid value of any type (see
+    infer_text_value_type).
+    """
+
+    value_type = infer_text_value_type(text_value)
+
+    if not value_type:
+        return ('', None)
+
+    try:
+        return (value_type, convert_value(value_type, text_value)[1])
+    except ValidationError:
+        return ('', None)
+
+
+def get_storable_datetime(value):
+    """
+    Makes a datetime aware or naive, in the default time zone, to match the
+    USE_TZ setting, as value_datetime only holds aware datetimes when time
+    zone support is enabled and naive ones otherwise.  A ValueError is raised
+    if the datetime doesn't exist or is ambiguous in the default time zone.
+    """
+
+    default_timezone = timezone.get_default_timezone()
+
+    if settings.USE_TZ and timezone.is_naive(value):
+        try:
+            return timezone.make_aware(value, default_timezone)
+        except Exception:
+            # pytz raises its own errors for datetimes skipped or repeated
+            # by a daylight saving time transition.
+            raise ValueError(value)
+    elif not settings.USE_TZ and timezone.is_aware(value):
+        return timezone.make_naive(value, default_timezone)
+
+    return value
+
+
+def convert_value(value_type, value):
+    """
+    Converts a value to the given value type, returning a tuple of the text
+    representation stored in ModelAttribute.value and the typed value stored
+    in the typed value field (None for text).
+
+    A ValidationError is raised if the value can't be converted, or doesn't
+    fit the field for the value type (see fits_value_type).
+    """
+
+    if not value_type:
+        return (force_unicode(value), None)
+
+    try:
+        if value_type == 'integer':
+            typed_value = int(value)
+        elif value_type == 'decimal':
+            typed_value = decimal.Decimal(force_unicode(value))
+        elif value_type == 'boolean':
+            if isinstance(value, bool):
+                typed_value = value
+            elif force_unicode(value).lower() in ATTRIBUTE_TRUE_VALUES:
+                typed_value = True
+            elif force_unicode(value).lower() in ATTRIBUTE_FALSE_VALUES:
+                typed_value = False
+            else:
+                raise ValueError(value)
+        elif value_type == 'datetime':
+            if isinstance(value, datetime.datetime):
+                typed_value = value
+            else:
+                typed_value = parse_datetime(force_unicode(value))
+
+                if typed_value is None:
+                    raise ValueError(value)
+
+            text_value = typed_value.isoformat()
+            typed_value = get_storable_datetime(typed_value)
+        else:
+            raise ValueError(value_type)
+
+        if not fits_value_type(value_type, typed_value):
+            raise ValueError(value)
+    except (ValueError, TypeError, decimal.InvalidOperation):
+        raise ValidationError(
+            '"%s" is not a valid %s value.' % (value, value_type)
+        )
+
+    if value_type == 'datetime':
+        return (text_value, typed_value)
+
+    return (force_unicode(typed_value), typed_value)
+
+
+def to_native_value(value_type, value):
+    """
+    Converts the text representation of a ModelAttribute value back to the
+    native Python type of its value type.
+    """
+
+    if not value_type:
+        return value
+
+    try:
+        return convert_value(value_type, value)[1]
+    except ValidationError:
+        return value
+
 
 class ModelAttributeManager(models.Manager):
     """
@@ -41,7 +341,8 @@ class ModelAttributeManager(models.Manager):
 
         # Only reset the ModelAttribute association if the object was created.
         if created and content_object and hasattr(content_object, 'set_attribute'):
-            content_object.set_attribute(obj.name, obj.value)
+            content_object.cache_attributes({obj.name: obj.native_value})
+            content_object.set_attribute(obj.name, obj.native_value)
 
         return (obj, created)
 
@@ -67,10 +368,342 @@ class ModelAttributeManager(models.Manager):
         ).create(**kwargs)
 
         if content_object and hasattr(content_object, 'set_attribute'):
-            content_object.set_attribute(obj.name, obj.value)
+            content_object.cache_attributes({obj.name: obj.native_value})
+            content_object.set_attribute(obj.name, obj.native_value)
 
         return obj
 
+    def values_for_objects(self, content_type, object_ids, names=None,
+                           using=None, fields=('object_id', 'name', 'value'),
+                           native=True):
+        """
+        Retrieves the name/value pairs of every ModelAttribute associated with
+        the given objects of a single content type, without instantiating any
+        ModelAttribute objects.
+
+        The object ids are queried in chunks of ATTRIBUTE_PREFETCH_CHUNK_SIZE,
+        so the number of queries issued is bounded by the number of chunks
+        rather than the number of objects.
+
+        Keyword arguments:
+        content_type -- the ContentType of the objects.
+        object_ids -- a list of primary keys of the objects.
+        names -- an optional list of attribute names to limit the results to.
+        using -- the database alias to query against.
+        fields -- the ModelAttribute fields included in each returned tuple.
+        native -- a boolean indicating whether or not the value should be
+                  converted to the native Python type of its value type.
+        """
+
+        fields = list(fields)
+        value_index = None
+
+        if native and 'value' in fields:
+            value_index = fields.index('value')
+            fields.append('value_type')
+
+        query_set = self.get_query_set()
+
+        if using:
+            query_set = query_set.using(using)
+
+        if names is not None:
+            query_set = query_set.filter(name__in=names)
+
+        object_ids = list(object_ids)
+
+        for start in range(0, len(object_ids), ATTRIBUTE_PREFETCH_CHUNK_SIZE):
+            chunk = object_ids[start:start + ATTRIBUTE_PREFETCH_CHUNK_SIZE]
+            rows = query_set.filter(
+                content_type=content_type,
+                object_id__in=chunk
+            ).values_list(*fields)
+
+            for row in rows:
+                if value_index is not None:
+                    row = list(row)
+                    value_type = row.pop()
+                    row[value_index] = to_native_value(
+                        value_type,
+                        row[value_index]
+                    )
+                    row = tuple(row)
+
+                yield row
+
+    @instrumented('bulk_create_attributes', rows=count_items)
+    def bulk_create_attributes(self, attributes, using=None):
+        """
+        Validates and inserts a list of unsaved ModelAttribute objects with as
+        few queries as possible, rather than calling save() on each of them.
+
+        Each ModelAttribute is cleaned in Python the same way ModelAttribute.save
+        would clean it, but the uniqueness of the names is checked with a
+        single query per chunk of objects, and all of the ModelAttributes are
+        inserted with bulk_create in a single transaction.  As with
+        bulk_create, no pre/post save signals are sent.
+
+        Keyword arguments:
+        attributes -- a list of unsaved ModelAttribute objects.
+        using -- the database alias to insert the ModelAttributes into.
+        """
+
+        attributes = list(attributes)
+
+        if not attributes:
+            return attributes
+
+        unique_fields = self.model._meta.unique_together[0]
+        keys = set()
+
+        for attribute in attributes:
+            # The content_type is excluded as validating it would issue a
+            # query for every ModelAttribute.
+            attribute.clean_fields(exclude=['content_type'])
+            attribute.clean()
+
+            key = (attribute.content_type_id, attribute.object_id, attribute.name)
+
+            if key in keys:
+                raise ValidationError({
+                    NON_FIELD_ERRORS: [
+                        attribute.unique_error_message(self.model, unique_fields)
+                    ]
+                })
+
+            keys.add(key)
+
+        query_set = self.get_query_set()
+
+        if using:
+            query_set = query_set.using(using)
+
+        object_ids = list(set(key[1] for key in keys))
+        names = set(key[2] for key in keys)
+
+        for start in range(0, len(object_ids), ATTRIBUTE_PREFETCH_CHUNK_SIZE):
+            existing = query_set.filter(
+                content_type__in=set(key[0] for key in keys),
+                object_id__in=object_ids[start:start + ATTRIBUTE_PREFETCH_CHUNK_SIZE],
+                name__in=names
+            ).values_list('content_type', 'object_id', 'name')
+
+            for key in existing:
+                if key in keys:
+                    raise ValidationError({
+                        NON_FIELD_ERRORS: [
+                            self.model(name=key[2]).unique_error_message(
+                                self.model,
+                                unique_fields
+                            )
+                        ]
+                    })
+
+        with managed_transaction(using=query_set.db):
+            query_set.bulk_create(
+                attributes,
+                batch_size=ATTRIBUTE_PREFETCH_CHUNK_SIZE
+            )
+            # The inserted ModelAttributes have no primary keys, so they are
+            # keyed by position instead.
+            attribute_journal.record_changes(
+                {},
+                dict(
+                    (index, attribute_journal.get_row(attribute))
+                    for index, attribute in enumerate(attributes)
+                ),
+                using=query_set.db
+            )
+
+            for content_type_id in set(key[0] for key in keys):
+                object_ids = set(
+                    key[1] for key in keys if key[0] == content_type_id
+                )
+                attribute_snapshot.refresh_snapshots(
+                    content_type_id,
+                    object_ids,
+                    using=query_set.db
+                )
+                attribute_cache.invalidate_attributes(
+                    content_type_id,
+                    object_ids,
+                    using=query_set.db
+                )
+
+        return attributes
+
+    @instrumented('bulk_update_values', rows=count_result)
+    def bulk_update_values(self, values, using=None, content_type_ids=None):
+        """
+        Changes the fields of many ModelAttributes at once, issuing a single
+        UPDATE statement with a CASE expression per field and batch of
+        ModelAttributes rather than one statement per ModelAttribute.  As with
+        QuerySet.update, save() is not called and no pre/post save signals
+        are sent.
+
+        ModelAttributes are batched together with others whose same fields
+        are being changed, ATTRIBUTE_UPDATE_BATCH_SIZE at a time when a
+        single field is changed and proportionally fewer when more fields are.
+
+        Keyword arguments:
+        values -- a dictionary mapping ModelAttribute primary keys to
+                  dictionaries of field names and their new values.
+        using -- the database alias to update the ModelAttributes in.
+        content_type_ids -- the ids of the content types of the
+                            ModelAttributes, if they are known, which spares
+                            reading their previous values when none of their
+                            models keeps a journal.
+
+        Returns the number of updated rows.
+        """
+
+        db = using or router.db_for_write(self.model)
+        pks = list(values.keys())
+
+        with managed_transaction(using=db):
+            previous = {}
+
+            for start in range(0, len(pks), ATTRIBUTE_PREFETCH_CHUNK_SIZE):
+                previous.update(attribute_journal.get_rows(
+                    self.get_query_set().using(db).filter(
+                        pk__in=pks[start:start + ATTRIBUTE_PREFETCH_CHUNK_SIZE]
+                    ),
+                    content_type_ids=content_type_ids
+                ))
+
+            count = bulk_update_rows(
+                self.model,
+                values,
+                using=db,
+                batch_size=ATTRIBUTE_UPDATE_BATCH_SIZE
+            )
+            attribute_journal.record_changes(
+                previous,
+                attribute_journal.get_updated_rows(previous, values),
+                using=db
+            )
+
+        return count
+
+    @instrumented('bulk_save_attributes')
+    def bulk_save_attributes(self, created=(), changed=(), deleted=(),
+                             using=None):
+        """
+        Saves a set of new, changed and deleted ModelAttribute objects at once
+        (e.g., the ones edited in a formset), in a single transaction.  The
+        deleted ModelAttributes are removed with a single DELETE statement per
+        chunk, the changed ones are updated with bulk_update_values and the
+        new ones are inserted with bulk_create_attributes.
+
+        The changed ModelAttributes are expected to have been cleaned already
+        (as a ModelForm does), so only the uniqueness of their names is
+        checked, with a single query per chunk of objects.  As with
+        bulk_create and QuerySet.update, save() and delete() are not called
+        and no signals are sent.
+
+        Keyword arguments:
+        created -- a list of unsaved ModelAttribute objects to insert.
+        changed -- a list of saved ModelAttribute objects to update.
+        deleted -- a list of saved ModelAttribute objects to delete.
+        using -- the database alias to save the ModelAttributes in.
+        """
+
+        changed = list(changed)
+        deleted = list(deleted)
+        db = using or router.db_for_write(self.model)
+        query_set = self.get_query_set().using(db)
+        opts = self.model._meta
+        unique_fields = opts.unique_together[0]
+        field_names = [
+            field.name for field in opts.fields
+            if field.name not in ('content_type', 'object_id')
+            and field is not opts.pk
+        ]
+        keys = set()
+
+        for attribute in changed:
+            key = (attribute.content_type_id, attribute.object_id, attribute.name)
+
+            if key in keys:
+                raise ValidationError({
+                    NON_FIELD_ERRORS: [
+                        attribute.unique_error_message(self.model, unique_fields)
+                    ]
+                })
+
+            keys.add(key)
+
+        # Names may only be taken by rows that are being changed or deleted
+        # themselves.
+        skipped_pks = set(obj.pk for obj in changed + deleted)
+        object_ids = list(set(key[1] for key in keys))
+
+        for start in range(0, len(object_ids), ATTRIBUTE_PREFETCH_CHUNK_SIZE):
+            existing = query_set.filter(
+                content_type__in=set(key[0] for key in keys),
+                object_id__in=object_ids[start:start + ATTRIBUTE_PREFETCH_CHUNK_SIZE],
+                name__in=set(key[2] for key in keys)
+            ).values_list('pk', 'content_type', 'object_id', 'name')
+
+            for row in existing:
+                if row[0] not in skipped_pks and row[1:] in keys:
+                    raise ValidationError({
+                        NON_FIELD_ERRORS: [
+                            self.model(name=row[3]).unique_error_message(
+                                self.model,
+                                unique_fields
+                            )
+                        ]
+                    })
+
+        with managed_transaction(using=db):
+            for start in range(0, len(deleted), ATTRIBUTE_PREFETCH_CHUNK_SIZE):
+                chunk_query_set = query_set.filter(pk__in=[
+                    obj.pk for obj in
+                    deleted[start:start + ATTRIBUTE_PREFETCH_CHUNK_SIZE]
+                ])
+                attribute_journal.record_changes(
+                    attribute_journal.get_rows(
+                        chunk_query_set,
+                        content_type_ids=[
+                            obj.content_type_id for obj in
+                            deleted[start:start + ATTRIBUTE_PREFETCH_CHUNK_SIZE]
+                        ]
+                    ),
+                    {},
+                    using=db
+                )
+                raw_delete(chunk_query_set)
+
+            self.bulk_update_values(
+                dict(
+                    (obj.pk, dict(
+                        (name, getattr(obj, name)) for name in field_names
+                    ))
+                    for obj in changed
+                ),
+                using=db,
+                content_type_ids=[obj.content_type_id for obj in changed]
+            )
+            self.bulk_create_attributes(created, using=db)
+
+            objects = {}
+
+            for obj in changed + deleted:
+                objects.setdefault(obj.content_type_id, set()).add(obj.object_id)
+
+            for content_type_id, object_ids in objects.items():
+                attribute_snapshot.refresh_snapshots(
+                    content_type_id,
+                    object_ids,
+                    using=db
+                )
+                attribute_cache.invalidate_attributes(
+                    content_type_id,
+                    object_ids,
+                    using=db
+                )
+
 
 class ModelAttribute(models.Model):
     """
@@ -82,7 +715,12 @@ class ModelAttribute(models.Model):
     enforced with a model validation method).  It will also be automatically
     lower-cased if it isn't already.
 
-    Values can be anything as they are stored in a TextField.
+    Values can be anything as they are stored in a TextField.  A value type
+    can optionally be given, in which case the value is validated and returned
+    as a native Python value.  A typed copy of every value that is valid for
+    its value type, or whose text reads as a valid value of some type when it
+    has none, is also stored in an indexed field (e.g., value_integer) so that
+    it can be filtered on in the database.
     """
 
     name = models.CharField(
@@ -97,49 +735,964 @@ class ModelAttribute(models.Model):
         verbose_name='Display Name'
     )
     value = models.TextField(blank=True, default='')
+    value_type = models.CharField(
+        blank=True,
+        default='',
+        max_length=16,
+        choices=ATTRIBUTE_VALUE_TYPE_CHOICES,
+        help_text='The type of the value. Values of any type other than text are validated and returned as native Python values.',
+        verbose_name='Value Type'
+    )
+    value_integer = models.BigIntegerField(
+        blank=True,
+        null=True,
+        db_index=True,
+        editable=False
+    )
+    value_decimal = models.DecimalField(
+        blank=True,
+        null=True,
+        db_index=True,
+        editable=False,
+        max_digits=ATTRIBUTE_DECIMAL_MAX_DIGITS,
+        decimal_places=ATTRIBUTE_DECIMAL_PLACES
+    )
+    value_boolean = models.NullBooleanField(db_index=True, editable=False)
+    value_datetime = models.DateTimeField(
+        blank=True,
+        null=True,
+        db_index=True,
+        editable=False
+    )
     content_type = models.ForeignKey(ContentType)
     object_id = models.PositiveIntegerField()
-    content_object = generic.GenericForeignKey('content_type', 'object_id')
+    content_object = base_generic.BaseGenericForeignKey('content_type', 'object_id')
+
+    objects = ModelAttributeManager()
+
+    class Meta:
+        # The content type and object id lead the index created for this
+        # constraint, as nearly every query for ModelAttributes filters on
+        # them.  Installs created with the former ('name', 'content_type',
+        # 'object_id') order can add the equivalent index with the
+        # upgrade_attribute_indexes management command.
+        unique_together = ('content_type', 'object_id', 'name')
+
+    def __unicode__(self):
+        return u'%s (%s): %s' % (self.display_name, self.name, self.value)
+
+    @property
+    def native_value(self):
+        """
+        The value converted to the native Python type of the value type.
+        """
+
+        return to_native_value(self.value_type, self.value)
+
+    def clean(self):
+        """
+        Model clean method to validate the value of "name" before saving any
+        changes to the model.  We only want valid names that could be turned
+        easily into Python attributes on an object.
+        """
+
+        # Lower case the value of name automatically.
+        self.name = self.name.lower()
+
+        if ATTRIBUTE_MODEL_NAME_PATTERN.match(self.name) is None:
+            raise ValidationError(
+                '"name" must be in the format of a Python object property (e.g., "my_property").'
+            )
+
+        # Now make sure we have a display name, and default to utilizing the
+        # name if none is present.
+        if not self.display_name:
+            self.display_name = ' '.join(
+                [word.capitalize() for word in self.name.split('_')]
+            )
+
+        # Finally, store the value as text along with a typed copy of it in
+        # the field for its value type, or for the type its text reads as
+        # when it wasn't given one.
+        field_values = get_value_fields(self.value_type, self.value)
+
+        for field_name, field_value in field_values.items():
+            setattr(self, field_name, field_value)
+
+    @instrumented('save', rows=count_one)
+    def save(self, *args, **kwargs):
+        """
+        Override the save method so that we ensure we're saving the model
+        fields properly.  By calling the full_clean method, anything that is
+        not correct will cause a ValidationError to be raised.
+        """
+
+        self.full_clean()
+        db = self._get_write_db(kwargs)
+
+        with managed_transaction(using=db):
+            previous = {}
+
+            if self.pk is not None:
+                previous = attribute_journal.get_rows(
+                    ModelAttribute.objects.using(db).filter(pk=self.pk),
+                    content_type_ids=[self.content_type_id]
+                )
+
+            result = super(ModelAttribute, self).save(*args, **kwargs)
+            attribute_journal.record_changes(
+                previous,
+                {self.pk: attribute_journal.get_row(self)},
+                using=db
+            )
+            self._attributes_changed()
+
+        return result
+
+    @instrumented('delete', rows=count_one)
+    def delete(self, *args, **kwargs):
+        """
+        Override the delete method so that the deletion is made in a
+        transaction along with rebuilding the attribute snapshot of the
+        associated object and invalidating its cached attributes, which the
+        post_delete receivers connected below take care of.
+        """
+
+        with managed_transaction(using=self._get_write_db(kwargs)):
+            result = super(ModelAttribute, self).delete(*args, **kwargs)
+
+        return result
+
+    def _get_write_db(self, kwargs):
+        return kwargs.get('using') or router.db_for_write(
+            self.__class__,
+            instance=self
+        )
+
+    def _attributes_changed(self):
+        """
+        Rebuilds the attribute snapshot of the associated object and removes
+        its attributes from the shared attribute cache after this
+        ModelAttribute was saved.
+        """
+
+        attribute_snapshot.refresh_snapshots(
+            self.content_type_id,
+            [self.object_id],
+            using=self._state.db
+        )
+        attribute_cache.invalidate_attributes(
+            self.content_type_id,
+            [self.object_id],
+            using=self._state.db
+        )
+
+
+class AttributeChangeManager(models.Manager):
+    """
+    Defines a custom ModelManager for reading the journal of changes to
+    ModelAttributes.
+    """
+
+    def changes_since(self, seq=0, limit=1000):
+        """
+        Retrieves the changes recorded after the given sequence number, in the
+        order they were recorded, as a list.  A consumer of the journal passes
+        the sequence number of the last change it has processed to receive
+        the next ones.
+
+        Keyword arguments:
+        seq -- the sequence number of the last change already processed.
+        limit -- the maximum number of changes to return.
+        """
+
+        return list(
+            self.get_query_set().filter(seq__gt=seq).order_by('seq')[:limit]
+        )
+
+
+class AttributeChange(models.Model):
+    """
+    Defines an entry of the append-only journal of changes made to the
+    ModelAttributes of models whose AttributeMeta class enables the journal
+    option (see django_base_model.journal).
+
+    The old value is empty for created attributes and the new value is empty
+    for deleted ones.
+    """
+
+    seq = models.AutoField(primary_key=True)
+    content_type = models.ForeignKey(ContentType)
+    object_id = models.PositiveIntegerField(db_index=True)
+    name = models.CharField(max_length=255)
+    operation = models.CharField(
+        max_length=6,
+        choices=ATTRIBUTE_CHANGE_OPERATION_CHOICES
+    )
+    old_value = models.TextField(null=True, blank=True)
+    old_value_type = models.CharField(
+        blank=True,
+        null=True,
+        max_length=16,
+        choices=ATTRIBUTE_VALUE_TYPE_CHOICES
+    )
+    new_value = models.TextField(null=True, blank=True)
+    new_value_type = models.CharField(
+        blank=True,
+        null=True,
+        max_length=16,
+        choices=ATTRIBUTE_VALUE_TYPE_CHOICES
+    )
+    time_created = models.DateTimeField(auto_now_add=True)
+
+    objects = AttributeChangeManager()
+
+    def __unicode__(self):
+        return u'%s %s (%s): %s -> %s' % (
+            self.operation,
+            self.name,
+            self.object_id,
+            self.old_value,
+            self.new_value
+        )
+
+    @classmethod
+    def from_rows(cls, operation, old, new):
+        """
+        Creates an unsaved change from the rows describing a ModelAttribute
+        before and after it was changed (see django_base_model.journal).
+        """
+
+        content_type_id, object_id, name = (old or new)[:3]
+
+        return cls(
+            content_type_id=content_type_id,
+            object_id=object_id,
+            name=name,
+            operation=operation,
+            old_value=old[3] if old else None,
+            old_value_type=old[4] if old else None,
+            new_value=new[3] if new else None,
+            new_value_type=new[4] if new else None
+        )
+
+    @property
+    def old_native_value(self):
+        if self.old_value is None:
+            return None
+
+        return to_native_value(self.old_value_type, self.old_value)
+
+    @property
+    def new_native_value(self):
+        if self.new_value is None:
+            return None
+
+        return to_native_value(self.new_value_type, self.new_value)
+
+
+# Deletions made with ModelAttribute.delete, QuerySet.delete and along with the
+# objects ModelAttributes belong to are all collected by Django and send this
+# signal from within their transaction.
+post_delete.connect(
+    attribute_journal.record_deletion,
+    sender=ModelAttribute,
+    dispatch_uid='django_base_model.journal.record_deletion'
+)
+post_delete.connect(
+    attribute_cache.invalidate_deleted_attributes,
+    sender=ModelAttribute,
+    dispatch_uid='django_base_model.cache.invalidate_deleted_attributes'
+)
+post_delete.connect(
+    attribute_snapshot.refresh_deleted_snapshot,
+    sender=ModelAttribute,
+    dispatch_uid='django_base_model.snapshot.refresh_deleted_snapshot'
+)
+
+
+def get_value_fields(value_type, value):
+    """
+    Retrieves a dictionary of the ModelAttribute fields to update when the
+    value of a ModelAttribute of the given value type is changed, with the
+    text representation and every typed value field.
+
+    Only values of an explicit value type are validated.  Text values are
+    stored as they are, with a typed copy in the field for the type their
+    text reads as, if any (see infer_typed_value), so that they can still be
+    filtered on in the database.
+    """
+
+    text_value, typed_value = convert_value(value_type, value)
+
+    if not value_type:
+        value_type, typed_value = infer_typed_value(text_value)
+
+    field_values = {'value': text_value}
+
+    for field_value_type, field_name in ATTRIBUTE_TYPED_VALUE_FIELDS.items():
+        if field_value_type == value_type:
+            field_values[field_name] = typed_value
+        else:
+            field_values[field_name] = None
+
+    return field_values
+
+
+@instrumented('load_attributes', rows=count_object_attributes)
+def load_attributes(model, object_ids, using=None):
+    """
+    Retrieves the attributes of the given objects of a model that inherits
+    from BaseModel as a dictionary mapping each object id to a dictionary of
+    name/value pairs.
+
+    If the model has cached attributes, the attribute sets found in the cache
+    are used and only the missing ones are queried for (and then cached).
+
+    Keyword arguments:
+    model -- the model of the objects, which must inherit from BaseModel.
+    object_ids -- a list of primary keys of the objects.
+    using -- the database alias to query against.
+    """
+
+    content_type = get_content_type(model, using)
+    object_ids = set(object_ids)
+    attributes = dict((object_id, {}) for object_id in object_ids)
+    use_cache = model.get_attribute_option('cache')
+
+    if use_cache and object_ids:
+        cached = attribute_cache.get_cached_attributes(
+            content_type.id,
+            object_ids
+        )
+        attributes.update(cached)
+        object_ids.difference_update(cached.keys())
+
+    for object_id, name, value in ModelAttribute.objects.values_for_objects(
+        content_type,
+        object_ids,
+        using=using
+    ):
+        attributes[object_id][name] = value
+
+    if use_cache and object_ids:
+        attribute_cache.set_cached_attributes(
+            content_type.id,
+            dict((object_id, attributes[object_id]) for object_id in object_ids)
+        )
+
+    return attributes
+
+
+def prefetch_attributes(instances, overwrite=False):
+    """
+    Loads the ModelAttributes of all of the given objects that inherit from
+    BaseModel and sets them up as properties on each object directly.
+
+    Rather than issuing one query per object as BaseModel.set_attributes does,
+    the attributes are retrieved with one query per content type and chunk of
+    objects, then grouped in memory by object.  Objects loaded with an
+    attribute snapshot aren't queried for at all.
+
+    Keyword arguments:
+    instances -- an iterable of objects that inherit from BaseModel.
+    overwrite -- A boolean flag that will set a property without regard for
+                 any existing value that may already be set.
+    """
+
+    groups = {}
+
+    for obj in instances:
+        if obj._has_attribute_snapshot():
+            # The attributes of objects that keep attribute snapshots were
+            # loaded along with them.
+            obj.set_attributes(overwrite=overwrite)
+        elif obj._get_pk_val() is not None:
+            key = (obj.__class__, obj._state.db)
+            groups.setdefault(key, []).append(obj)
+
+    for (model, db), objs in groups.items():
+        attributes = load_attributes(
+            model,
+            [obj._get_pk_val() for obj in objs],
+            using=db
+        )
+
+        for obj in objs:
+            obj._attribute_cache = obj._new_attribute_cache(
+                attributes[obj._get_pk_val()]
+            )
+            obj.set_attributes(overwrite=overwrite)
+
+
+def aprefetch_attributes(instances, overwrite=False,
+                         chunk_size=ATTRIBUTE_PREFETCH_CHUNK_SIZE):
+    """
+    Asynchronous counterpart of prefetch_attributes, which loads the
+    attributes of each chunk of objects concurrently on the pool of threads of
+    django_base_model.asynchronous.  Returns a future that is done once the
+    attributes of all of the objects have been set up.
+
+    Keyword arguments:
+    instances -- an iterable of objects that inherit from BaseModel.
+    overwrite -- A boolean flag that will set a property without regard for
+                 any existing value that may already be set.
+    chunk_size -- the number of objects whose attributes are loaded by each
+                  thread.
+    """
+
+    from django_base_model.asynchronous import gather, run_async
+
+    instances = list(instances)
+
+    return gather([
+        run_async(
+            prefetch_attributes,
+            instances[start:start + chunk_size],
+            overwrite=overwrite
+        )
+        for start in range(0, len(instances), chunk_size)
+    ])
+
+
+class BaseModelQuerySet(QuerySet):
+    """
+    Defines a QuerySet for models that inherit from BaseModel which can
+    optionally set up the ModelAttribute associations of each object as
+    properties while the QuerySet is being evaluated.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(BaseModelQuerySet, self).__init__(*args, **kwargs)
+        self._with_attributes = False
+        self._attributes_overwrite = False
+
+    def _clone(self, klass=None, setup=False, **kwargs):
+        kwargs.setdefault('_with_attributes', self._with_attributes)
+        kwargs.setdefault('_attributes_overwrite', self._attributes_overwrite)
+
+        return super(BaseModelQuerySet, self)._clone(
+            klass=klass,
+            setup=setup,
+            **kwargs
+        )
+
+    def iterator(self):
+        objs = super(BaseModelQuerySet, self).iterator()
+
+        if self._with_attributes:
+            objs = self._iterator_with_attributes(objs)
+
+        return objs
+
+    def _iterator_with_attributes(self, objs):
+        """
+        Wraps the given iterator of objects so that the ModelAttributes of
+        each chunk of ATTRIBUTE_PREFETCH_CHUNK_SIZE objects are loaded with a
+        single query before the objects are yielded.
+        """
+
+        chunk = []
+
+        for obj in objs:
+            chunk.append(obj)
+
+            if len(chunk) >= ATTRIBUTE_PREFETCH_CHUNK_SIZE:
+                prefetch_attributes(chunk, overwrite=self._attributes_overwrite)
+
+                for chunk_obj in chunk:
+                    yield chunk_obj
+
+                chunk = []
+
+        prefetch_attributes(chunk, overwrite=self._attributes_overwrite)
+
+        for chunk_obj in chunk:
+            yield chunk_obj
+
+    def with_attributes(self, overwrite=False):
+        """
+        Returns a new QuerySet that will set up the ModelAttribute associations
+        of each object as properties when it is evaluated.  The attributes are
+        loaded in batches rather than with one query per object, and the
+        QuerySet can still be sliced or filtered further.
+
+        Keyword arguments:
+        overwrite -- A boolean flag that will set a property without regard for
+                     any existing value that may already be set.
+        """
+
+        return self._clone(
+            _with_attributes=True,
+            _attributes_overwrite=overwrite
+        )
+
+    def iter_with_attributes(self, chunk_size=ATTRIBUTE_PREFETCH_CHUNK_SIZE,
+                             as_dicts=False, overwrite=False):
+        """
+        Iterates over the objects of the QuerySet with their ModelAttributes,
+        without evaluating or caching the whole QuerySet.  The objects are
+        retrieved chunk_size at a time in order of primary key, each chunk
+        with a query filtering on the last primary key of the previous chunk
+        followed by a single query for the ModelAttributes of the chunk, so
+        memory use is bounded by the chunk size however many objects there
+        are.
+
+        Any ordering of the QuerySet is replaced by the primary key, and the
+        QuerySet can't have been sliced.
+
+        Keyword arguments:
+        chunk_size -- the number of objects to retrieve with each query.
+        as_dicts -- a boolean indicating whether dictionaries of the field
+                    values of each object, with its attributes under the
+                    "attributes" key, should be yielded rather than objects.
+        overwrite -- A boolean flag that will set a property without regard for
+                     any existing value that may already be set.
+        """
+
+        assert self.query.can_filter(), \
+            "Cannot iterate over a QuerySet in chunks once a slice has been taken."
+
+        return self._iter_chunks_with_attributes(chunk_size, as_dicts, overwrite)
+
+    def _iter_chunks_with_attributes(self, chunk_size, as_dicts, overwrite):
+        pk_name = self.model._meta.pk.attname
+        query_set = self._clone(_with_attributes=False).order_by('pk')
+
+        if as_dicts:
+            query_set = query_set.values()
+
+        last_pk = None
+
+        while True:
+            chunk_query_set = query_set
+
+            if last_pk is not None:
+                chunk_query_set = chunk_query_set.filter(pk__gt=last_pk)
+
+            chunk = list(chunk_query_set[:chunk_size])
+
+            if not chunk:
+                return
+
+            if as_dicts:
+                last_pk = chunk[-1][pk_name]
+                attributes = load_attributes(
+                    self.model,
+                    [row[pk_name] for row in chunk],
+                    using=self.db
+                )
+
+                for row in chunk:
+                    row['attributes'] = attributes[row[pk_name]]
+            else:
+                last_pk = chunk[-1]._get_pk_val()
+                prefetch_attributes(chunk, overwrite=overwrite)
+
+            for item in chunk:
+                yield item
+
+            if len(chunk) < chunk_size:
+                return
+
+    def values_with_attributes(self, *fields, **kwargs):
+        """
+        Returns a list of dictionaries of the given field values of each
+        object (all of them if no fields are given, as with values), along
+        with the values of its attributes, without instantiating any objects.
+        Attributes an object doesn't have are None, so that every dictionary
+        has the same keys, and fields take precedence over attributes of the
+        same name.
+
+        When the attribute names are given, their values are selected with
+        subqueries in the same statement as the fields.  Otherwise all of the
+        attributes of the objects are retrieved with one more query per
+        chunk of ATTRIBUTE_PREFETCH_CHUNK_SIZE objects.
+
+        Keyword arguments:
+        attributes -- a list of the names of the attributes to include, or
+                      None to include every attribute any of the objects has.
+        """
+
+        names = kwargs.get('attributes', None)
+        fields = list(fields)
+
+        if names is not None:
+            return self._values_with_attribute_subqueries(fields, names)
+
+        pk_name = self.model._meta.pk.attname
+        added_pk = bool(fields) and pk_name not in fields and 'pk' not in fields
+        pk_key = 'pk' if 'pk' in fields else pk_name
+
+        if added_pk:
+            fields.append(pk_name)
+
+        rows = list(self._clone(_with_attributes=False).values(*fields))
+        attributes = load_attributes(
+            self.model,
+            [row[pk_key] for row in rows],
+            using=self.db
+        )
+
+        names = set()
+
+        for object_attributes in attributes.values():
+            names.update(object_attributes.keys())
+
+        for row in rows:
+            object_attributes = attributes[row[pk_key]]
+
+            for name in names:
+                row.setdefault(name, object_attributes.get(name))
+
+            if added_pk:
+                del row[pk_name]
+
+        return rows
+
+    def _values_with_attribute_subqueries(self, fields, names):
+        qn = connections[self.db].ops.quote_name
+        alias = qn('base_model_attribute')
+        opts = ModelAttribute._meta
+        # The select list must keep its order to match the order of the
+        # parameters of its subqueries.
+        select = SortedDict()
+        select_params = []
+        selected = []
+
+        for index, name in enumerate(names):
+            keys = []
+
+            for field_name in ('value', 'value_type'):
+                key = 'attribute_%s_%d' % (field_name, index)
+                sql, params = self._attribute_subquery(
+                    '%s.%s' % (alias, qn(opts.get_field(field_name).column)),
+                    name
+                )
+                select[key] = sql
+                select_params.extend(params)
+                keys.append(key)
+
+            selected.append((name, keys[0], keys[1]))
+
+        query_set = self._clone(_with_attributes=False).extra(
+            select=select,
+            select_params=select_params
+        )
+
+        if fields:
+            query_set = query_set.values(*(fields + list(select.keys())))
+        else:
+            query_set = query_set.values()
+
+        rows = list(query_set)
+
+        for row in rows:
+            for name, value_key, value_type_key in selected:
+                value = row.pop(value_key)
+                value_type = row.pop(value_type_key)
+
+                if value is not None:
+                    value = to_native_value(value_type, value)
+
+                row.setdefault(name, value)
+
+        return rows
+
+    def _attribute_subquery(self, select, name, condition='', params=()):
+        """
+        Builds a correlated subquery against the ModelAttributes of the
+        objects being queried, returning a tuple of its SQL and parameters.
+
+        Keyword arguments:
+        select -- the SQL of the subquery's select list.
+        name -- the name of the attribute.
+        condition -- an optional SQL condition on the ModelAttribute, whose
+                     columns are qualified with the base_model_attribute
+                     alias.
+        params -- the parameters of the condition.
+        """
+
+        connection = connections[self.db]
+        qn = connection.ops.quote_name
+        opts = ModelAttribute._meta
+        alias = qn('base_model_attribute')
+        sql = (
+            'SELECT %s FROM %s %s WHERE %s.%s = %%s AND %s.%s = %s.%s '
+            'AND %s.%s = %%s' % (
+                select,
+                qn(opts.db_table),
+                alias,
+                alias,
+                qn(opts.get_field('content_type').column),
+                alias,
+                qn(opts.get_field('object_id').column),
+                qn(self.model._meta.db_table),
+                qn(self.model._meta.pk.column),
+                alias,
+                qn(opts.get_field('name').column)
+            )
+        )
+
+        if condition:
+            sql = '%s AND %s' % (sql, condition)
+
+        content_type = get_content_type(self.model, self.db)
+
+        return (sql, [content_type.id, name] + list(params))
+
+    def _attribute_condition(self, key, value):
+        """
+        Compiles a single attribute filter (e.g., tier__gte=2) into an EXISTS
+        condition, returning a tuple of its SQL and parameters.
+
+        Numbers, booleans and datetimes are compared against the typed value
+        fields, and everything else against the text representation.  Range
+        lookups of integers and decimals compare against both numeric fields.
+        Exact and in lookups of numbers, booleans and datetimes also match
+        attributes whose text isn't a valid value of their type (e.g., "007")
+        by their text, but range lookups only match attributes with a typed
+        value.
+        """
+
+        if '__' in key:
+            name, lookup = key.rsplit('__', 1)
+        else:
+            name, lookup = key, 'exact'
+
+        if lookup not in ATTRIBUTE_FILTER_LOOKUPS:
+            raise FieldError(
+                "Unsupported lookup '%s' for attribute '%s'." % (lookup, name)
+            )
+
+        if lookup == 'isnull':
+            sql, params = self._attribute_subquery('1', name)
+
+            if value:
+                return ('NOT EXISTS (%s)' % sql, params)
+
+            return ('EXISTS (%s)' % sql, params)
+
+        connection = connections[self.db]
+        qn = connection.ops.quote_name
+        alias = qn('base_model_attribute')
+        opts = ModelAttribute._meta
+        value_type = ''
+
+        if lookup in ATTRIBUTE_TEXT_LOOKUPS:
+            field_name = 'value'
+        else:
+            if lookup == 'in':
+                value = list(value)
+                sample = value and value[0]
+            else:
+                sample = value
+
+            value_type = infer_value_type(sample)
+
+            if lookup == 'in' and value_type:
+                # The values are compared as text if any of them can't be
+                # stored as the value type of the first one.
+                try:
+                    for typed_value in value:
+                        convert_value(value_type, typed_value)
+                except ValidationError:
+                    value_type = ''
+
+            field_name = ATTRIBUTE_TYPED_VALUE_FIELDS.get(value_type, 'value')
+
+        field = opts.get_field(field_name)
+        fields = [field]
+
+        if field_name == 'value':
+            if lookup == 'in':
+                value = [force_unicode(v) for v in value]
+            else:
+                value = force_unicode(value)
+        elif (lookup in ATTRIBUTE_RANGE_LOOKUPS and
+              value_type in ATTRIBUTE_NUMERIC_VALUE_TYPES):
+            # Integers and decimals are compared with each other whichever
+            # field they are stored in, with the value prepared as a decimal
+            # so that it isn't truncated when compared with integers.
+            field = opts.get_field('value_decimal')
+            fields = [
+                opts.get_field(ATTRIBUTE_TYPED_VALUE_FIELDS[numeric_type])
+                for numeric_type in ATTRIBUTE_NUMERIC_VALUE_TYPES
+            ]
+
+        params = field.get_db_prep_lookup(lookup, value, connection=connection)
+
+        if lookup == 'in':
+            if not params:
+                return ('1 = 0', [])
+
+            operator = 'IN (%s)' % ', '.join(['%s'] * len(params))
+        else:
+            operator = connection.operators[lookup]
+
+        # As in WhereNode.make_atom, the column is cast for the lookup (e.g.,
+        # wrapped in UPPER for case-insensitive lookups on PostgreSQL).
+        condition = ' OR '.join(
+            '%s %s' % (
+                connection.ops.lookup_cast(lookup) % (
+                    '%s.%s' % (alias, qn(column_field.column))
+                ),
+                operator
+            )
+            for column_field in fields
+        )
+
+        if len(fields) > 1:
+            condition = '(%s)' % condition
+            params = list(params) * len(fields)
+
+        if field_name != 'value' and lookup in ('exact', 'in'):
+            # Match the text of the value (both as it's stored for the value
+            # type and as force_unicode renders it) in attributes stored as
+            # text as well.
+            texts = []
+
+            for typed_value in (value if lookup == 'in' else [value]):
+                for text in (
+                    convert_value(value_type, typed_value)[0],
+                    force_unicode(typed_value)
+                ):
+                    if text not in texts:
+                        texts.append(text)
+
+            condition = '(%s OR (%s.%s = %%s AND %s.%s IN (%s)))' % (
+                condition,
+                alias,
+                qn(opts.get_field('value_type').column),
+                alias,
+                qn(opts.get_field('value').column),
+                ', '.join(['%s'] * len(texts))
+            )
+            params = list(params) + [''] + texts
+
+        sql, params = self._attribute_subquery('1', name, condition, params)
+
+        return ('EXISTS (%s)' % sql, params)
+
+    def _attribute_conditions(self, conditions):
+        sql = []
+        params = []
+
+        for key, value in conditions.items():
+            condition_sql, condition_params = self._attribute_condition(
+                key,
+                value
+            )
+            sql.append(condition_sql)
+            params.extend(condition_params)
+
+        return (sql, params)
+
+    def filter_by_attributes(self, **conditions):
+        """
+        Returns a new QuerySet limited to the objects whose attributes match
+        all of the given conditions, which use the same syntax as filter
+        (e.g., filter_by_attributes(region='east', tier__in=[1, 2])).  Each
+        condition is compiled into an EXISTS subquery against the
+        ModelAttributes, so the filtering happens in the database within the
+        same statement.
+
+        Supported lookups are exact, iexact, contains, icontains, startswith,
+        istartswith, endswith, iendswith, gt, gte, lt, lte, in and isnull.
+        Numbers, booleans and datetimes are compared against the typed value
+        of the attributes.  Attributes stored as text also match exact and in
+        lookups by their text, but only attributes with the value type of
+        the value match range lookups (gt, gte, lt and lte).
+        """
+
+        sql, params = self._attribute_conditions(conditions)
+
+        return self.extra(where=sql, params=params)
+
+    def exclude_by_attributes(self, **conditions):
+        """
+        Returns a new QuerySet excluding the objects whose attributes match all
+        of the given conditions.  See filter_by_attributes for the syntax of
+        the conditions.
+        """
 
-    objects = ModelAttributeManager()
+        sql, params = self._attribute_conditions(conditions)
 
-    class Meta:
-        unique_together = ('name', 'content_type', 'object_id')
+        if not sql:
+            return self._clone()
 
-    def __unicode__(self):
-        return u'%s (%s): %s' % (self.display_name, self.name, self.value)
+        return self.extra(
+            where=['NOT (%s)' % ' AND '.join(sql)],
+            params=params
+        )
 
-    def clean(self):
-        """
-        Model clean method to validate the value of "name" before saving any
-        changes to the model.  We only want valid names that could be turned
-        easily into Python attributes on an object.
+    def order_by_attributes(self, *names, **kwargs):
         """
+        Returns a new QuerySet ordered by the values of the given attributes,
+        replacing any existing ordering.  As with order_by, a name prefixed
+        with "-" is ordered in descending order.
 
-        # Lower case the value of name automatically.
-        self.name = self.name.lower()
+        Each value is selected with a subquery in the same statement.  Values
+        are ordered as text unless the value type of the attribute is given,
+        in which case attributes whose values aren't valid values of that type
+        are ordered as if they were missing.
 
-        if ATTRIBUTE_MODEL_NAME_PATTERN.match(self.name) is None:
-            raise ValidationError(
-                '"name" must be in the format of a Python object property (e.g., "my_property").'
-            )
+        Keyword arguments:
+        value_types -- a dictionary mapping attribute names to their value
+                       types (e.g., {'tier': 'integer'}).
+        """
 
-        # Now make sure we have a display name, and default to utilizing the
-        # name if none is present.
-        if not self.display_name:
-            self.display_name = ' '.join(
-                [word.capitalize() for word in self.name.split('_')]
+        value_types = kwargs.get('value_types', {})
+        qn = connections[self.db].ops.quote_name
+        # The select list must keep its order to match the order of the
+        # parameters of its subqueries.
+        select = SortedDict()
+        select_params = []
+        order_by = []
+
+        for name in names:
+            attribute_name = name.lstrip('-')
+            field_name = ATTRIBUTE_TYPED_VALUE_FIELDS.get(
+                value_types.get(attribute_name),
+                'value'
+            )
+            select_name = 'attribute_order_%s' % attribute_name
+            sql, params = self._attribute_subquery(
+                '%s.%s' % (
+                    qn('base_model_attribute'),
+                    qn(ModelAttribute._meta.get_field(field_name).column)
+                ),
+                attribute_name
             )
+            select[select_name] = sql
+            select_params.extend(params)
+            order_by.append(name[:-len(attribute_name)] + select_name)
+
+        return self.extra(
+            select=select,
+            select_params=select_params,
+            order_by=order_by
+        )
 
-    def save(self, *args, **kwargs):
+    def audited_update(self, user, **fields):
         """
-        Override the save method so that we ensure we're saving the model
-        fields properly.  By calling the full_clean method, anything that is
-        not correct will cause a ValidationError to be raised.
+        Updates the given fields of every object in the QuerySet with a single
+        UPDATE statement, as update does, and stamps their time_modified and
+        last_modified_by fields in the same statement, which update would
+        otherwise leave as they were.  As with update, save() is not called
+        and no pre/post save signals are sent.
+
+        Returns the number of updated rows.
+
+        Keyword arguments:
+        user -- the User making the change, or None if it isn't being made
+                by any User in particular (e.g., by a scheduled job).
         """
 
-        self.full_clean()
-        return super(ModelAttribute, self).save(*args, **kwargs)
+        fields['time_modified'] = timezone.now()
+        fields['last_modified_by'] = user
+
+        return self.update(**fields)
 
 
 class BaseModelManager(models.Manager):
@@ -156,11 +1709,25 @@ class BaseModelManager(models.Manager):
         """
 
         obj = super(BaseModelManager, self).get(*args, **kwargs)
-        obj.set_attributes()
+
+        # Models with lazy attributes set them up on first access instead.
+        if not obj.get_attribute_option('lazy'):
+            obj.set_attributes()
 
         return obj
 
-    def get_or_create(self, attributes=None, attribute_names=None, **kwargs):
+    def aget(self, *args, **kwargs):
+        """
+        Asynchronous counterpart of get, run on the pool of threads of
+        django_base_model.asynchronous.  Returns a future of the object.
+        """
+
+        from django_base_model.asynchronous import run_async
+
+        return run_async(self.get, *args, **kwargs)
+
+    def get_or_create(self, attributes=None, attribute_names=None,
+                      bulk_attributes=True, **kwargs):
         """
         Overwritten get_or_create method to support creating ModelAttribute
         associations automatically when creating an object that inherits from
@@ -170,20 +1737,26 @@ class BaseModelManager(models.Manager):
         Keyword arguments:
         attributes -- a dictionary of name/value pairs.
         attribute_names -- a list of attribute names.
+        bulk_attributes -- a boolean indicating whether or not the attributes
+                           should be inserted in bulk; set it to False if you
+                           rely on ModelAttribute.save() or its signals.
         """
 
         obj, created = super(BaseModelManager, self).get_or_create(**kwargs)
 
         # Only create the attributes if the object was created.
         if created:
+            obj.cache_attributes(None)
             obj.create_attributes(
                 attributes=attributes,
-                attribute_names=attribute_names
+                attribute_names=attribute_names,
+                bulk=bulk_attributes
             )
 
         return (obj, created)
 
-    def create(self, attributes=None, attribute_names=None, **kwargs):
+    def create(self, attributes=None, attribute_names=None,
+               bulk_attributes=True, **kwargs):
         """
         Overwritten create method to support creating ModelAttribute
         associations automatically when creating an object that inherits from
@@ -193,33 +1766,307 @@ class BaseModelManager(models.Manager):
         Keyword arguments:
         attributes -- a dictionary of name/value pairs.
         attribute_names -- a list of attribute names.
+        bulk_attributes -- a boolean indicating whether or not the attributes
+                           should be inserted in bulk; set it to False if you
+                           rely on ModelAttribute.save() or its signals.
         """
 
         obj = super(BaseModelManager, self).create(**kwargs)
 
+        # A newly created object can't have any attributes yet, so there is
+        # no need to query for them later on.
+        obj.cache_attributes(None)
         obj.create_attributes(
             attributes=attributes,
-            attribute_names=attribute_names
+            attribute_names=attribute_names,
+            bulk=bulk_attributes
         )
 
         return obj
 
+    def get_query_set(self):
+        return BaseModelQuerySet(self.model, using=self._db)
+
+    @instrumented('bulk_get_attributes', rows=count_object_attributes)
+    def bulk_get_attributes(self, objs, names=None):
+        """
+        Retrieves the attributes of many objects at once with a single query
+        per chunk of ATTRIBUTE_PREFETCH_CHUNK_SIZE objects.
+
+        Returns a dictionary mapping the primary key of each object to a
+        dictionary of its attribute name/value pairs.
+
+        Keyword arguments:
+        objs -- a list of objects or primary keys of objects of this manager's
+                model.
+        names -- an optional list of attribute names to limit the results to.
+        """
+
+        db = self.db
+        pks = set(getattr(obj, 'pk', obj) for obj in objs)
+
+        if names is None:
+            return load_attributes(self.model, pks, using=db)
+
+        attributes = dict((pk, {}) for pk in pks)
+
+        for object_id, name, value in ModelAttribute.objects.values_for_objects(
+            get_content_type(self.model, db),
+            pks,
+            names=names,
+            using=db
+        ):
+            attributes[object_id][name] = value
+
+        return attributes
+
+    @instrumented('bulk_set_attributes', rows=count_changes)
+    def bulk_set_attributes(self, attributes, create=True):
+        """
+        Sets the attributes of many objects at once, updating the
+        ModelAttributes that already exist and, if create is True, creating
+        the ones that don't.
+
+        Existing values are read with one query per chunk of objects, changed
+        values are written with one UPDATE per batch of ModelAttributes and
+        new ModelAttributes are inserted in bulk, all in a single transaction,
+        so the number of statements does not grow with the number of objects.
+        No save signals are sent for the ModelAttributes.
+
+        Returns a dictionary with the number of attributes that were created,
+        updated and left unchanged.
+
+        Keyword arguments:
+        attributes -- a dictionary mapping primary keys of objects of this
+                      manager's model to dictionaries of name/value pairs.
+        create -- a boolean indicating whether or not attributes that don't
+                  exist should be created.
+        """
+
+        summary = {'created': 0, 'updated': 0, 'unchanged': 0}
+
+        if not attributes:
+            return summary
+
+        db = router.db_for_write(ModelAttribute)
+        content_type = get_content_type(self.model, self.db)
+        names = set()
+
+        for values in attributes.values():
+            names.update(values.keys())
+
+        existing = {}
+        changed_object_ids = set()
+        changed_values = {}
+        missing = []
+
+        with managed_transaction(using=db):
+            for pk, object_id, name, value, value_type in (
+                ModelAttribute.objects.values_for_objects(
+                    content_type,
+                    attributes.keys(),
+                    names=names,
+                    using=db,
+                    fields=('pk', 'object_id', 'name', 'value', 'value_type'),
+                    native=False
+                )
+            ):
+                existing[(object_id, name)] = (pk, value, value_type)
+
+            for object_id, values in attributes.items():
+                for name, value in values.items():
+                    if (object_id, name) in existing:
+                        pk, current_value, value_type = existing[
+                            (object_id, name)
+                        ]
+                        field_values = get_value_fields(value_type, value)
+
+                        if field_values['value'] != current_value:
+                            changed_values[pk] = field_values
+                            changed_object_ids.add(object_id)
+                            summary['updated'] += 1
+                        else:
+                            summary['unchanged'] += 1
+                    elif create:
+                        missing.append(
+                            ModelAttribute(
+                                name=name,
+                                value=value,
+                                content_type=content_type,
+                                object_id=object_id
+                            )
+                        )
+
+            if changed_values:
+                ModelAttribute.objects.bulk_update_values(
+                    changed_values,
+                    using=db,
+                    content_type_ids=[content_type.id]
+                )
+                attribute_snapshot.refresh_snapshots(
+                    content_type.id,
+                    changed_object_ids,
+                    using=db
+                )
+
+            if missing:
+                ModelAttribute.objects.bulk_create_attributes(
+                    missing,
+                    using=db
+                )
+                summary['created'] = len(missing)
+
+        attribute_cache.invalidate_attributes(
+            content_type.id,
+            changed_object_ids,
+            using=db
+        )
+
+        return summary
+
+    def audited_update(self, user, **fields):
+        """
+        Updates the given fields of every object of the model, stamping their
+        time_modified and last_modified_by fields in the same statement.  See
+        BaseModelQuerySet.audited_update.
+        """
+
+        return self.get_query_set().audited_update(user, **fields)
+
+    def audited_bulk_update(self, objs, fields, user,
+                            batch_size=AUDITED_UPDATE_BATCH_SIZE):
+        """
+        Saves the given fields of many objects at once, issuing a single
+        UPDATE statement with a CASE expression per field and batch of objects
+        rather than calling save() on each of them.  The time_modified and
+        last_modified_by fields of every object are stamped in the same
+        statements, and on the objects themselves.  As with QuerySet.update,
+        no pre/post save signals are sent.  For a model using multi-table
+        inheritance, the fields of each table, including the audit fields in
+        the table of the parent model, are updated with their own statements.
+
+        Returns the number of updated rows.
+
+        Keyword arguments:
+        objs -- saved objects of this manager's model.
+        fields -- the names of the fields whose values should be saved.
+        user -- the User making the change, or None if it isn't being made
+                by any User in particular (e.g., by a scheduled job).
+        batch_size -- the number of objects to update per statement when a
+                      single field is saved.
+        """
+
+        objs = list(objs)
+
+        if not objs:
+            return 0
+
+        if any(obj.pk is None for obj in objs):
+            raise ValueError(
+                'audited_bulk_update() can only be used with saved objects.'
+            )
+
+        opts = self.model._meta
+        fields = [
+            opts.get_field(name) for name in fields
+            if name not in ('time_modified', 'last_modified_by')
+        ]
+        now = timezone.now()
+
+        for obj in objs:
+            obj.time_modified = now
+            obj.last_modified_by = user
+
+        return bulk_update_rows(
+            self.model,
+            dict(
+                (
+                    obj.pk,
+                    dict(
+                        (field.name, getattr(obj, field.attname))
+                        for field in fields
+                    )
+                )
+                for obj in objs
+            ),
+            using=self._db or router.db_for_write(self.model),
+            batch_size=batch_size,
+            common_values={
+                'time_modified': now,
+                'last_modified_by': user.pk if user is not None else None
+            }
+        )
+
+    def filter_by_attributes(self, **conditions):
+        """
+        Returns a QuerySet limited to the objects whose attributes match all of
+        the given conditions.  See BaseModelQuerySet.filter_by_attributes.
+        """
+
+        return self.get_query_set().filter_by_attributes(**conditions)
+
+    def exclude_by_attributes(self, **conditions):
+        """
+        Returns a QuerySet excluding the objects whose attributes match all of
+        the given conditions.  See BaseModelQuerySet.filter_by_attributes.
+        """
+
+        return self.get_query_set().exclude_by_attributes(**conditions)
+
+    def order_by_attributes(self, *names, **kwargs):
+        """
+        Returns a QuerySet ordered by the values of the given attributes.  See
+        BaseModelQuerySet.order_by_attributes.
+        """
+
+        return self.get_query_set().order_by_attributes(*names, **kwargs)
+
+    def with_attributes(self, overwrite=False):
+        """
+        Returns a QuerySet that will set up the ModelAttribute associations of
+        each object as properties when it is evaluated.
+
+        Keyword arguments:
+        overwrite -- A boolean flag that will set a property without regard for
+                     any existing value that may already be set.
+        """
+
+        return self.get_query_set().with_attributes(overwrite=overwrite)
+
+    def iter_with_attributes(self, chunk_size=ATTRIBUTE_PREFETCH_CHUNK_SIZE,
+                             as_dicts=False, overwrite=False):
+        """
+        An extra method to iterate over all of the objects of the model with
+        their ModelAttributes in chunks, for exporting or processing more
+        objects than fit in memory.  See BaseModelQuerySet.iter_with_attributes.
+        """
+
+        return self.get_query_set().iter_with_attributes(
+            chunk_size=chunk_size,
+            as_dicts=as_dicts,
+            overwrite=overwrite
+        )
+
+    def values_with_attributes(self, *fields, **kwargs):
+        """
+        Returns a list of dictionaries of the given field values and the
+        attributes of every object of the model, without instantiating any
+        objects.  See BaseModelQuerySet.values_with_attributes.
+        """
+
+        return self.get_query_set().values_with_attributes(*fields, **kwargs)
+
     def all_with_attributes(self, *args, **kwargs):
         """
         An extra all method to support adding ModelAttribute associations
         to each object in the QuerySet automatically when filtering on an
         object that inherits from BaseModel.
 
-        This is a separate method as it may be expensive to run due to the
-        evaluation of the query set being returned.
+        The QuerySet is not evaluated here; the attributes are loaded in
+        batches once it is iterated over.
         """
 
-        query_set = super(BaseModelManager, self).all(*args, **kwargs)
-
-        for obj in query_set:
-            obj.set_attributes()
-
-        return query_set
+        return self.with_attributes().all(*args, **kwargs)
 
     def filter_with_attributes(self, *args, **kwargs):
         """
@@ -227,16 +2074,22 @@ class BaseModelManager(models.Manager):
         to each object in the QuerySet automatically when filtering on an
         object that inherits from BaseModel.
 
-        This is a separate method as it may be expensive to run due to the
-        evaluation of the query set being returned.
+        The QuerySet is not evaluated here; the attributes are loaded in
+        batches once it is iterated over.
         """
 
-        query_set = super(BaseModelManager, self).filter(*args, **kwargs)
+        return self.with_attributes().filter(*args, **kwargs)
 
-        for obj in query_set:
-            obj.set_attributes()
+    def afilter_with_attributes(self, *args, **kwargs):
+        """
+        Asynchronous counterpart of filter_with_attributes, which evaluates
+        the QuerySet on the pool of threads of django_base_model.asynchronous.
+        Returns a future of the list of objects.
+        """
 
-        return query_set
+        from django_base_model.asynchronous import run_async
+
+        return run_async(list, self.filter_with_attributes(*args, **kwargs))
 
     def exclude_with_attributes(self, *args, **kwargs):
         """
@@ -244,16 +2097,11 @@ class BaseModelManager(models.Manager):
         to each object in the QuerySet automatically when filtering by
         exclusion on an object that inherits from BaseModel.
 
-        This is a separate method as it may be expensive to run due to the
-        evaluation of the query set being returned.
+        The QuerySet is not evaluated here; the attributes are loaded in
+        batches once it is iterated over.
         """
 
-        query_set = super(BaseModelManager, self).exclude(*args, **kwargs)
-
-        for obj in query_set:
-            obj.set_attributes()
-
-        return query_set
+        return self.with_attributes().exclude(*args, **kwargs)
 
 
 class BaseModel(models.Model):
@@ -278,13 +2126,284 @@ class BaseModel(models.Model):
     class Meta:
         abstract = True
 
+    class AttributeMeta:
+        """
+        Options controlling how the attributes of a model that inherits from
+        BaseModel are handled.  A model can change them by defining its own
+        AttributeMeta class; any option it leaves out keeps its default.
+
+        lazy -- if True, BaseModelManager.get will not set up the attributes
+                as properties; instead they are all loaded the first time an
+                unknown property is accessed on the object.
+        cache -- if True, the attributes of each object are stored in the
+                 cache named by the BASE_MODEL_ATTRIBUTE_CACHE setting so that
+                 they can be shared between processes (see
+                 django_base_model.cache).
+        compact -- if True, the attributes of each object are kept in a
+                   CompactAttributes container whose names are shared by all
+                   of the model's objects, rather than as a property per
+                   attribute, and are resolved from it on access (see
+                   django_base_model.compact).
+        journal -- if True, every change to the attributes of each object is
+                   recorded as an AttributeChange, so that other systems can
+                   follow them incrementally (see django_base_model.journal).
+        """
+
+        lazy = False
+        cache = False
+        compact = False
+        journal = False
+
+    def __getattr__(self, name):
+        """
+        Resolves attributes on first access for models with lazy or compact
+        attributes.  This is only called when normal attribute lookup fails,
+        so real fields and properties are never shadowed by an attribute.
+        """
+
+        if not name.startswith('_'):
+            cache = self.__dict__.get('_attribute_cache')
+
+            if cache is None and self.get_attribute_option('compact'):
+                cache = self._get_attribute_cache()
+
+            if isinstance(cache, CompactAttributes):
+                try:
+                    return cache[name]
+                except KeyError:
+                    pass
+            elif self.get_attribute_option('lazy'):
+                self.set_attributes()
+
+                try:
+                    return self.__dict__[name]
+                except KeyError:
+                    pass
+
+        raise AttributeError(
+            "'%s' object has no attribute '%s'" % (
+                self.__class__.__name__,
+                name
+            )
+        )
+
+    @classmethod
+    def get_attribute_option(cls, name):
+        """
+        Retrieves the value of an option from the model's AttributeMeta class,
+        falling back to the default from BaseModel.AttributeMeta.
+        """
+
+        return getattr(
+            cls.AttributeMeta,
+            name,
+            getattr(BaseModel.AttributeMeta, name)
+        )
+
+    def has_real_attribute(self, name):
+        """
+        Determines whether or not the object has a property of the given name
+        without resolving lazy attributes, which is what decides whether an
+        attribute may be set up as a property without overwriting anything.
+        """
+
+        try:
+            object.__getattribute__(self, name)
+        except AttributeError:
+            return False
+
+        return True
+
+    @instrumented('get_attributes_as_dict', rows=count_items)
     def get_attributes_as_dict(self):
         """
         Retrieves all attributes associated with the model that inherits from
         this BaseModel class and returns them as a dictionary.
+
+        The attributes are only queried for the first time they are needed;
+        afterwards they are served from a cache on the object until
+        refresh_attributes is called.
+        """
+
+        return dict(self._get_attribute_cache())
+
+    def aget_attributes_as_dict(self):
+        """
+        Asynchronous counterpart of get_attributes_as_dict, run on the pool of
+        threads of django_base_model.asynchronous.  Returns a future of the
+        dictionary of attributes.
+        """
+
+        from django_base_model.asynchronous import run_async
+
+        return run_async(self.get_attributes_as_dict)
+
+    def _get_attribute_cache(self):
+        """
+        Retrieves the dictionary of attribute name/value pairs cached on the
+        object, loading it from the object's attribute snapshot or the
+        database if it hasn't been yet.
+        """
+
+        if '_attribute_cache' not in self.__dict__:
+            if self._get_pk_val() is None:
+                rows = []
+            else:
+                prefetched = getattr(self, '_prefetched_objects_cache', {})
+
+                if self._has_attribute_snapshot():
+                    rows = attribute_snapshot.load_snapshot(
+                        self._get_attribute_snapshot()
+                    ).items()
+                elif 'attributes' in prefetched:
+                    rows = [
+                        (attribute.name, attribute.native_value)
+                        for attribute in prefetched['attributes']
+                    ]
+                else:
+                    rows = load_attributes(
+                        self.__class__,
+                        [self._get_pk_val()],
+                        using=self._state.db
+                    )[self._get_pk_val()].items()
+
+            self._attribute_cache = self._new_attribute_cache(rows)
+
+        return self._attribute_cache
+
+    def _new_attribute_cache(self, attributes=()):
+        """
+        Creates the container the attributes of the object are cached in: a
+        CompactAttributes for models with compact attributes, or a dictionary
+        otherwise.
+
+        Keyword arguments:
+        attributes -- a dictionary or iterable of name/value pairs.
+        """
+
+        if self.get_attribute_option('compact'):
+            return CompactAttributes(get_key_table(self.__class__), attributes)
+
+        return dict(attributes)
+
+    def cache_attributes(self, attributes):
+        """
+        Keeps the cached attributes of the object coherent after attributes
+        have been created or changed in the database.  Nothing is cached if
+        the attributes have not been loaded yet.
+
+        Keyword arguments:
+        attributes -- a dictionary of name/value pairs, or None to record that
+                      the object has no attributes at all.
+        """
+
+        if attributes is None:
+            self._attribute_cache = self._new_attribute_cache()
+        elif '_attribute_cache' in self.__dict__ or self._has_attribute_snapshot():
+            self._get_attribute_cache().update(attributes)
+
+    def uncache_attributes(self, names=None):
+        """
+        Keeps the cached attributes of the object coherent after attributes
+        have been deleted from the database.
+
+        Keyword arguments:
+        names -- a list of the deleted attribute names, or None if all of the
+                 attributes were deleted.
+        """
+
+        if names is None:
+            self._attribute_cache = self._new_attribute_cache()
+        elif '_attribute_cache' in self.__dict__ or self._has_attribute_snapshot():
+            cache = self._get_attribute_cache()
+
+            for name in names:
+                cache.pop(name, None)
+
+    def _get_attribute_snapshot(self):
+        """
+        Retrieves the attribute snapshot loaded with the object, or an empty
+        string if the model doesn't keep snapshots.
+        """
+
+        field = attribute_snapshot.get_snapshot_field(self.__class__)
+
+        if field is None:
+            return ''
+
+        return self.__dict__.get(field.attname) or ''
+
+    def _has_attribute_snapshot(self):
+        """
+        Determines whether or not the attributes of the object can be loaded
+        from an attribute snapshot without a query.
+        """
+
+        return bool(self._get_attribute_snapshot())
+
+    def _attributes_changed(self):
+        """
+        Rebuilds the attribute snapshot of the object and removes its
+        attributes from the shared attribute cache after they have been
+        changed without ModelAttribute.save or delete.
         """
 
-        return {name: value for name, value in self.attributes.values_list('name', 'value')}
+        content_type = get_content_type(
+            self.__class__,
+            self._state.db
+        )
+
+        db = router.db_for_write(ModelAttribute, instance=self)
+
+        attribute_snapshot.refresh_snapshots(
+            content_type.id,
+            [self._get_pk_val()],
+            using=db
+        )
+        attribute_cache.invalidate_attributes(
+            content_type.id,
+            [self._get_pk_val()],
+            using=db
+        )
+
+    def get_cached_attribute_names(self):
+        """
+        Retrieves the names of the attributes cached on the object, without
+        loading them if they haven't been yet.
+        """
+
+        return list(self.__dict__.get('_attribute_cache', {}).keys())
+
+    def unset_attributes(self, names):
+        """
+        Removes the properties that were set up for the given attributes from
+        the object, usually after the attributes have been deleted.  Real
+        fields of the model are never removed.
+
+        Keyword arguments:
+        names -- a list of attribute names.
+        """
+
+        field_names = set(field.attname for field in self._meta.fields)
+
+        for name in names:
+            if name not in field_names and not name.startswith('_'):
+                self.__dict__.pop(name, None)
+
+    @instrumented('refresh_attributes')
+    def refresh_attributes(self):
+        """
+        Invalidates the cached attributes of the object so that they are
+        queried again the next time they are needed.
+        """
+
+        self.__dict__.pop('_attribute_cache', None)
+        field = attribute_snapshot.get_snapshot_field(self.__class__)
+
+        if field is not None:
+            # The snapshot the object was loaded with may be outdated as well.
+            # It is never written back when the object is saved.
+            self.__dict__[field.attname] = ''
 
     def set_attribute(self, name, value, overwrite=False):
         """
@@ -298,9 +2417,19 @@ class BaseModel(models.Model):
                      any existing value that may already be set.
         """
 
-        if overwrite or not hasattr(self, name):
+        if self.get_attribute_option('compact'):
+            # Attributes are resolved from the cached attributes instead, which
+            # are loaded first so that the value isn't lost if they haven't
+            # been yet.
+            if self.has_real_attribute(name):
+                if overwrite:
+                    setattr(self, name, value)
+            else:
+                self._get_attribute_cache()[name] = value
+        elif overwrite or not self.has_real_attribute(name):
             setattr(self, name, value)
 
+    @instrumented('set_attributes')
     def set_attributes(self, overwrite=False):
         """
         Loops through all associated ModelAttribute objects and sets them up as
@@ -311,11 +2440,22 @@ class BaseModel(models.Model):
                      any existing value that may already be set.
         """
 
-        for attribute in self.attributes.all():
-            if attribute.name:
-                if overwrite or not hasattr(self, attribute.name):
-                    setattr(self, attribute.name, attribute.value)
+        for name, value in self._get_attribute_cache().items():
+            if name:
+                self.set_attribute(name, value, overwrite=overwrite)
+
+    def aset_attributes(self, overwrite=False):
+        """
+        Asynchronous counterpart of set_attributes, run on the pool of threads
+        of django_base_model.asynchronous.  Returns a future that is done once
+        the attributes have been set up.
+        """
+
+        from django_base_model.asynchronous import run_async
+
+        return run_async(self.set_attributes, overwrite=overwrite)
 
+    @instrumented('create_attributes')
     def create_attributes(self, **kwargs):
         """
         Given a dictionary or list of attributes, creates a series of
@@ -325,40 +2465,118 @@ class BaseModel(models.Model):
         If attributes is present in the kwargs, attribute_names will be
         ignored.
 
+        If bulk is present in the kwargs and True, the ModelAttribute objects
+        are validated together and inserted with a single bulk insert instead
+        of being saved one at a time, in which case no save signals are sent.
+
+        While attribute writes are being buffered (see
+        django_base_model.buffer), the attributes are only set as properties
+        and created when the buffer is flushed.
+
         Keyword arguments:
         attributes -- a dictionary of name/value pairs.
         attribute_names -- a list of attribute names.
+        bulk -- a boolean indicating whether or not the attributes should be
+                inserted in bulk.
         """
 
         attributes = kwargs.get('attributes', None)
         attribute_names = kwargs.get('attribute_names', None)
+        bulk = kwargs.get('bulk', False)
+        buffer = get_current_buffer()
+
+        if buffer is not None and self._get_pk_val() is not None:
+            if not attributes:
+                attributes = dict((name, '') for name in attribute_names or ())
+
+            buffer.write(self, attributes, create=True)
+        elif bulk:
+            if attributes:
+                items = attributes.items()
+            else:
+                items = [(name, '') for name in attribute_names or ()]
+
+            content_type = get_content_type(
+                self.__class__,
+                self._state.db
+            )
+            model_attributes = ModelAttribute.objects.bulk_create_attributes(
+                [
+                    ModelAttribute(
+                        name=name,
+                        value=value,
+                        content_type=content_type,
+                        object_id=self._get_pk_val()
+                    )
+                    for name, value in items
+                ],
+                using=router.db_for_write(ModelAttribute, instance=self)
+            )
+
+            self.cache_attributes(
+                dict(
+                    (model_attribute.name, model_attribute.native_value)
+                    for model_attribute in model_attributes
+                )
+            )
 
-        if attributes:
+            for model_attribute in model_attributes:
+                self.set_attribute(
+                    model_attribute.name,
+                    model_attribute.native_value
+                )
+        elif attributes:
             for name, value in attributes.items():
                 self.attributes.create(self, name=name, value=value)
         elif attribute_names:
             for name in attribute_names:
                 self.attributes.create(self, name=name)
 
+    @instrumented('delete_attributes')
     def delete_attributes(self, **kwargs):
         """
-        Deletes all associated ModelAttribute objects with the object.
+        Deletes all associated ModelAttribute objects with the object and
+        removes the properties that were set up for them.
 
         If attribute_names is present in the kwargs, then only the attributes
         whose names are given will be deleted.
 
+        As with the clear() method of the attributes manager, the
+        ModelAttributes are deleted with a single DELETE statement and the
+        attribute snapshot and cached attributes of the object are refreshed
+        once, so no delete() method is called and no delete signals are sent.
+
         Keyword arugments:
         attribute_names -- a list of attribute names.
         """
 
-        attributes = self.attributes.all()
+        db = router.db_for_write(ModelAttribute, instance=self)
+        attributes = self.attributes._owned_query_set(db)
         attribute_names = kwargs.get('attribute_names', None)
 
         if attribute_names:
             attributes = attributes.filter(name__in=attribute_names)
 
-        attributes.delete()
+        names = attribute_names or self.get_cached_attribute_names()
+
+        with managed_transaction(using=db):
+            attribute_journal.record_changes(
+                attribute_journal.get_rows(
+                    attributes,
+                    content_type_ids=[
+                        get_content_type(self.__class__, self._state.db).id
+                    ]
+                ),
+                {},
+                using=db
+            )
+            raw_delete(attributes)
+            self._attributes_changed()
+
+        self.uncache_attributes(attribute_names or None)
+        self.unset_attributes(names)
 
+    @instrumented('update_attributes', rows=count_changes)
     def update_attributes(self, **kwargs):
         """
         Given a dictionary of attributes, updates all of the ModelAttribute
@@ -367,6 +2585,20 @@ class BaseModel(models.Model):
         If create is present in the kwargs and True, any attribute that is not
         found will also be created.
 
+        The existing ModelAttributes are read with a single query, only the
+        values that actually changed are written with a bulk update and any
+        missing ModelAttributes are created with a bulk insert, all in a
+        single transaction.  As a result, ModelAttribute.save() is not called
+        and no save signals are sent.
+
+        Returns a dictionary with the number of attributes that were created,
+        updated and left unchanged.
+
+        While attribute writes are being buffered (see
+        django_base_model.buffer), the new values are only set as properties
+        and written when the buffer is flushed, and all of the numbers
+        returned are 0.
+
         Keyword arguments:
         attributes -- a dictionary of name/value pairs.
         create --  a boolean indicating whether or not attributes that don't
@@ -375,17 +2607,103 @@ class BaseModel(models.Model):
 
         attributes = kwargs.get('attributes', None)
         create = kwargs.get('create', False)
+        summary = {'created': 0, 'updated': 0, 'unchanged': 0}
+
+        if not attributes:
+            return summary
+
+        buffer = get_current_buffer()
+
+        if buffer is not None and self._get_pk_val() is not None:
+            buffer.write(self, attributes, create=create)
+            return summary
+
+        db = router.db_for_write(ModelAttribute, instance=self)
+        changed_values = {}
+        native_values = {}
+        missing = {}
+
+        with managed_transaction(using=db):
+            existing = dict(
+                (name, (pk, value, value_type))
+                for pk, name, value, value_type in self.attributes.using(
+                    db
+                ).filter(
+                    name__in=attributes.keys()
+                ).values_list('pk', 'name', 'value', 'value_type')
+            )
 
-        if attributes:
             for name, value in attributes.items():
-                try:
-                    model_attribute = self.attributes.get(name=name)
-                except ModelAttribute.DoesNotExist:
-                    if create:
-                        self.attributes.create(self, name=name, value=value)
+                if name in existing:
+                    pk, current_value, value_type = existing[name]
+                    field_values = get_value_fields(value_type, value)
+                    native_values[name] = to_native_value(
+                        value_type,
+                        field_values['value']
+                    )
+
+                    if field_values['value'] != current_value:
+                        changed_values[pk] = field_values
+                        summary['updated'] += 1
                     else:
-                        continue
-                else:
-                    model_attribute.value = value
-                    model_attribute.save()
-                    self.set_attribute(name=name, value=value, overwrite=True)
+                        summary['unchanged'] += 1
+                elif create:
+                    missing[name] = value
+
+            if changed_values:
+                ModelAttribute.objects.bulk_update_values(
+                    changed_values,
+                    using=db,
+                    content_type_ids=[
+                        get_content_type(self.__class__, self._state.db).id
+                    ]
+                )
+                self._attributes_changed()
+
+            if missing:
+                self.create_attributes(attributes=missing, bulk=True)
+                summary['created'] = len(missing)
+
+        self.cache_attributes(native_values)
+
+        for name, value in native_values.items():
+            self.set_attribute(name=name, value=value, overwrite=True)
+
+        return summary
+
+    def acreate_attributes(self, **kwargs):
+        """
+        Asynchronous counterpart of create_attributes, run on the pool of
+        threads of django_base_model.asynchronous.  Returns a future that is
+        done once the attributes have been created.
+        """
+
+        from django_base_model.asynchronous import run_async
+
+        return run_async(self.create_attributes, **kwargs)
+
+    def aupdate_attributes(self, **kwargs):
+        """
+        Asynchronous counterpart of update_attributes, run on the pool of
+        threads of django_base_model.asynchronous.  Returns a future of the
+        dictionary of the number of attributes that were created, updated and
+        left unchanged.
+        """
+
+        from django_base_model.asynchronous import run_async
+
+        return run_async(self.update_attributes, **kwargs)
+
+
+class SnapshotBaseModel(BaseModel):
+    """
+    Defines an abstract model built off of BaseModel that also keeps a JSON
+    snapshot of its attributes in its own row, so that they are loaded along
+    with the object rather than with a second query (see
+    django_base_model.snapshot).
+    """
+
+    attribute_snapshot = AttributeSnapshotField()
+
+    class Meta:
+        abstract = True
@@ -0,0 +1,152 @@
+"""
+A registry of the ContentTypes of the models that inherit from BaseModel,
+kept per database alias so that the descriptor, prefetch and bulk code paths
+resolve them without depending on ContentType's own cache, which may be
+cleared at any time (e.g., per request or per test).
+
+The registry of a database alias is warmed with the ContentTypes of every
+BaseModel subclass, with a single query, the first time a ContentType is
+requested from it (or explicitly with warm_content_types).  It is cleared
+whenever ContentTypes may have been removed or recreated, and can be cleared
+explicitly with clear_content_types.
+"""
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import get_models
+from django.db.models.signals import post_delete, post_syncdb
+
+# ContentType objects keyed by the model and the database alias they were
+# retrieved from.
+_content_types = {}
+
+# ContentType objects keyed by their id and the database alias they were
+# retrieved from.
+_content_types_by_id = {}
+
+# The database aliases whose registries have been warmed.
+_warmed = set()
+
+
+def get_base_models():
+    """
+    Retrieves every installed model that inherits from BaseModel.
+    """
+
+    # Avoid a circular import.
+    from django_base_model.models import BaseModel
+
+    return [model for model in get_models() if issubclass(model, BaseModel)]
+
+
+def register_content_type(model, content_type, using=None):
+    _content_types[(model, using)] = content_type
+    _content_types_by_id[(content_type.id, using)] = content_type
+
+
+def warm_content_types(using=None):
+    """
+    Registers the ContentTypes of every model that inherits from BaseModel
+    from the given database alias, creating any that don't exist yet, with a
+    single query.
+
+    Keyword arguments:
+    using -- the database alias to retrieve the ContentTypes from.
+    """
+
+    models = get_base_models()
+
+    if models:
+        content_types = ContentType.objects.db_manager(using).get_for_models(
+            *models
+        )
+
+        for model, content_type in content_types.items():
+            register_content_type(model, content_type, using)
+
+    _warmed.add(using)
+
+
+def get_content_type(model, using=None):
+    """
+    Retrieves the ContentType of the given model from the given database,
+    warming the registry of the database the first time it is used.
+    """
+
+    key = (model, using)
+
+    try:
+        return _content_types[key]
+    except KeyError:
+        pass
+
+    if using not in _warmed:
+        warm_content_types(using)
+
+        if key in _content_types:
+            return _content_types[key]
+
+    content_type = ContentType.objects.db_manager(using).get_for_model(model)
+    register_content_type(model, content_type, using)
+
+    return content_type
+
+
+def get_content_type_for_id(content_type_id, using=None):
+    """
+    Retrieves the ContentType with the given id from the given database,
+    warming the registry of the database the first time it is used.
+    """
+
+    key = (content_type_id, using)
+
+    try:
+        return _content_types_by_id[key]
+    except KeyError:
+        pass
+
+    if using not in _warmed:
+        warm_content_types(using)
+
+        if key in _content_types_by_id:
+            return _content_types_by_id[key]
+
+    content_type = ContentType.objects.db_manager(using).get_for_id(
+        content_type_id
+    )
+    _content_types_by_id[key] = content_type
+
+    return content_type
+
+
+def get_model_for_id(content_type_id, using=None):
+    """
+    Retrieves the model with the given content type, or None if it isn't
+    installed.
+    """
+
+    return get_content_type_for_id(content_type_id, using).model_class()
+
+
+def clear_content_types(**kwargs):
+    """
+    Clears the registry of every database alias, so that each is warmed again
+    the next time it is used.  This is connected to the signals sent whenever
+    ContentTypes may have been removed or recreated, and should be called
+    whenever they are changed by other means (e.g., raw SQL or fixtures loaded
+    without signals).
+    """
+
+    _content_types.clear()
+    _content_types_by_id.clear()
+    _warmed.clear()
+
+
+post_delete.connect(
+    clear_content_types,
+    sender=ContentType,
+    dispatch_uid='django_base_model.registry.clear_content_types'
+)
+post_syncdb.connect(
+    clear_content_types,
+    dispatch_uid='django_base_model.registry.clear_content_types_syncdb'
+)
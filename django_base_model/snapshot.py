@@ -0,0 +1,227 @@
+"""
+Optional snapshots of the attributes of objects that inherit from BaseModel,
+stored as JSON in a column of the objects' own table so that their attributes
+can be read along with them rather than with a second query.
+
+Models enable them by inheriting from SnapshotBaseModel, which adds an
+AttributeSnapshotField.  The snapshot of an object is rebuilt from its
+ModelAttributes whenever they are changed through this module, in the same
+transaction as the change.  An empty snapshot means that it hasn't been built
+yet (e.g., for rows that existed before the column was added), in which case
+the attributes are queried for as usual; rebuild_snapshots (or the
+rebuild_attribute_snapshots management command) builds them in bulk.
+"""
+
+import json
+
+from django.db import models, router
+
+from django_base_model.registry import (
+    get_content_type, get_content_type_for_id, get_model_for_id
+)
+from django_base_model.utils import bulk_update_rows, managed_transaction
+
+SNAPSHOT_CHUNK_SIZE = 500
+
+
+class AttributeSnapshotField(models.TextField):
+    """
+    Defines the field the attribute snapshot of an object is stored in.
+
+    Snapshots are only ever written by this module, so saving an object that
+    was loaded before its attributes changed doesn't write its outdated
+    snapshot back: when an existing row is updated, the column is set to its
+    own current value instead.
+
+    The default is an empty snapshot, so that existing rows are treated as
+    not built yet when the column is added to a table, while a new object
+    starts with a built snapshot of no attributes.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('blank', True)
+        kwargs.setdefault('default', '')
+        kwargs.setdefault('editable', False)
+        super(AttributeSnapshotField, self).__init__(*args, **kwargs)
+
+    def pre_save(self, model_instance, add):
+        if add:
+            value = super(AttributeSnapshotField, self).pre_save(
+                model_instance,
+                add
+            )
+
+            if not value:
+                value = dump_snapshot({})
+                setattr(model_instance, self.attname, value)
+
+            return value
+
+        return models.F(self.name)
+
+
+def get_snapshot_field(model):
+    """
+    Retrieves the AttributeSnapshotField of the given model, or None if it
+    doesn't keep attribute snapshots.
+    """
+
+    for field in model._meta.fields:
+        if isinstance(field, AttributeSnapshotField):
+            return field
+
+    return None
+
+
+def get_snapshot_model(content_type_id, using=None):
+    """
+    Retrieves the model with the given content type if it keeps attribute
+    snapshots, or None otherwise.
+    """
+
+    model = get_model_for_id(content_type_id, using)
+
+    if model is not None and get_snapshot_field(model) is not None:
+        return model
+
+    return None
+
+
+def dump_snapshot(attributes):
+    """
+    Serializes a dictionary mapping attribute names to (value, value type)
+    pairs, as stored in ModelAttributes, into a snapshot.
+    """
+
+    return json.dumps(
+        dict((name, list(value)) for name, value in attributes.items()),
+        sort_keys=True,
+        separators=(',', ':')
+    )
+
+
+def load_snapshot(snapshot):
+    """
+    Deserializes a snapshot into a dictionary mapping attribute names to
+    their native values, or returns None if the snapshot hasn't been built.
+    """
+
+    # Avoid a circular import.
+    from django_base_model.models import to_native_value
+
+    if not snapshot:
+        return None
+
+    return dict(
+        (name, to_native_value(value_type, value))
+        for name, (value, value_type) in json.loads(snapshot).items()
+    )
+
+
+def refresh_snapshots(content_type_id, object_ids, using=None):
+    """
+    Rebuilds the snapshots of the given objects from their ModelAttributes,
+    with one query for the ModelAttributes and one UPDATE statement per batch
+    of objects, after their attributes have been changed.  Nothing is done
+    for models that don't keep snapshots.
+
+    Returns a dictionary mapping each object id to its new snapshot.
+
+    Keyword arguments:
+    content_type_id -- the id of the ContentType of the objects.
+    object_ids -- a list of primary keys of the objects.
+    using -- the database alias the objects and their ModelAttributes are in.
+    """
+
+    # Avoid a circular import.
+    from django_base_model.models import ModelAttribute
+
+    model = get_snapshot_model(content_type_id, using)
+    object_ids = list(set(object_ids))
+
+    if model is None or not object_ids:
+        return {}
+
+    db = using or router.db_for_write(model)
+    attributes = dict((object_id, {}) for object_id in object_ids)
+
+    for object_id, name, value, value_type in (
+        ModelAttribute.objects.values_for_objects(
+            get_content_type_for_id(content_type_id, db),
+            object_ids,
+            using=db,
+            fields=('object_id', 'name', 'value', 'value_type'),
+            native=False
+        )
+    ):
+        attributes[object_id][name] = (value, value_type)
+
+    field_name = get_snapshot_field(model).name
+    snapshots = dict(
+        (object_id, dump_snapshot(object_attributes))
+        for object_id, object_attributes in attributes.items()
+    )
+
+    bulk_update_rows(
+        model,
+        dict(
+            (object_id, {field_name: snapshot})
+            for object_id, snapshot in snapshots.items()
+        ),
+        using=db,
+        batch_size=SNAPSHOT_CHUNK_SIZE
+    )
+
+    return snapshots
+
+
+def refresh_deleted_snapshot(sender, instance, using, **kwargs):
+    """
+    Rebuilds the snapshot of the object a ModelAttribute belonged to after it
+    was deleted with its delete() method, a QuerySet or along with the
+    object.  This is connected to the post_delete signal of ModelAttribute.
+    """
+
+    refresh_snapshots(
+        instance.content_type_id,
+        [instance.object_id],
+        using=using
+    )
+
+
+def rebuild_snapshots(model, using=None, chunk_size=SNAPSHOT_CHUNK_SIZE):
+    """
+    Rebuilds the snapshots of every object of a model that keeps them, in
+    order of primary key and chunk_size objects at a time, each chunk in its
+    own transaction.
+
+    Returns the number of objects whose snapshots were rebuilt.
+
+    Keyword arguments:
+    model -- the model whose snapshots should be rebuilt.
+    using -- the database alias to rebuild the snapshots in.
+    chunk_size -- the number of objects to rebuild per transaction.
+    """
+
+    db = using or router.db_for_write(model)
+    content_type = get_content_type(model, db)
+    query_set = model._base_manager.using(db).order_by('pk')
+    last_pk = None
+    count = 0
+
+    while True:
+        chunk_query_set = query_set
+
+        if last_pk is not None:
+            chunk_query_set = chunk_query_set.filter(pk__gt=last_pk)
+
+        pks = list(chunk_query_set.values_list('pk', flat=True)[:chunk_size])
+
+        if not pks:
+            return count
+
+        with managed_transaction(using=db):
+            refresh_snapshots(content_type.id, pks, using=db)
+
+        count += len(pks)
+        last_pk = pks[-1]
@@ -0,0 +1,6 @@
+"""
+Tests of django_base_model, which run against a SQLite database file from the
+root of the repository with:
+
+django-admin.py test tests --settings=django_base_model.tests.settings --pythonpath=.
+"""
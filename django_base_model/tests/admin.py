@@ -0,0 +1,17 @@
+from django.contrib import admin
+
+from django_base_model.admin import AttributeColumn, BaseModelAdmin
+from django_base_model.tests.models import Plan
+
+
+class PlanAdmin(BaseModelAdmin):
+    tier = AttributeColumn('tier')
+    list_display = (
+        'title',
+        'last_modified_by_name',
+        'tier',
+        AttributeColumn('region', 'Region'),
+    )
+
+
+admin.site.register(Plan, PlanAdmin)
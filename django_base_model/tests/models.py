@@ -0,0 +1,83 @@
+from django.db import models
+
+from django_base_model.models import BaseModel, SnapshotBaseModel
+
+
+class Plan(BaseModel):
+    """
+    A model inheriting from BaseModel used by the tests.
+    """
+
+    title = models.CharField(max_length=255)
+
+
+class ChildPlan(Plan):
+    """
+    A model inheriting from Plan through multi-table inheritance, whose
+    audit fields are stored in its parent's table.
+    """
+
+    extra = models.CharField(max_length=255, blank=True, default='')
+
+
+class LazyPlan(BaseModel):
+    """
+    A model like Plan whose attributes are resolved lazily.
+    """
+
+    title = models.CharField(max_length=255)
+
+    class AttributeMeta:
+        lazy = True
+
+
+class CachedPlan(BaseModel):
+    """
+    A model like Plan whose attributes are kept in the shared attribute
+    cache.
+    """
+
+    title = models.CharField(max_length=255)
+
+    class AttributeMeta:
+        cache = True
+
+
+class CompactPlan(BaseModel):
+    """
+    A model like Plan whose attributes are kept in a CompactAttributes
+    container.
+    """
+
+    title = models.CharField(max_length=255)
+
+    class AttributeMeta:
+        compact = True
+
+
+class JournalPlan(BaseModel):
+    """
+    A model like Plan whose attribute changes are journaled.
+    """
+
+    title = models.CharField(max_length=255)
+
+    class AttributeMeta:
+        journal = True
+
+
+class SnapshotPlan(SnapshotBaseModel):
+    """
+    A model like Plan whose attributes are denormalized into a snapshot.
+    """
+
+    title = models.CharField(max_length=255)
+
+
+class ChildSnapshotPlan(SnapshotPlan):
+    """
+    A model inheriting from SnapshotPlan through multi-table inheritance,
+    whose attribute snapshot is stored in its parent's table.
+    """
+
+    extra = models.CharField(max_length=255, blank=True, default='')
@@ -0,0 +1,32 @@
+"""
+Settings for the tests of django_base_model, which use a SQLite database file
+rather than an in-memory database so that the threads the asynchronous
+attribute operations run on share it with the tests.
+"""
+
+import os
+import tempfile
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(tempfile.gettempdir(), 'django_base_model.db'),
+        'TEST_NAME': os.path.join(
+            tempfile.gettempdir(),
+            'test_django_base_model.db'
+        ),
+    }
+}
+
+INSTALLED_APPS = (
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.admin',
+    'django_base_model',
+    'django_base_model.tests',
+)
+
+ROOT_URLCONF = 'django_base_model.tests.urls'
+
+SECRET_KEY = 'django-base-model-tests'
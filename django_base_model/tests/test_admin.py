@@ -0,0 +1,167 @@
+"""
+Tests of BaseModelAdmin (see django_base_model.admin).
+"""
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.generic import generic_inlineformset_factory
+from django.db import connection
+from django.test import TestCase
+from django.test.client import RequestFactory
+
+from django_base_model.models import ModelAttribute
+from django_base_model.tests.admin import PlanAdmin
+from django_base_model.tests.models import Plan
+
+
+class BaseModelAdminChangeListTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_superuser(
+            'admin',
+            'admin@example.com',
+            'password'
+        )
+        self.model_admin = PlanAdmin(Plan, admin.site)
+
+    def create_plans(self, count):
+        for index in range(Plan.objects.count(), count):
+            Plan.objects.create(
+                title='p%d' % index,
+                last_modified_by=self.user,
+                attributes={'tier': index, 'region': 'r%d' % index}
+            )
+
+    def get_changelist(self):
+        """
+        Renders the changelist, returning the response and the number of
+        queries it took.
+        """
+
+        request = RequestFactory().get('/admin/tests/plan/')
+        request.user = self.user
+        use_debug_cursor = connection.use_debug_cursor
+        connection.use_debug_cursor = True
+        start = len(connection.queries)
+
+        try:
+            response = self.model_admin.changelist_view(request)
+            response.render()
+        finally:
+            connection.use_debug_cursor = use_debug_cursor
+
+        return (response, len(connection.queries) - start)
+
+    def test_constant_queries(self):
+        self.create_plans(3)
+        response, few_queries = self.get_changelist()
+
+        self.assertTrue('r2' in response.content)
+        self.assertTrue('Region' in response.content)
+
+        self.create_plans(30)
+        response, many_queries = self.get_changelist()
+
+        self.assertTrue('r29' in response.content)
+        self.assertEqual(few_queries, many_queries)
+
+    def test_list_select_related(self):
+        self.model_admin.list_select_related = True
+        self.create_plans(3)
+        response, few_queries = self.get_changelist()
+        self.create_plans(30)
+        many_queries = self.get_changelist()[1]
+
+        self.assertEqual(few_queries, many_queries)
+        self.assertTrue(
+            response.context_data['cl'].query_set.query.select_related is True
+        )
+
+
+class BaseModelAdminFormsetTests(TestCase):
+
+    def setUp(self):
+        self.plan = Plan.objects.create(
+            title='Plan',
+            attributes=dict(('a%d' % index, index) for index in range(150))
+        )
+        self.formset_class = generic_inlineformset_factory(
+            ModelAttribute,
+            extra=2,
+            can_delete=True
+        )
+
+    def get_data(self, formset):
+        """
+        Builds the POST data of the formset as it was rendered, returning it
+        along with the forms of the existing ModelAttributes ordered by their
+        value and the extra forms.
+        """
+
+        data = {}
+
+        for name, value in formset.management_form.initial.items():
+            data['%s-%s' % (formset.prefix, name)] = value
+
+        for form in formset.forms:
+            for name, field in form.fields.items():
+                value = form.initial.get(name, field.initial)
+                data[form.add_prefix(name)] = '' if value is None else value
+
+        forms = sorted(
+            formset.initial_forms,
+            key=lambda form: int(form.initial['value'])
+        )
+
+        return (data, forms, formset.extra_forms)
+
+    def test_save_formset(self):
+        data, forms, extra_forms = self.get_data(
+            self.formset_class(instance=self.plan)
+        )
+
+        for form in forms[:50]:
+            data[form.add_prefix('value')] = 'v%s' % form.initial['value']
+            data[form.add_prefix('value_type')] = ''
+
+        for form in forms[50:60]:
+            data[form.add_prefix('DELETE')] = 'on'
+
+        # Takes the name of a deleted ModelAttribute.
+        data[forms[60].add_prefix('name')] = 'a50'
+        data[extra_forms[0].add_prefix('name')] = 'new1'
+        data[extra_forms[0].add_prefix('value')] = '7'
+        data[extra_forms[1].add_prefix('name')] = 'new2'
+        formset = self.formset_class(data, instance=self.plan)
+
+        self.assertTrue(formset.is_valid(), formset.errors)
+
+        model_admin = PlanAdmin(Plan, admin.site)
+        request = RequestFactory().post('/')
+        use_debug_cursor = connection.use_debug_cursor
+        connection.use_debug_cursor = True
+        start = len(connection.queries)
+
+        try:
+            model_admin.save_formset(request, None, formset, True)
+        finally:
+            connection.use_debug_cursor = use_debug_cursor
+
+        self.assertTrue(len(connection.queries) - start < 10)
+
+        attributes = Plan.objects.get(pk=self.plan.pk).get_attributes_as_dict()
+
+        self.assertEqual(len(attributes), 142)
+        self.assertEqual(attributes['a0'], 'v0')
+        self.assertEqual(attributes['a50'], '60')
+        self.assertEqual(attributes['new1'], '7')
+        self.assertEqual(attributes['new2'], '')
+        self.assertFalse('a55' in attributes)
+        self.assertEqual(len(formset.changed_objects), 51)
+        self.assertEqual(len(formset.deleted_objects), 10)
+        self.assertEqual(len(formset.new_objects), 2)
+        self.assertEqual(
+            ModelAttribute.objects.get(name='a50').value_integer,
+            60
+        )
+        self.assertEqual(ModelAttribute.objects.get(name='a0').value_type, '')
@@ -0,0 +1,102 @@
+"""
+Tests of the asynchronous attribute operations (see
+django_base_model.asynchronous).
+"""
+
+from django.test import TransactionTestCase
+
+from django_base_model.asynchronous import gather, run_async, shutdown_executor
+from django_base_model.models import aprefetch_attributes
+from django_base_model.tests.models import Plan
+
+
+class AsynchronousAttributeTests(TransactionTestCase):
+
+    def setUp(self):
+        self.plan = Plan.objects.create(
+            title='Plan',
+            attributes={'tier': '1', 'region': 'east'}
+        )
+
+    def tearDown(self):
+        shutdown_executor()
+
+    def test_run_async(self):
+        self.assertEqual(run_async(sum, [1, 2, 3]).result(), 6)
+
+    def test_run_async_exception(self):
+        future = run_async(Plan.objects.get, pk=0)
+
+        self.assertRaises(Plan.DoesNotExist, future.result)
+
+    def test_gather(self):
+        futures = [run_async(abs, -n) for n in range(5)]
+
+        self.assertEqual(gather(futures).result(), [0, 1, 2, 3, 4])
+        self.assertEqual(gather([]).result(), [])
+
+    def test_gather_exception(self):
+        futures = [
+            run_async(abs, -1),
+            run_async(Plan.objects.get, pk=0),
+        ]
+
+        self.assertRaises(Plan.DoesNotExist, gather(futures).result)
+
+    def test_aget(self):
+        plan = Plan.objects.aget(pk=self.plan.pk).result()
+
+        self.assertEqual(plan.title, 'Plan')
+        self.assertEqual(plan.tier, '1')
+        self.assertEqual(plan.region, 'east')
+
+    def test_aget_attributes_as_dict(self):
+        plan = Plan.objects.get(pk=self.plan.pk)
+
+        self.assertEqual(
+            plan.aget_attributes_as_dict().result(),
+            {'tier': '1', 'region': 'east'}
+        )
+
+    def test_aset_attributes(self):
+        plan = Plan.objects.all()[0]
+        plan.aset_attributes().result()
+
+        self.assertEqual(plan.tier, '1')
+
+    def test_acreate_attributes(self):
+        self.plan.acreate_attributes(attributes={'size': '3'}).result()
+
+        self.assertEqual(Plan.objects.get(pk=self.plan.pk).size, '3')
+
+    def test_aupdate_attributes(self):
+        self.plan.aupdate_attributes(
+            attributes={'tier': '2', 'size': '3'},
+            create=True
+        ).result()
+        plan = Plan.objects.get(pk=self.plan.pk)
+
+        self.assertEqual(plan.tier, '2')
+        self.assertEqual(plan.size, '3')
+
+    def test_afilter_with_attributes(self):
+        Plan.objects.create(title='Other', attributes={'tier': '2'})
+        plans = Plan.objects.afilter_with_attributes(title='Plan').result()
+
+        self.assertEqual([plan.pk for plan in plans], [self.plan.pk])
+        self.assertEqual(plans[0].region, 'east')
+
+    def test_aprefetch_attributes(self):
+        for index in range(4):
+            Plan.objects.create(
+                title='Plan %d' % index,
+                attributes={'tier': str(index)}
+            )
+
+        plans = list(Plan.objects.filter(title__startswith='Plan ').order_by('pk'))
+        aprefetch_attributes(plans, chunk_size=2).result()
+
+        self.assertEqual(
+            [plan.tier for plan in plans],
+            [str(index) for index in range(4)]
+        )
@@ -0,0 +1,583 @@
+"""
+Tests of creating, retrieving and updating the attributes of BaseModel
+objects.
+"""
+
+import copy
+import datetime
+import decimal
+import pickle
+import warnings
+
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from django_base_model.models import (
+    ATTRIBUTE_INTEGER_MAX, ATTRIBUTE_INTEGER_MIN,
+    ATTRIBUTE_PREFETCH_CHUNK_SIZE, ModelAttribute, convert_value,
+    infer_value_type, prefetch_attributes
+)
+from django_base_model.registry import warm_content_types
+from django_base_model.tests.models import LazyPlan, Plan
+
+
+class PrefetchAttributeTests(TestCase):
+
+    def setUp(self):
+        warm_content_types('default')
+
+        for index in range(20):
+            Plan.objects.create(
+                title='p%d' % index,
+                attributes={'region': 'r%d' % index, 'tier': 't'}
+            )
+
+    def test_filter_with_attributes(self):
+        with self.assertNumQueries(2):
+            plans = list(Plan.objects.filter_with_attributes(
+                title__startswith='p'
+            ).order_by('pk'))
+
+        self.assertEqual(
+            [plan.region for plan in plans],
+            ['r%d' % index for index in range(20)]
+        )
+
+    def test_sliced(self):
+        with self.assertNumQueries(2):
+            plans = list(Plan.objects.all_with_attributes().order_by('-pk')[:5])
+
+        self.assertEqual(plans[0].region, 'r19')
+
+    def test_get(self):
+        with self.assertNumQueries(2):
+            plan = Plan.objects.exclude_with_attributes(
+                title='p0'
+            ).filter(title='p1').get()
+
+        self.assertEqual(plan.region, 'r1')
+
+    def test_without_instances(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                Plan.objects.with_attributes().filter(title='p2').count(),
+                1
+            )
+
+        self.assertEqual(
+            list(Plan.objects.with_attributes().filter(
+                title='p0'
+            ).values_list('title', flat=True)),
+            ['p0']
+        )
+
+    def test_prefetch_attributes(self):
+        plan = Plan.objects.filter(title='p3')[0]
+        plan.region = 'mine'
+        prefetch_attributes([plan])
+
+        self.assertEqual(plan.region, 'mine')
+
+        prefetch_attributes([plan], overwrite=True)
+
+        self.assertEqual(plan.region, 'r3')
+
+
+class BulkCreateAttributeTests(TestCase):
+
+    def setUp(self):
+        warm_content_types('default')
+
+    def test_create(self):
+        attributes = dict(('a%d' % index, str(index)) for index in range(40))
+
+        with self.assertNumQueries(3):
+            plan = Plan.objects.create(title='Plan', attributes=attributes)
+
+        self.assertEqual(plan.a5, '5')
+        self.assertEqual(
+            Plan.objects.get(pk=plan.pk).get_attributes_as_dict(),
+            attributes
+        )
+        self.assertEqual(
+            ModelAttribute.objects.get(name='a1').display_name,
+            'A1'
+        )
+
+    def test_create_more_than_a_chunk(self):
+        attributes = dict(
+            ('a%d' % index, str(index))
+            for index in range(ATTRIBUTE_PREFETCH_CHUNK_SIZE + 10)
+        )
+        plan = Plan.objects.create(title='Plan', attributes=attributes)
+
+        self.assertEqual(
+            Plan.objects.get(pk=plan.pk).get_attributes_as_dict(),
+            attributes
+        )
+
+    def test_create_validation(self):
+        plan = Plan.objects.create(title='Plan', attributes={'a': '1'})
+
+        for attributes in ({'a': 'z'}, {'Bad Name': 'z'},
+                           {'Dup': 'z', 'dup': 'y'}):
+            self.assertRaises(
+                ValidationError,
+                plan.create_attributes,
+                attributes=attributes,
+                bulk=True
+            )
+
+        self.assertEqual(ModelAttribute.objects.count(), 1)
+
+    def test_create_attribute_names(self):
+        plan = Plan.objects.create(
+            title='Plan',
+            attribute_names=['Foo'],
+            bulk_attributes=False
+        )
+        other, created = Plan.objects.get_or_create(
+            title='Other',
+            attribute_names=['bar']
+        )
+
+        self.assertEqual(plan.foo, '')
+        self.assertTrue(created)
+        self.assertEqual(other.bar, '')
+
+
+class TypedAttributeTests(TestCase):
+
+    def test_typed_values(self):
+        now = datetime.datetime(2020, 1, 2, 3, 4, 5)
+        plan = Plan.objects.create(
+            title='Plan',
+            attributes={'n': 5, 'd': 1.5, 'b': True, 't': now, 's': 'str'}
+        )
+
+        # Values without a value type are returned as text.
+        self.assertEqual(plan.n, '5')
+        self.assertEqual(
+            Plan.objects.get(pk=plan.pk).get_attributes_as_dict(),
+            {
+                'n': '5',
+                'd': '1.5',
+                'b': 'True',
+                't': '2020-01-02 03:04:05',
+                's': 'str',
+            }
+        )
+        self.assertEqual(
+            ModelAttribute.objects.exclude(value_type='').count(),
+            0
+        )
+        self.assertEqual(
+            ModelAttribute.objects.filter(name='n', value_integer__gt=3).count(),
+            1
+        )
+        self.assertEqual(
+            ModelAttribute.objects.get(name='d').value_decimal,
+            decimal.Decimal('1.5')
+        )
+        self.assertEqual(
+            ModelAttribute.objects.filter(
+                value_datetime__lt=now + datetime.timedelta(days=1)
+            ).count(),
+            1
+        )
+
+    def test_update_typed_values(self):
+        plan = Plan.objects.create(
+            title='Plan',
+            attributes={'n': 5, 'd': 1.5, 'b': True, 's': 'x'}
+        )
+        plan = Plan.objects.get(pk=plan.pk)
+        summary = plan.update_attributes(
+            attributes={'n': 'n/a', 'b': 'false', 'd': 2, 's': 9}
+        )
+
+        self.assertEqual(summary['updated'], 4)
+        self.assertEqual(
+            (plan.n, plan.b, plan.d, plan.s),
+            ('n/a', 'false', '2', '9')
+        )
+
+        # The typed copies follow the values.
+        attributes = dict(
+            (attribute.name, attribute)
+            for attribute in ModelAttribute.objects.all()
+        )
+
+        self.assertEqual(attributes['n'].value_integer, None)
+        self.assertEqual(attributes['b'].value_boolean, None)
+        self.assertEqual(
+            (attributes['d'].value_integer, attributes['d'].value_decimal),
+            (2, None)
+        )
+        self.assertEqual(attributes['s'].value_integer, 9)
+
+        attribute = attributes['n']
+        attribute.value = 7
+        attribute.save()
+
+        self.assertEqual(
+            (attribute.value, attribute.value_type, attribute.value_integer),
+            ('7', '', 7)
+        )
+        self.assertEqual(
+            plan.update_attributes(attributes={'n': 7})['unchanged'],
+            1
+        )
+
+    def test_explicit_value_type(self):
+        plan = Plan.objects.create(title='Plan')
+        plan.attributes.create(name='m', value='12', value_type='integer')
+        plan.attributes.create(name='p', value=1.5, value_type='decimal')
+
+        self.assertEqual(
+            Plan.objects.get(pk=plan.pk).get_attributes_as_dict(),
+            {'m': 12, 'p': decimal.Decimal('1.5')}
+        )
+
+        Plan.objects.bulk_set_attributes({plan.pk: {'m': 13, 'x': 1}})
+
+        self.assertEqual(
+            Plan.objects.bulk_get_attributes([plan], names=['m', 'x']),
+            {plan.pk: {'m': 13, 'x': '1'}}
+        )
+        self.assertEqual(ModelAttribute.objects.get(name='m').value_integer, 13)
+
+        plan = Plan.objects.get(pk=plan.pk)
+        plan.update_attributes(attributes={'m': '14'})
+
+        self.assertEqual(plan.m, 14)
+
+        # Only values of an explicit value type are validated.
+        self.assertRaises(
+            ValidationError,
+            plan.update_attributes,
+            attributes={'m': 'abc'}
+        )
+        self.assertRaises(
+            ValidationError,
+            plan.update_attributes,
+            attributes={'m': ATTRIBUTE_INTEGER_MAX + 1}
+        )
+
+        attribute = ModelAttribute.objects.get(name='m')
+        attribute.value = 'abc'
+
+        self.assertRaises(ValidationError, attribute.save)
+
+    def test_datetime_text(self):
+        values = {
+            'aware': '2012-06-01T10:30:00+05:00',
+            'naive': '2012-06-01 10:30',
+        }
+
+        for use_tz in (False, True):
+            with override_settings(USE_TZ=use_tz):
+                with warnings.catch_warnings(record=True) as caught:
+                    warnings.simplefilter('always')
+                    plan = Plan.objects.create(title='Plan', attributes=values)
+                    plan.attributes.create(
+                        name='created',
+                        value=values['aware']
+                    )
+                    plan.update_attributes(attributes={
+                        'aware': values['naive'],
+                        'naive': values['aware'],
+                    })
+
+                self.assertEqual(
+                    [warning.message for warning in caught
+                     if issubclass(warning.category, RuntimeWarning)],
+                    []
+                )
+                self.assertEqual(
+                    Plan.objects.get(pk=plan.pk).get_attributes_as_dict(),
+                    {
+                        'aware': values['naive'],
+                        'naive': values['aware'],
+                        'created': values['aware'],
+                    }
+                )
+
+                for attribute in plan.attributes.all():
+                    self.assertEqual(
+                        timezone.is_aware(attribute.value_datetime),
+                        use_tz
+                    )
+
+    def test_infer_integer_range(self):
+        self.assertEqual(infer_value_type(ATTRIBUTE_INTEGER_MAX), 'integer')
+        self.assertEqual(infer_value_type(ATTRIBUTE_INTEGER_MIN), 'integer')
+        self.assertEqual(infer_value_type(ATTRIBUTE_INTEGER_MAX + 1), '')
+        self.assertEqual(infer_value_type(ATTRIBUTE_INTEGER_MIN - 1), '')
+        self.assertEqual(infer_value_type(12345678901234567890), '')
+
+    def test_infer_decimal_digits(self):
+        for value in ('12345678901234567890.0123456789', '1.50', '-0.0000000001',
+                      '1E+5'):
+            self.assertEqual(
+                infer_value_type(decimal.Decimal(value)),
+                'decimal',
+                value
+            )
+
+        for value in ('123456789012345678901', '0.01234567891', '1E+25',
+                      '1E-20', 'NaN', 'Infinity'):
+            self.assertEqual(infer_value_type(decimal.Decimal(value)), '', value)
+
+        self.assertEqual(infer_value_type(1.5), 'decimal')
+        self.assertEqual(infer_value_type(1e25), '')
+        self.assertEqual(infer_value_type(1e-20), '')
+        self.assertEqual(infer_value_type(float('nan')), '')
+        self.assertEqual(infer_value_type(float('inf')), '')
+
+    def test_convert_out_of_range(self):
+        for value_type, value in (('integer', ATTRIBUTE_INTEGER_MAX + 1),
+                                  ('integer', '12345678901234567890'),
+                                  ('decimal', '1E+25'),
+                                  ('decimal', '1E-20'),
+                                  ('decimal', 'NaN')):
+            self.assertRaises(ValidationError, convert_value, value_type, value)
+
+    def test_out_of_range_values_are_text(self):
+        attributes = {
+            'big': 12345678901234567890,
+            'huge': decimal.Decimal('1E+25'),
+            'tiny': decimal.Decimal('1E-20'),
+            'nan': decimal.Decimal('NaN'),
+            'float': 1e25,
+        }
+        plan = Plan.objects.create(title='Plan', attributes=attributes)
+        other = Plan.objects.create(
+            title='Other',
+            attributes=attributes,
+            bulk_attributes=False
+        )
+
+        for obj in (plan, other):
+            self.assertEqual(
+                Plan.objects.get(pk=obj.pk).get_attributes_as_dict(),
+                {
+                    'big': '12345678901234567890',
+                    'huge': '1E+25',
+                    'tiny': '1E-20',
+                    'nan': 'NaN',
+                    'float': '1e+25',
+                }
+            )
+
+        self.assertEqual(
+            ModelAttribute.objects.exclude(value_type='').count(),
+            0
+        )
+        self.assertEqual(
+            list(Plan.objects.filter_by_attributes(big=12345678901234567890)),
+            [plan, other]
+        )
+        self.assertEqual(
+            list(Plan.objects.filter_by_attributes(
+                big__in=[1, 12345678901234567890]
+            )),
+            [plan, other]
+        )
+
+    def test_upgrade_sql(self):
+        call_command('upgrade_attribute_columns', sql=True)
+
+
+class UpdateAttributeTests(TestCase):
+
+    def setUp(self):
+        warm_content_types('default')
+        self.plan = Plan.objects.create(
+            title='Plan',
+            attributes={'a': '1', 'b': '2', 'c': '3'}
+        )
+
+    def test_update(self):
+        plan = Plan.objects.get(pk=self.plan.pk)
+
+        with self.assertNumQueries(4):
+            summary = plan.update_attributes(
+                attributes={'a': '9', 'b': 2, 'c': 'x', 'd': 'new', 'e': 'n'},
+                create=True
+            )
+
+        self.assertEqual(summary, {'created': 2, 'updated': 2, 'unchanged': 1})
+        self.assertEqual((plan.a, plan.d), ('9', 'new'))
+        self.assertEqual(
+            Plan.objects.get(pk=plan.pk).get_attributes_as_dict(),
+            {'a': '9', 'b': '2', 'c': 'x', 'd': 'new', 'e': 'n'}
+        )
+
+    def test_update_without_create(self):
+        summary = self.plan.update_attributes(attributes={'zz': '1'})
+
+        self.assertEqual(summary, {'created': 0, 'updated': 0, 'unchanged': 0})
+        self.assertFalse(hasattr(self.plan, 'zz'))
+
+
+class UpdateAttributeTransactionTests(TransactionTestCase):
+
+    def test_update(self):
+        plan = Plan.objects.create(title='Plan', attributes={'a': '1'})
+        plan.update_attributes(attributes={'a': '2', 'b': '3'}, create=True)
+
+        self.assertEqual(
+            Plan.objects.get(pk=plan.pk).get_attributes_as_dict(),
+            {'a': '2', 'b': '3'}
+        )
+
+
+class BulkAttributeTests(TestCase):
+
+    def setUp(self):
+        warm_content_types('default')
+        self.plans = [
+            Plan.objects.create(title='p%d' % index, attributes={'a': str(index)})
+            for index in range(30)
+        ]
+
+    def test_bulk_get_attributes(self):
+        with self.assertNumQueries(1):
+            attributes = Plan.objects.bulk_get_attributes(self.plans)
+
+        self.assertEqual(attributes[self.plans[3].pk], {'a': '3'})
+        self.assertEqual(
+            Plan.objects.bulk_get_attributes(
+                [plan.pk for plan in self.plans],
+                names=['b']
+            )[self.plans[3].pk],
+            {}
+        )
+
+    def test_bulk_set_attributes(self):
+        attributes = dict(
+            (plan.pk, {'a': 'x' if index % 2 else str(index), 'b': 'y'})
+            for index, plan in enumerate(self.plans)
+        )
+
+        with self.assertNumQueries(4):
+            summary = Plan.objects.bulk_set_attributes(attributes)
+
+        self.assertEqual(
+            summary,
+            {'created': 30, 'updated': 15, 'unchanged': 15}
+        )
+        self.assertEqual(
+            Plan.objects.bulk_get_attributes(self.plans)[self.plans[1].pk],
+            {'a': 'x', 'b': 'y'}
+        )
+
+    def test_bulk_set_attributes_without_create(self):
+        summary = Plan.objects.bulk_set_attributes(
+            {self.plans[0].pk: {'c': '1'}},
+            create=False
+        )
+
+        self.assertEqual(summary['created'], 0)
+        self.assertFalse(ModelAttribute.objects.filter(name='c').exists())
+
+
+class AttributeCacheTests(TestCase):
+
+    def setUp(self):
+        warm_content_types('default')
+        self.plan = Plan.objects.create(title='Plan', attributes={'a': '1'})
+
+    def test_created(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.plan.get_attributes_as_dict(), {'a': '1'})
+
+    def test_retrieved(self):
+        plan = Plan.objects.get(pk=self.plan.pk)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(plan.get_attributes_as_dict(), {'a': '1'})
+            plan.set_attributes()
+
+    def test_changes(self):
+        plan = Plan.objects.get(pk=self.plan.pk)
+        plan.attributes.create(name='b', value=2)
+        plan.update_attributes(attributes={'a': '5', 'c': 3}, create=True)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                plan.get_attributes_as_dict(),
+                {'a': '5', 'b': '2', 'c': '3'}
+            )
+
+        plan.delete_attributes(attribute_names=['b'])
+
+        self.assertEqual(plan.get_attributes_as_dict(), {'a': '5', 'c': '3'})
+
+        plan.attributes.remove(plan.attributes.get(name='c'))
+
+        self.assertEqual(plan.get_attributes_as_dict(), {'a': '5'})
+
+        plan.attributes.clear()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(plan.get_attributes_as_dict(), {})
+
+    def test_refresh(self):
+        ModelAttribute.objects.filter(name='a').update(value='changed')
+
+        self.assertEqual(self.plan.get_attributes_as_dict(), {'a': '1'})
+
+        self.plan.refresh_attributes()
+
+        self.assertEqual(self.plan.get_attributes_as_dict(), {'a': 'changed'})
+
+    def test_prefetched(self):
+        for query_set in (Plan.objects.with_attributes(),
+                          Plan.objects.prefetch_related('attributes')):
+            plans = list(query_set)
+
+            with self.assertNumQueries(0):
+                self.assertEqual(plans[0].get_attributes_as_dict(), {'a': '1'})
+
+
+class LazyAttributeTests(TestCase):
+
+    def setUp(self):
+        warm_content_types('default')
+        self.plan = LazyPlan.objects.create(
+            title='Plan',
+            attributes={'region': 'east', 'title': 'shadow'}
+        )
+
+    def test_get(self):
+        with self.assertNumQueries(1):
+            plan = LazyPlan.objects.get(pk=self.plan.pk)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(plan.region, 'east')
+            self.assertEqual(plan.title, 'Plan')
+            self.assertFalse(hasattr(plan, 'missing'))
+
+        self.assertTrue(hasattr(LazyPlan.objects.get(pk=plan.pk), 'region'))
+
+    def test_eager(self):
+        plan = Plan.objects.create(title='Plan', attributes={'region': 'east'})
+        plan = Plan.objects.get(pk=plan.pk)
+
+        with self.assertNumQueries(0):
+            self.assertFalse(hasattr(plan, 'missing'))
+
+    def test_pickle(self):
+        plan = LazyPlan.objects.get(pk=self.plan.pk)
+        copy.deepcopy(plan)
+
+        self.assertEqual(pickle.loads(pickle.dumps(plan)).region, 'east')
+
+    def test_option(self):
+        self.assertEqual(LazyPlan.get_attribute_option('lazy'), True)
+        self.assertEqual(Plan.get_attribute_option('lazy'), False)
@@ -0,0 +1,158 @@
+"""
+Tests of buffering attribute writes (see django_base_model.buffer).
+"""
+
+from django.test import TestCase
+from django.test.client import RequestFactory
+
+from django_base_model.buffer import (
+    AttributeWriteBufferMiddleware, buffered_attributes
+)
+from django_base_model.models import ModelAttribute
+from django_base_model.tests.models import CompactPlan, LazyPlan, Plan
+
+
+class AttributeWriteBufferTests(TestCase):
+
+    def setUp(self):
+        self.plan = Plan.objects.create(title='Plan', attributes={'a': 1})
+        self.other = Plan.objects.create(title='Other')
+
+    def test_buffered_writes(self):
+        plan = Plan.objects.get(pk=self.plan.pk)
+
+        with buffered_attributes() as buffer:
+            with self.assertNumQueries(0):
+                plan.update_attributes(attributes={'a': 2})
+                plan.update_attributes(attributes={'a': 3, 'b': 'x'}, create=True)
+                plan.update_attributes(attributes={'zz': 3})
+                plan.create_attributes(attributes={'c': 4})
+                attribute = plan.attributes.create(plan, name='d', value='v')
+                self.other.update_attributes(attributes={'a': 9}, create=True)
+
+            self.assertEqual(
+                (plan.a, plan.b, plan.c, plan.d, self.other.a),
+                ('3', 'x', '4', 'v', '9')
+            )
+            self.assertFalse(hasattr(plan, 'zz'))
+            self.assertEqual(attribute.pk, None)
+            self.assertEqual(len(buffer), 6)
+            self.assertEqual(
+                Plan.objects.get(pk=plan.pk).get_attributes_as_dict(),
+                {'a': '1'}
+            )
+
+        self.assertEqual(
+            Plan.objects.get(pk=plan.pk).get_attributes_as_dict(),
+            {'a': '3', 'b': 'x', 'c': '4', 'd': 'v'}
+        )
+        self.assertEqual(
+            Plan.objects.get(pk=self.other.pk).get_attributes_as_dict(),
+            {'a': '9'}
+        )
+
+    def test_discard(self):
+        try:
+            with buffered_attributes():
+                self.plan.update_attributes(attributes={'a': 100})
+                raise ValueError
+        except ValueError:
+            pass
+
+        self.assertEqual(Plan.objects.get(pk=self.plan.pk).a, '1')
+
+    def test_middleware(self):
+        middleware = AttributeWriteBufferMiddleware()
+        request = RequestFactory().get('/')
+        middleware.process_request(request)
+        self.plan.update_attributes(attributes={'a': 5})
+
+        self.assertEqual(Plan.objects.get(pk=self.plan.pk).a, '1')
+
+        middleware.process_response(request, None)
+
+        self.assertEqual(Plan.objects.get(pk=self.plan.pk).a, '5')
+
+    def test_update_of_attributes_not_loaded(self):
+        plan = Plan.objects.filter(pk=self.plan.pk)[0]
+
+        with buffered_attributes():
+            with self.assertNumQueries(0):
+                plan.update_attributes(attributes={'a': 2, 'zz': 3})
+
+            self.assertEqual((plan.a, plan.zz), ('2', '3'))
+
+        # The values are set up again as they were written.
+        self.assertEqual(plan.a, '2')
+        self.assertFalse(hasattr(plan, 'zz'))
+        self.assertEqual(plan.get_attributes_as_dict(), {'a': '2'})
+
+    def test_loaded_attributes(self):
+        plan = Plan.objects.filter(pk=self.plan.pk)[0]
+
+        with buffered_attributes():
+            plan.update_attributes(attributes={'a': 2})
+            plan.update_attributes(attributes={'b': 3}, create=True)
+            # Loads the attributes from the database, which doesn't have the
+            # buffered values yet.
+            plan.get_attributes_as_dict()
+            plan.update_attributes(attributes={'zz': 4})
+
+            self.assertFalse(hasattr(plan, 'zz'))
+
+        self.assertEqual((plan.a, plan.b), ('2', '3'))
+        self.assertEqual(plan.get_attributes_as_dict(), {'a': '2', 'b': '3'})
+
+    def test_lazy(self):
+        plan = LazyPlan.objects.create(title='Plan', attributes={'a': 1})
+        plan = LazyPlan.objects.get(pk=plan.pk)
+
+        with buffered_attributes():
+            with self.assertNumQueries(0):
+                plan.update_attributes(attributes={'a': 2})
+                plan.update_attributes(attributes={'b': 3}, create=True)
+
+                self.assertEqual((plan.a, plan.b), ('2', '3'))
+
+            self.assertEqual(
+                LazyPlan.objects.get(pk=plan.pk).get_attributes_as_dict(),
+                {'a': '1'}
+            )
+
+        self.assertEqual((plan.a, plan.b), ('2', '3'))
+        self.assertEqual(plan.get_attributes_as_dict(), {'a': '2', 'b': '3'})
+        self.assertEqual(
+            LazyPlan.objects.get(pk=plan.pk).get_attributes_as_dict(),
+            {'a': '2', 'b': '3'}
+        )
+
+    def test_compact(self):
+        plan = CompactPlan.objects.create(title='Plan', attributes={'a': 1})
+        plan = CompactPlan.objects.filter(pk=plan.pk)[0]
+
+        with buffered_attributes():
+            plan.update_attributes(attributes={'a': 2, 'zz': 5})
+            plan.create_attributes(attributes={'b': 3})
+
+            self.assertEqual((plan.a, plan.b), ('2', '3'))
+            self.assertFalse(hasattr(plan, 'zz'))
+            self.assertEqual(plan.get_attributes_as_dict(), {'a': '2', 'b': '3'})
+            self.assertFalse('a' in plan.__dict__)
+
+        self.assertEqual((plan.a, plan.b), ('2', '3'))
+        self.assertEqual(plan.get_attributes_as_dict(), {'a': '2', 'b': '3'})
+        self.assertEqual(
+            CompactPlan.objects.get(pk=plan.pk).get_attributes_as_dict(),
+            {'a': '2', 'b': '3'}
+        )
+
+    def test_create_for_another_object(self):
+        with buffered_attributes():
+            self.plan.attributes.create(self.other, name='zz', value=7)
+
+            self.assertEqual(self.other.zz, '7')
+
+        attribute = ModelAttribute.objects.get(name='zz')
+
+        self.assertEqual(attribute.object_id, self.plan.pk)
+        self.assertEqual(self.plan.zz, '7')
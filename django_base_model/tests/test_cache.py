@@ -0,0 +1,128 @@
+"""
+Tests of the shared attribute cache (see django_base_model.cache).
+"""
+
+from django.core.signals import request_finished
+from django.test import TestCase
+
+from django_base_model import cache as attribute_cache
+from django_base_model.models import ModelAttribute
+from django_base_model.registry import get_content_type, warm_content_types
+from django_base_model.tests.models import CachedPlan
+from django_base_model.utils import get_commit_callbacks
+
+
+class SharedAttributeCacheTests(TestCase):
+
+    def setUp(self):
+        warm_content_types('default')
+        attribute_cache.get_attribute_cache().clear()
+        self.content_type_id = get_content_type(CachedPlan, 'default').id
+        self.plan = CachedPlan.objects.create(
+            title='Plan',
+            attributes={'a': '1'}
+        )
+
+    def get_plan(self):
+        return CachedPlan.objects.get(pk=self.plan.pk)
+
+    def test_cached(self):
+        self.get_plan()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.get_plan().a, '1')
+
+        plans = [
+            CachedPlan.objects.create(title='Other', attributes={'z': str(index)})
+            for index in range(5)
+        ]
+        list(CachedPlan.objects.with_attributes())
+
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                [plan.z for plan in CachedPlan.objects.with_attributes().filter(
+                    title='Other'
+                ).order_by('pk')],
+                [plan.z for plan in plans]
+            )
+
+    def test_invalidated_by_changes(self):
+        self.get_plan()
+        self.plan.update_attributes(attributes={'a': '2'})
+
+        self.assertEqual(self.get_plan().a, '2')
+
+        self.plan.attributes.create(name='b', value='3')
+
+        self.assertEqual(self.get_plan().b, '3')
+
+        ModelAttribute.objects.get(name='b').delete()
+
+        self.assertFalse(hasattr(self.get_plan(), 'b'))
+
+        self.plan.create_attributes(attributes={'c': '1'}, bulk=True)
+
+        self.assertEqual(self.get_plan().c, '1')
+
+        self.plan.delete_attributes(attribute_names=['c'])
+
+        self.assertFalse(hasattr(self.get_plan(), 'c'))
+
+        CachedPlan.objects.bulk_set_attributes({self.plan.pk: {'a': '9'}})
+
+        self.assertEqual(self.get_plan().a, '9')
+
+    def test_invalidated_by_query_set_deletion(self):
+        self.plan.attributes.create(name='tier', value='gold')
+        self.assertEqual(self.get_plan().tier, 'gold')
+
+        self.plan.attributes.filter(name='tier').delete()
+
+        self.assertFalse(hasattr(self.get_plan(), 'tier'))
+
+    def test_invalidated_by_owner_deletion(self):
+        self.get_plan()
+        pk = self.plan.pk
+        self.plan.delete()
+
+        self.assertEqual(
+            attribute_cache.get_cached_attributes(self.content_type_id, [pk]),
+            {}
+        )
+
+        plan = CachedPlan(pk=pk, title='Reused')
+        plan.save()
+
+        self.assertFalse(hasattr(CachedPlan.objects.get(pk=pk), 'a'))
+
+    def test_invalidate_model_attributes(self):
+        self.get_plan()
+        ModelAttribute.objects.filter(name='a').update(value='stale')
+
+        self.assertEqual(self.get_plan().a, '1')
+
+        attribute_cache.invalidate_model_attributes(self.content_type_id)
+
+        self.assertEqual(self.get_plan().a, 'stale')
+
+    def test_invalidated_after_commit(self):
+        self.plan.update_attributes(attributes={'a': '2'})
+        # Another process caches the previous attributes before the change is
+        # committed.
+        attribute_cache.set_cached_attributes(
+            self.content_type_id,
+            {self.plan.pk: {'a': '1'}}
+        )
+
+        self.assertTrue(get_commit_callbacks())
+
+        request_finished.send(sender=None)
+
+        self.assertEqual(
+            attribute_cache.get_cached_attributes(
+                self.content_type_id,
+                [self.plan.pk]
+            ),
+            {}
+        )
+        self.assertEqual(get_commit_callbacks(), [])
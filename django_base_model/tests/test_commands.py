@@ -0,0 +1,185 @@
+"""
+Tests of the management commands of django_base_model.
+"""
+
+import datetime
+import decimal
+from StringIO import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TransactionTestCase
+
+from django_base_model.management.commands.upgrade_attribute_columns import (
+    get_column_statements
+)
+from django_base_model.management.commands.upgrade_attribute_indexes import (
+    get_indexes
+)
+from django_base_model.models import (
+    ATTRIBUTE_TYPED_VALUE_FIELDS, ModelAttribute
+)
+from django_base_model.registry import get_content_type
+from django_base_model.tests.models import SnapshotPlan
+
+
+class UpgradeAttributeIndexesTests(TransactionTestCase):
+
+    def tearDown(self):
+        cursor = connection.cursor()
+
+        for name in ('content_object', 'covering', 'former'):
+            cursor.execute(
+                'DROP INDEX IF EXISTS %s_%s' % (
+                    ModelAttribute._meta.db_table,
+                    name
+                )
+            )
+
+    def get_index_names(self):
+        return set(get_indexes(connection, connection.cursor()))
+
+    def create_former_index(self):
+        connection.cursor().execute(
+            'CREATE UNIQUE INDEX %(table)s_former '
+            'ON %(table)s (name, content_type_id, object_id)' % {
+                'table': ModelAttribute._meta.db_table
+            }
+        )
+
+    def test_upgrade(self):
+        table = ModelAttribute._meta.db_table
+
+        # The command can be run again once the indexes exist.
+        for index in range(2):
+            call_command('upgrade_attribute_indexes', covering=True)
+
+        self.assertTrue('%s_content_object' % table in self.get_index_names())
+        self.assertTrue('%s_covering' % table in self.get_index_names())
+        self.assertEqual(
+            get_indexes(connection, connection.cursor())[
+                '%s_content_object' % table
+            ],
+            (True, ['content_type_id', 'object_id', 'name'])
+        )
+
+    def test_drop_former(self):
+        table = ModelAttribute._meta.db_table
+        self.create_former_index()
+        output = StringIO()
+        call_command(
+            'upgrade_attribute_indexes',
+            drop_former=True,
+            sql=True,
+            stdout=output
+        )
+
+        self.assertEqual(
+            output.getvalue().split(';\n')[1:],
+            ['DROP INDEX "%s_former"' % table, '']
+        )
+
+        call_command('upgrade_attribute_indexes', drop_former=True)
+
+        self.assertFalse('%s_former' % table in self.get_index_names())
+        self.assertTrue('%s_content_object' % table in self.get_index_names())
+
+        # Only the former index is dropped.
+        call_command('upgrade_attribute_indexes', drop_former=True)
+
+        self.assertTrue('%s_content_object' % table in self.get_index_names())
+
+    def test_sql(self):
+        output = StringIO()
+        call_command('upgrade_attribute_indexes', sql=True, stdout=output)
+
+        self.assertEqual(output.getvalue().count('CREATE'), 1)
+        self.assertTrue(
+            '"content_type_id", "object_id", "name"' in output.getvalue()
+        )
+
+        call_command('upgrade_attribute_indexes')
+        output = StringIO()
+        call_command('upgrade_attribute_indexes', sql=True, stdout=output)
+
+        # Existing indexes aren't created again.
+        self.assertEqual(output.getvalue(), '')
+
+
+class UpgradeAttributeColumnsTests(TransactionTestCase):
+
+    def test_sql(self):
+        output = StringIO()
+        call_command('upgrade_attribute_columns', sql=True, stdout=output)
+
+        # The columns were created along with the table.
+        self.assertEqual(output.getvalue(), '')
+
+        statements = get_column_statements(connection, ['value'])
+
+        self.assertEqual(
+            len([
+                statement for statement in statements
+                if statement.startswith('ALTER TABLE')
+            ]),
+            5
+        )
+
+    def test_backfill(self):
+        plan = SnapshotPlan.objects.create(title='Plan')
+        content_type = get_content_type(SnapshotPlan, 'default')
+        values = [
+            '42', '007', '1.50', 'True', '2012-06-01 10:30:00', 'abc', '', '-3',
+            '12345678901234567890',
+        ]
+
+        for index, value in enumerate(values):
+            # Stored as text, as ModelAttributes created before they had
+            # value types were.
+            ModelAttribute.objects.filter(
+                pk=ModelAttribute.objects.create(
+                    content_type=content_type,
+                    object_id=plan.pk,
+                    name='n%d' % index
+                ).pk
+            ).update(value=value, value_type='')
+
+        call_command(
+            'upgrade_attribute_columns',
+            backfill=True,
+            chunk_size=3,
+            verbosity=0
+        )
+        attributes = dict(
+            (attribute.name, attribute)
+            for attribute in ModelAttribute.objects.filter(
+                content_type=content_type,
+                object_id=plan.pk
+            )
+        )
+
+        self.assertEqual(
+            (attributes['n0'].value_type, attributes['n0'].value_integer),
+            ('', 42)
+        )
+        self.assertEqual(attributes['n2'].value_decimal, decimal.Decimal('1.5'))
+        self.assertEqual(attributes['n3'].value_boolean, True)
+        self.assertEqual(
+            attributes['n4'].value_datetime,
+            datetime.datetime(2012, 6, 1, 10, 30)
+        )
+        self.assertEqual(attributes['n7'].value_integer, -3)
+
+        for name in ('n1', 'n5', 'n6', 'n8'):
+            self.assertEqual(
+                [
+                    getattr(attributes[name], field_name)
+                    for field_name in ATTRIBUTE_TYPED_VALUE_FIELDS.values()
+                ],
+                [None] * 4
+            )
+
+        self.assertEqual(
+            list(SnapshotPlan.objects.filter_by_attributes(n0__gte=40)),
+            [plan]
+        )
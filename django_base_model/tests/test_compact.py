@@ -0,0 +1,77 @@
+"""
+Tests of compact attributes (see django_base_model.compact).
+"""
+
+import pickle
+
+from django.test import TestCase
+
+from django_base_model.compact import CompactAttributes
+from django_base_model.tests.models import CompactPlan
+
+
+class CompactAttributeTests(TestCase):
+
+    def setUp(self):
+        self.plan = CompactPlan.objects.create(
+            title='Plan',
+            attributes={'a': '1', 'title': 'shadow'}
+        )
+
+    def test_container(self):
+        self.assertEqual((self.plan.a, self.plan.title), ('1', 'Plan'))
+        self.assertFalse('a' in self.plan.__dict__)
+        self.assertTrue(
+            isinstance(self.plan._attribute_cache, CompactAttributes)
+        )
+
+        plan = CompactPlan.objects.get(pk=self.plan.pk)
+
+        self.assertEqual(plan.a, '1')
+        self.assertEqual(
+            plan.get_attributes_as_dict(),
+            {'a': '1', 'title': 'shadow'}
+        )
+
+    def test_changes(self):
+        self.plan.update_attributes(attributes={'a': '2', 'b': '3'}, create=True)
+
+        self.assertEqual((self.plan.a, self.plan.b), ('2', '3'))
+
+        self.plan.delete_attributes(attribute_names=['b'])
+
+        self.assertFalse(hasattr(self.plan, 'b'))
+
+        self.plan.attributes.create(self.plan, name='c', value='z')
+
+        self.assertEqual(self.plan.c, 'z')
+
+        self.plan.delete_attributes()
+
+        self.assertFalse(hasattr(self.plan, 'a'))
+        self.assertEqual(self.plan.get_attributes_as_dict(), {})
+
+    def test_set_attribute(self):
+        plan = CompactPlan(title='x')
+        plan.set_attribute('tier', 2)
+
+        self.assertEqual(plan.tier, 2)
+
+        plan = CompactPlan.objects.get(pk=self.plan.pk)
+        plan.set_attribute('b', '2')
+
+        self.assertEqual((plan.a, plan.b), ('1', '2'))
+
+    def test_resolved_on_access(self):
+        plan = CompactPlan.objects.filter(pk=self.plan.pk)[0]
+
+        self.assertEqual(plan.a, '1')
+        self.assertEqual(list(CompactPlan.objects.all_with_attributes())[0].a, '1')
+
+    def test_pickle(self):
+        plan = pickle.loads(pickle.dumps(self.plan, 2))
+
+        self.assertEqual(plan.a, '1')
+        self.assertTrue(
+            plan._attribute_cache._table is self.plan._attribute_cache._table
+        )
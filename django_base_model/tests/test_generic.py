@@ -0,0 +1,150 @@
+"""
+Tests of the related manager of the attributes of BaseModel objects (see
+django_base_model.generic).
+"""
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+
+from django_base_model.models import ModelAttribute
+from django_base_model.registry import warm_content_types
+from django_base_model.tests.models import CompactPlan, Plan, SnapshotPlan
+
+
+class RelatedAttributeManagerTests(TestCase):
+
+    def setUp(self):
+        warm_content_types('default')
+        self.plan = Plan.objects.create(
+            title='Plan',
+            attributes=dict(('a%d' % index, index) for index in range(50))
+        )
+        self.other = Plan.objects.create(title='Other', attributes={'keep': '1'})
+
+    def test_clear(self):
+        with self.assertNumQueries(1):
+            self.plan.attributes.clear()
+
+        self.assertFalse(hasattr(self.plan, 'a1'))
+        self.assertEqual(self.plan.get_attributes_as_dict(), {})
+        self.assertEqual(ModelAttribute.objects.count(), 1)
+
+    def test_clear_with_signals(self):
+        self.plan.create_attributes(attributes={'title': 'no'}, bulk=True)
+        self.plan.attributes.clear(send_signals=True)
+
+        self.assertEqual(self.plan.title, 'Plan')
+        self.assertEqual(self.plan.get_attributes_as_dict(), {})
+        self.assertEqual(ModelAttribute.objects.count(), 1)
+
+    def test_remove(self):
+        attributes = list(self.plan.attributes.filter(name__in=['a1', 'a2']))
+
+        with self.assertNumQueries(1):
+            self.plan.attributes.remove(*attributes)
+
+        self.assertFalse(hasattr(self.plan, 'a1'))
+        self.assertFalse('a2' in self.plan.get_attributes_as_dict())
+        self.assertEqual(self.plan.attributes.count(), 48)
+
+    def test_remove_attributes_of_another_object(self):
+        attributes = [
+            self.plan.attributes.get(name='a1'),
+            self.other.attributes.get(name='keep'),
+        ]
+
+        for send_signals in (False, True):
+            self.assertRaises(
+                ModelAttribute.DoesNotExist,
+                self.plan.attributes.remove,
+                *attributes,
+                send_signals=send_signals
+            )
+
+        self.assertEqual(self.plan.attributes.count(), 50)
+        self.assertEqual(Plan.objects.get(pk=self.other.pk).keep, '1')
+
+    def test_add(self):
+        attribute = ModelAttribute.objects.get(name='keep')
+
+        with self.assertNumQueries(2):
+            self.plan.attributes.add(attribute)
+
+        self.assertEqual(self.plan.keep, '1')
+        self.assertEqual(self.plan.get_attributes_as_dict()['keep'], '1')
+        self.assertEqual(Plan.objects.get(pk=self.plan.pk).keep, '1')
+        self.assertEqual(
+            Plan.objects.get(pk=self.other.pk).get_attributes_as_dict(),
+            {}
+        )
+
+    def test_add_clashing_name(self):
+        attribute = self.other.attributes.create(name='a1', value='other')
+
+        for bulk in (True, False):
+            self.assertRaises(
+                ValidationError,
+                self.plan.attributes.add,
+                attribute,
+                bulk=bulk
+            )
+
+        self.assertEqual(self.plan.a1, '1')
+        self.assertEqual(self.plan.get_attributes_as_dict()['a1'], '1')
+        self.assertEqual(Plan.objects.get(pk=self.other.pk).a1, 'other')
+
+    def test_add_unsaved(self):
+        self.plan.attributes.add(ModelAttribute(name='new', value='x'))
+
+        self.assertEqual(self.plan.new, 'x')
+        self.assertEqual(Plan.objects.get(pk=self.plan.pk).new, 'x')
+
+    def test_add_to_compact(self):
+        plan = CompactPlan.objects.create(title='Plan', attributes={'a': 1})
+        plan.attributes.add(ModelAttribute.objects.get(name='keep'))
+
+        self.assertEqual(plan.keep, '1')
+        self.assertFalse('keep' in plan.__dict__)
+
+    def test_add_refreshes_previous_owner(self):
+        plan = SnapshotPlan.objects.create(
+            title='Plan',
+            attributes={'moved': 'x', 'stay': 'y'}
+        )
+        other = SnapshotPlan.objects.create(title='Other')
+
+        self.assertEqual(SnapshotPlan.objects.get(pk=plan.pk).moved, 'x')
+
+        other.attributes.add(plan.attributes.get(name='moved'))
+
+        self.assertEqual(other.moved, 'x')
+        self.assertEqual(
+            SnapshotPlan.objects.get(pk=plan.pk).get_attributes_as_dict(),
+            {'stay': 'y'}
+        )
+        self.assertEqual(SnapshotPlan.objects.get(pk=other.pk).moved, 'x')
+
+
+class RelatedAttributeDescriptorTests(TestCase):
+
+    def test_manager_class(self):
+        plan = Plan.objects.create(title='Plan', attributes={'a': 1})
+        other = SnapshotPlan.objects.create(title='Other')
+
+        self.assertTrue(type(plan.attributes) is type(other.attributes))
+        self.assertTrue(
+            type(plan.attributes) is Plan.attributes.related_manager_class
+        )
+
+    def test_no_queries(self):
+        plan = Plan.objects.create(title='Plan', attributes={'a': 1})
+
+        with self.assertNumQueries(0):
+            for index in range(10):
+                plan.attributes
+
+        self.assertEqual(plan.attributes.get(name='a').native_value, '1')
+        self.assertEqual(
+            Plan.objects.get(pk=plan.pk).attributes.content_type,
+            plan.attributes.content_type
+        )
@@ -0,0 +1,107 @@
+"""
+Tests of the instrumentation of attribute operations (see
+django_base_model.instrumentation).
+"""
+
+import logging
+
+from django.db import connection
+from django.test import TestCase
+
+from django_base_model import instrumentation
+from django_base_model.models import ModelAttribute
+from django_base_model.registry import warm_content_types
+from django_base_model.tests.models import Plan
+
+
+class StatsdClient(object):
+    """
+    Records the calls made to it the way a statsd client would send them.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def incr(self, name, count=1):
+        self.calls.append(('incr', name, count))
+
+    def timing(self, name, duration):
+        self.calls.append(('timing', name))
+
+
+class RecordingHandler(logging.Handler):
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+class InstrumentationTests(TestCase):
+
+    def setUp(self):
+        warm_content_types('default')
+        plan = Plan.objects.create(title='Plan', attributes={'a': 1, 'b': 2})
+        self.plan = Plan.objects.get(pk=plan.pk)
+
+    def test_disabled(self):
+        self.assertFalse(instrumentation.is_enabled())
+
+    def test_collect_stats(self):
+        queries = len(connection.queries)
+
+        with instrumentation.collect_stats() as stats:
+            self.plan.refresh_attributes()
+            self.plan.get_attributes_as_dict()
+            self.plan.update_attributes(attributes={'a': 5, 'c': 1}, create=True)
+            self.plan.attributes.create(self.plan, name='d', value='1')
+
+        # The queries are counted without being logged on the connection.
+        self.assertEqual(len(connection.queries), queries)
+        self.assertFalse(instrumentation.is_enabled())
+
+        get_stats = stats.get('get_attributes_as_dict', Plan)
+
+        self.assertEqual(
+            (get_stats.calls, get_stats.queries, get_stats.rows),
+            (1, 1, 2)
+        )
+
+        update_stats = stats.get('update_attributes')
+
+        self.assertEqual(update_stats.rows, 2)
+        self.assertTrue(update_stats.queries >= 3)
+        self.assertEqual(stats.get('related_create').calls, 1)
+        self.assertEqual(stats.get('save', ModelAttribute).calls, 1)
+
+        client = StatsdClient()
+        stats.export(instrumentation.StatsdExporter(client))
+
+        self.assertTrue(
+            ('incr', 'django_base_model.tests.plan.update_attributes.rows', 2)
+            in client.calls
+        )
+
+    def test_logging_exporter(self):
+        handler = RecordingHandler()
+        logger = logging.getLogger('django_base_model.tests')
+        logger.addHandler(handler)
+        logger.setLevel(logging.DEBUG)
+        exporter = instrumentation.LoggingExporter(logger)
+        exporter.connect()
+
+        try:
+            self.plan.get_attributes_as_dict()
+        finally:
+            exporter.disconnect()
+            logger.removeHandler(handler)
+
+        self.assertFalse(instrumentation.is_enabled())
+        self.assertTrue(
+            handler.messages[0].startswith(
+                'tests.Plan get_attributes_as_dict: queries=0 rows=2'
+            ),
+            handler.messages
+        )
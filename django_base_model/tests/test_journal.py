@@ -0,0 +1,136 @@
+"""
+Tests of the journal of attribute changes (see django_base_model.journal).
+"""
+
+from django.core.management import call_command
+from django.test import TransactionTestCase
+
+from django_base_model import journal
+from django_base_model.models import AttributeChange
+from django_base_model.tests.models import JournalPlan, Plan
+
+
+class AttributeJournalTests(TransactionTestCase):
+
+    def get_changes(self, since=0):
+        return [
+            (change.operation, change.name, change.old_value, change.new_value)
+            for change in AttributeChange.objects.changes_since(since)
+        ]
+
+    def get_last_seq(self):
+        return AttributeChange.objects.changes_since()[-1].seq
+
+    def test_not_journaled(self):
+        Plan.objects.create(title='Plan', attributes={'a': 1})
+
+        self.assertEqual(self.get_changes(), [])
+
+    def test_changes(self):
+        plan = JournalPlan.objects.create(
+            title='Plan',
+            attributes={'a': 1, 'b': 'q'}
+        )
+
+        self.assertEqual(
+            sorted(self.get_changes()),
+            [('create', 'a', None, '1'), ('create', 'b', None, 'q')]
+        )
+
+        last = self.get_last_seq()
+        plan.update_attributes(
+            attributes={'a': 2, 'b': 'q', 'c': 3},
+            create=True
+        )
+
+        self.assertEqual(
+            sorted(self.get_changes(last)),
+            [('create', 'c', None, '3'), ('update', 'a', '1', '2')]
+        )
+
+        last = self.get_last_seq()
+        plan.delete_attributes(attribute_names=['c'])
+
+        self.assertEqual(self.get_changes(last), [('delete', 'c', '3', None)])
+
+        last = self.get_last_seq()
+        attribute = plan.attributes.get(name='a')
+        attribute.value = 5
+        attribute.save()
+        attribute.delete()
+
+        self.assertEqual(
+            self.get_changes(last),
+            [('update', 'a', '2', '5'), ('delete', 'a', '5', None)]
+        )
+
+        last = self.get_last_seq()
+        plan.attributes.create(plan, name='d', value='1')
+        plan.attributes.clear()
+
+        self.assertEqual(
+            sorted(self.get_changes(last)),
+            [
+                ('create', 'd', None, '1'),
+                ('delete', 'b', 'q', None),
+                ('delete', 'd', '1', None),
+            ]
+        )
+
+    def test_bulk_changes(self):
+        plan = JournalPlan.objects.create(title='Plan')
+        JournalPlan.objects.bulk_set_attributes({plan.pk: {'e': 1}})
+
+        self.assertEqual(self.get_changes(), [('create', 'e', None, '1')])
+
+        other = JournalPlan.objects.create(title='Other', attributes={'f': 1})
+        last = self.get_last_seq()
+        other.attributes.remove(*list(other.attributes.all()))
+
+        self.assertEqual(self.get_changes(last), [('delete', 'f', '1', None)])
+
+        other = JournalPlan.objects.create(title='Other', attributes={'g': 1})
+        last = self.get_last_seq()
+        plan.attributes.add(*list(other.attributes.all()))
+
+        self.assertEqual(
+            [
+                (change.operation, change.name, change.object_id)
+                for change in AttributeChange.objects.changes_since(last)
+            ],
+            [('delete', 'g', other.pk), ('create', 'g', plan.pk)]
+        )
+
+        last = self.get_last_seq()
+        plan.delete()
+
+        self.assertEqual(
+            sorted(self.get_changes(last)),
+            [('delete', 'e', '1', None), ('delete', 'g', '1', None)]
+        )
+
+    def test_compact(self):
+        plan = JournalPlan.objects.create(title='Plan', attributes={'a': 1})
+
+        for value in range(2, 6):
+            plan.update_attributes(attributes={'a': value, 'b': value}, create=True)
+
+        total = AttributeChange.objects.count()
+        removed = journal.compact_changes(chunk_size=3)
+        keys = [
+            (change.content_type_id, change.object_id, change.name)
+            for change in AttributeChange.objects.all()
+        ]
+
+        self.assertTrue(removed > 0)
+        self.assertEqual(len(keys), len(set(keys)))
+        self.assertEqual(AttributeChange.objects.count(), total - removed)
+
+        call_command(
+            'compact_attribute_changes',
+            purge=True,
+            before=self.get_last_seq() + 1,
+            verbosity=0
+        )
+
+        self.assertEqual(AttributeChange.objects.count(), 0)
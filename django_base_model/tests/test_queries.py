@@ -0,0 +1,396 @@
+"""
+Tests of the QuerySet methods of models that inherit from BaseModel.
+"""
+
+import decimal
+
+from django.contrib.auth.models import User
+from django.core.exceptions import FieldError
+from django.test import TestCase
+
+from django_base_model.models import ModelAttribute
+from django_base_model.registry import warm_content_types
+from django_base_model.tests.models import ChildPlan, Plan
+
+
+def get_titles(query_set):
+    return sorted(plan.title for plan in query_set)
+
+
+class AttributeFilterTests(TestCase):
+
+    def setUp(self):
+        warm_content_types('default')
+
+        for index in range(6):
+            Plan.objects.create(
+                title='p%d' % index,
+                attributes={
+                    'region': 'east' if index % 2 else 'west',
+                    'tier': index,
+                    'code': 'ab%d' % index,
+                }
+            )
+
+        Plan.objects.create(title='none')
+
+    def test_filter(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                get_titles(Plan.objects.filter_by_attributes(
+                    region='east',
+                    tier__gte=3
+                )),
+                ['p3', 'p5']
+            )
+
+        self.assertEqual(
+            get_titles(Plan.objects.filter_by_attributes(tier__in=[1, 2])),
+            ['p1', 'p2']
+        )
+        self.assertEqual(
+            get_titles(Plan.objects.filter_by_attributes(
+                region__in=['west']
+            ).exclude(title='p0')),
+            ['p2', 'p4']
+        )
+        self.assertEqual(
+            get_titles(Plan.objects.filter_by_attributes(tier__in=[])),
+            []
+        )
+        self.assertEqual(
+            get_titles(Plan.objects.filter_by_attributes(
+                region='east'
+            ).with_attributes().filter(title='p1')),
+            ['p1']
+        )
+
+    def test_numeric_range_lookups(self):
+        Plan.objects.all().delete()
+
+        for title, price in (('int', '12'), ('dec', '12.50'), ('low', '9.5')):
+            Plan.objects.create(title=title, attributes={'price': price})
+
+        for value in (10, 10.0, decimal.Decimal('10')):
+            self.assertEqual(
+                get_titles(Plan.objects.filter_by_attributes(price__gte=value)),
+                ['dec', 'int']
+            )
+
+        self.assertEqual(
+            get_titles(Plan.objects.filter_by_attributes(price__gt=12.25)),
+            ['dec']
+        )
+        self.assertEqual(
+            get_titles(Plan.objects.filter_by_attributes(price__lt=12)),
+            ['low']
+        )
+        self.assertEqual(
+            get_titles(Plan.objects.exclude_by_attributes(price__lte=12)),
+            ['dec']
+        )
+
+    def test_text_lookups(self):
+        self.assertEqual(
+            get_titles(Plan.objects.filter_by_attributes(
+                code__startswith='ab1'
+            )),
+            ['p1']
+        )
+        self.assertEqual(
+            get_titles(Plan.objects.filter_by_attributes(code__contains='b2')),
+            ['p2']
+        )
+        self.assertEqual(
+            get_titles(Plan.objects.filter_by_attributes(code__iexact='AB3')),
+            ['p3']
+        )
+        self.assertEqual(
+            get_titles(Plan.objects.filter_by_attributes(
+                code__istartswith='AB',
+                code__iendswith='B4'
+            )),
+            ['p4']
+        )
+
+    def test_isnull(self):
+        self.assertEqual(
+            get_titles(Plan.objects.filter_by_attributes(region__isnull=True)),
+            ['none']
+        )
+
+    def test_exclude(self):
+        self.assertEqual(
+            get_titles(Plan.objects.exclude_by_attributes(
+                region='east',
+                tier__gt=1
+            )),
+            ['none', 'p0', 'p1', 'p2', 'p4']
+        )
+
+    def test_unsupported_lookup(self):
+        self.assertRaises(
+            FieldError,
+            Plan.objects.filter_by_attributes,
+            tier__range=(1, 2)
+        )
+
+    def test_order_by(self):
+        query_set = Plan.objects.filter(title__startswith='p')
+
+        self.assertEqual(
+            [plan.title for plan in query_set.order_by_attributes(
+                '-tier',
+                value_types={'tier': 'integer'}
+            )],
+            ['p5', 'p4', 'p3', 'p2', 'p1', 'p0']
+        )
+        self.assertEqual(
+            [plan.title for plan in query_set.order_by_attributes(
+                'region',
+                '-code'
+            )],
+            ['p5', 'p3', 'p1', 'p4', 'p2', 'p0']
+        )
+
+    def test_values_stored_as_text(self):
+        Plan.objects.all().delete()
+        plans = [Plan.objects.create(title='p%d' % index) for index in range(3)]
+        plans[0].create_attributes(attributes={'level': 2})
+        plans[1].create_attributes(attributes={'level': '2'})
+        plans[2].create_attributes(attributes={'level': '007'})
+        attribute = ModelAttribute.objects.get(object_id=plans[1].pk)
+
+        self.assertEqual((attribute.value_type, attribute.value_integer), ('', 2))
+        self.assertEqual(
+            get_titles(Plan.objects.filter_by_attributes(level=2)),
+            ['p0', 'p1']
+        )
+        self.assertEqual(
+            get_titles(Plan.objects.filter_by_attributes(level='2')),
+            ['p0', 'p1']
+        )
+        self.assertEqual(
+            get_titles(Plan.objects.filter_by_attributes(level__in=[2, 7])),
+            ['p0', 'p1']
+        )
+        self.assertEqual(
+            get_titles(Plan.objects.exclude_by_attributes(level=2)),
+            ['p2']
+        )
+        # Text that isn't a valid integer isn't compared by range lookups.
+        self.assertEqual(
+            get_titles(Plan.objects.filter_by_attributes(level__gte=2)),
+            ['p0', 'p1']
+        )
+
+
+class IterWithAttributesTests(TestCase):
+
+    def setUp(self):
+        warm_content_types('default')
+
+        for index in range(25):
+            Plan.objects.create(title='p%02d' % index, attributes={'n': str(index)})
+
+    def test_chunks(self):
+        # A query for the objects of each chunk and one for their attributes,
+        # in order of primary key whatever the ordering of the QuerySet.
+        with self.assertNumQueries(6):
+            plans = list(
+                Plan.objects.order_by('-title').iter_with_attributes(
+                    chunk_size=10
+                )
+            )
+
+        self.assertEqual(
+            [plan.n for plan in plans],
+            [str(index) for index in range(25)]
+        )
+
+    def test_as_dicts(self):
+        rows = list(
+            Plan.objects.filter(title__startswith='p').order_by(
+                'title'
+            ).iter_with_attributes(chunk_size=5, as_dicts=True)
+        )
+
+        self.assertEqual(len(rows), 25)
+        self.assertEqual(rows[3]['attributes'], {'n': '3'})
+        self.assertEqual(rows[3]['title'], 'p03')
+
+    def test_empty(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                list(Plan.objects.filter(title='none').iter_with_attributes()),
+                []
+            )
+
+    def test_sliced(self):
+        self.assertRaises(
+            AssertionError,
+            Plan.objects.all()[:3].iter_with_attributes
+        )
+
+
+class ValuesWithAttributesTests(TestCase):
+
+    def setUp(self):
+        warm_content_types('default')
+
+        for index in range(5):
+            if index == 2:
+                attributes = {'n': str(index)}
+            else:
+                attributes = {'n': str(index), 's': 'x%d' % index}
+
+            Plan.objects.create(title='p%d' % index, attributes=attributes)
+
+    def test_named_attributes(self):
+        with self.assertNumQueries(1):
+            rows = Plan.objects.order_by('title').values_with_attributes(
+                'title',
+                attributes=['n', 's', 'title']
+            )
+
+        self.assertEqual(rows[2], {'title': 'p2', 'n': '2', 's': None})
+        self.assertEqual(rows[3], {'title': 'p3', 'n': '3', 's': 'x3'})
+
+    def test_all_attributes(self):
+        with self.assertNumQueries(2):
+            rows = Plan.objects.filter(
+                title__in=['p1', 'p2']
+            ).order_by('title').values_with_attributes('title')
+
+        self.assertEqual(
+            rows,
+            [
+                {'title': 'p1', 'n': '1', 's': 'x1'},
+                {'title': 'p2', 'n': '2', 's': None},
+            ]
+        )
+
+    def test_all_fields(self):
+        row = Plan.objects.filter(title='p4').values_with_attributes(
+            attributes=['n']
+        )[0]
+
+        self.assertEqual((row['n'], row['title']), ('4', 'p4'))
+
+        row = Plan.objects.filter(title='p4').values_with_attributes()[0]
+
+        self.assertEqual(row['s'], 'x4')
+        self.assertTrue('id' in row)
+
+
+class AuditedUpdateTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username='auditor')
+        self.plans = [
+            Plan.objects.create(title='p%d' % index) for index in range(7)
+        ]
+        self.query_set = Plan.objects.filter(
+            pk__in=[plan.pk for plan in self.plans]
+        )
+        self.query_set.update(time_modified=None, last_modified_by=None)
+
+    def test_audited_update(self):
+        with self.assertNumQueries(1):
+            count = self.query_set.filter(
+                title__in=['p0', 'p1']
+            ).audited_update(self.user, title='x')
+
+        plan = Plan.objects.get(pk=self.plans[0].pk)
+
+        self.assertEqual(count, 2)
+        self.assertEqual(
+            (plan.title, plan.last_modified_by_id),
+            ('x', self.user.pk)
+        )
+        self.assertTrue(plan.time_modified is not None)
+        self.assertEqual(self.query_set.audited_update(None, title='y'), 7)
+        self.assertEqual(
+            self.query_set.filter(last_modified_by__isnull=True).count(),
+            7
+        )
+
+    def test_audited_bulk_update(self):
+        for index, plan in enumerate(self.plans):
+            plan.title = 'b%d' % index
+
+        with self.assertNumQueries(3):
+            count = Plan.objects.audited_bulk_update(
+                self.plans,
+                ['title'],
+                user=self.user,
+                batch_size=3
+            )
+
+        self.assertEqual(count, 7)
+        self.assertEqual(self.plans[0].last_modified_by, self.user)
+
+        for index, plan in enumerate(self.query_set.order_by('pk')):
+            self.assertEqual(
+                (plan.title, plan.last_modified_by_id),
+                ('b%d' % index, self.user.pk)
+            )
+            self.assertTrue(plan.time_modified is not None)
+
+        Plan.objects.audited_bulk_update(self.plans, [], user=None)
+
+        self.assertEqual(
+            self.query_set.filter(last_modified_by__isnull=True).count(),
+            7
+        )
+
+    def test_audited_bulk_update_inherited(self):
+        children = [
+            ChildPlan.objects.create(title='c%d' % index) for index in range(3)
+        ]
+        ChildPlan.objects.update(time_modified=None, last_modified_by=None)
+
+        for index, child in enumerate(children):
+            child.title = 't%d' % index
+            child.extra = 'e%d' % index
+
+        count = ChildPlan.objects.audited_bulk_update(
+            children,
+            ['title', 'extra'],
+            user=self.user,
+            batch_size=2
+        )
+
+        self.assertEqual(count, 3)
+
+        for index, child in enumerate(ChildPlan.objects.order_by('pk')):
+            self.assertEqual(
+                (child.title, child.extra, child.last_modified_by_id),
+                ('t%d' % index, 'e%d' % index, self.user.pk)
+            )
+            self.assertTrue(child.time_modified is not None)
+
+        self.assertEqual(
+            ChildPlan.objects.audited_update(None, extra='x'),
+            3
+        )
+        self.assertEqual(
+            ChildPlan.objects.filter(
+                extra='x',
+                last_modified_by__isnull=True
+            ).count(),
+            3
+        )
+
+    def test_audited_bulk_update_without_objects(self):
+        self.assertEqual(
+            Plan.objects.audited_bulk_update([], ['title'], self.user),
+            0
+        )
+        self.assertRaises(
+            ValueError,
+            Plan.objects.audited_bulk_update,
+            [Plan(title='Unsaved')],
+            ['title'],
+            self.user
+        )
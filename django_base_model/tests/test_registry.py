@@ -0,0 +1,54 @@
+"""
+Tests of the registry of BaseModel content types (see
+django_base_model.registry).
+"""
+
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+
+from django_base_model import registry
+from django_base_model.models import ModelAttribute
+from django_base_model.tests.models import CachedPlan, Plan
+
+
+class ContentTypeRegistryTests(TestCase):
+
+    def setUp(self):
+        self.plan = Plan.objects.create(title='Plan', attributes={'a': 1})
+        registry.clear_content_types()
+        ContentType.objects.clear_cache()
+
+    def test_warmed_once(self):
+        # Every BaseModel subclass is registered with a single query.
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                registry.get_content_type(Plan, 'default'),
+                ContentType.objects.get_for_model(Plan)
+            )
+
+        with self.assertNumQueries(0):
+            registry.get_content_type(CachedPlan, 'default')
+            registry.get_content_type_for_id(
+                registry.get_content_type(Plan, 'default').id,
+                'default'
+            )
+
+        self.assertTrue('default' in registry._warmed)
+
+    def test_independent_of_content_type_cache(self):
+        registry.warm_content_types('default')
+        ContentType.objects.clear_cache()
+
+        # Retrieving the object with its attributes, then its ModelAttribute
+        # and the attribute's owner, doesn't query the ContentTypes.
+        with self.assertNumQueries(4):
+            plan = Plan.objects.get(pk=self.plan.pk)
+            attribute = ModelAttribute.objects.get(object_id=plan.pk, name='a')
+
+            self.assertEqual(attribute.content_object, plan)
+
+    def test_cleared_when_content_types_are_deleted(self):
+        registry.warm_content_types('default')
+        ContentType.objects.get_for_model(ModelAttribute).delete()
+
+        self.assertEqual(registry._warmed, set())
@@ -0,0 +1,156 @@
+"""
+Tests of attribute snapshots (see django_base_model.snapshot).
+"""
+
+from django.core.management import call_command
+from django.test import TransactionTestCase
+
+from django_base_model.models import ModelAttribute
+from django_base_model.registry import get_content_type
+from django_base_model.snapshot import load_snapshot
+from django_base_model.tests.models import (
+    ChildSnapshotPlan, Plan, SnapshotPlan
+)
+
+
+class AttributeSnapshotTests(TransactionTestCase):
+
+    def setUp(self):
+        self.attributes = {'n': '1', 'd': '1.5', 's': 'x'}
+        self.plan = SnapshotPlan.objects.create(
+            title='Plan',
+            attributes=self.attributes
+        )
+
+    def get_plan(self):
+        return SnapshotPlan.objects.get(pk=self.plan.pk)
+
+    def test_single_read(self):
+        get_content_type(SnapshotPlan, 'default')
+
+        with self.assertNumQueries(1):
+            plan = self.get_plan()
+
+            self.assertEqual(plan.get_attributes_as_dict(), self.attributes)
+            self.assertEqual(plan.n, '1')
+
+        with self.assertNumQueries(1):
+            plans = list(SnapshotPlan.objects.all_with_attributes())
+
+            self.assertEqual(plans[0].s, 'x')
+
+    def test_changes(self):
+        stale = self.get_plan()
+        self.plan.update_attributes(attributes={'n': '2', 'new': 'y'}, create=True)
+
+        self.assertEqual(self.plan.get_attributes_as_dict()['n'], '2')
+        self.assertEqual(
+            self.get_plan().get_attributes_as_dict(),
+            {'n': '2', 'd': '1.5', 's': 'x', 'new': 'y'}
+        )
+
+        # Saving an object loaded before the change keeps the new snapshot.
+        stale.title = 'Changed'
+        stale.save()
+        plan = self.get_plan()
+
+        self.assertEqual((plan.title, plan.n), ('Changed', '2'))
+
+        plan.delete_attributes(attribute_names=['s'])
+
+        self.assertFalse('s' in self.get_plan().get_attributes_as_dict())
+
+        plan.attributes.create(plan, name='created', value='1')
+
+        self.assertEqual(self.get_plan().created, '1')
+
+        ModelAttribute.objects.create(
+            content_type=get_content_type(SnapshotPlan, 'default'),
+            object_id=plan.pk,
+            name='direct',
+            value='3',
+            value_type='integer'
+        )
+
+        self.assertEqual(self.get_plan().direct, 3)
+
+        plan.attributes.clear()
+
+        self.assertEqual(self.get_plan().get_attributes_as_dict(), {})
+
+    def test_query_set_deletion(self):
+        self.plan.attributes.filter(name='s').delete()
+
+        self.assertEqual(
+            self.get_plan().get_attributes_as_dict(),
+            {'n': '1', 'd': '1.5'}
+        )
+
+    def test_delete_attributes(self):
+        plan = SnapshotPlan.objects.create(
+            title='Many',
+            attributes=dict(('a%d' % index, str(index)) for index in range(20))
+        )
+
+        # The DELETE, then the query for the remaining ModelAttributes and the
+        # UPDATE of the snapshot.
+        with self.assertNumQueries(3):
+            plan.delete_attributes()
+
+        self.assertEqual(
+            SnapshotPlan.objects.get(pk=plan.pk).get_attributes_as_dict(),
+            {}
+        )
+
+    def test_inherited_snapshot(self):
+        plan = ChildSnapshotPlan.objects.create(
+            title='Child',
+            attributes={'tier': '1'}
+        )
+        plan.update_attributes(attributes={'tier': '2', 'new': 'y'}, create=True)
+        plan = ChildSnapshotPlan.objects.get(pk=plan.pk)
+
+        self.assertEqual(
+            load_snapshot(plan.attribute_snapshot),
+            {'tier': '2', 'new': 'y'}
+        )
+        self.assertEqual(plan.tier, '2')
+
+    def test_refresh(self):
+        plan = self.get_plan()
+        plan.refresh_attributes()
+        plan.title = 'Changed'
+        plan.save()
+
+        self.assertEqual(self.get_plan().get_attributes_as_dict(), self.attributes)
+
+    def test_rebuild(self):
+        get_content_type(SnapshotPlan, 'default')
+        SnapshotPlan.objects.update(attribute_snapshot='')
+
+        # Without a snapshot, the attributes are queried.
+        with self.assertNumQueries(2):
+            self.assertEqual(self.get_plan().n, '1')
+
+        call_command(
+            'rebuild_attribute_snapshots',
+            'tests.SnapshotPlan',
+            verbosity=0
+        )
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.get_plan().n, '1')
+
+    def test_default(self):
+        plan = SnapshotPlan.objects.create(title='Other')
+
+        self.assertEqual(plan.attribute_snapshot, '{}')
+        self.assertEqual(
+            SnapshotPlan._meta.get_field('attribute_snapshot').get_default(),
+            ''
+        )
+
+    def test_without_snapshots(self):
+        plan = Plan.objects.create(title='Plan', attributes={'a': 1})
+
+        self.assertEqual(Plan.objects.get(pk=plan.pk).a, '1')
@@ -0,0 +1,57 @@
+from django_base_model.tests.test_admin import (
+    BaseModelAdminChangeListTests, BaseModelAdminFormsetTests
+)
+from django_base_model.tests.test_asynchronous import (
+    AsynchronousAttributeTests
+)
+from django_base_model.tests.test_attributes import (
+    AttributeCacheTests, BulkAttributeTests, BulkCreateAttributeTests,
+    LazyAttributeTests, PrefetchAttributeTests, TypedAttributeTests,
+    UpdateAttributeTests, UpdateAttributeTransactionTests
+)
+from django_base_model.tests.test_buffer import AttributeWriteBufferTests
+from django_base_model.tests.test_cache import SharedAttributeCacheTests
+from django_base_model.tests.test_commands import (
+    UpgradeAttributeColumnsTests, UpgradeAttributeIndexesTests
+)
+from django_base_model.tests.test_compact import CompactAttributeTests
+from django_base_model.tests.test_generic import (
+    RelatedAttributeDescriptorTests, RelatedAttributeManagerTests
+)
+from django_base_model.tests.test_instrumentation import InstrumentationTests
+from django_base_model.tests.test_journal import AttributeJournalTests
+from django_base_model.tests.test_queries import (
+    AttributeFilterTests, AuditedUpdateTests, IterWithAttributesTests,
+    ValuesWithAttributesTests
+)
+from django_base_model.tests.test_registry import ContentTypeRegistryTests
+from django_base_model.tests.test_snapshot import AttributeSnapshotTests
+
+__all__ = [
+    'AsynchronousAttributeTests',
+    'AttributeCacheTests',
+    'AttributeFilterTests',
+    'AttributeJournalTests',
+    'AttributeSnapshotTests',
+    'AttributeWriteBufferTests',
+    'AuditedUpdateTests',
+    'BaseModelAdminChangeListTests',
+    'BaseModelAdminFormsetTests',
+    'BulkAttributeTests',
+    'BulkCreateAttributeTests',
+    'CompactAttributeTests',
+    'ContentTypeRegistryTests',
+    'InstrumentationTests',
+    'IterWithAttributesTests',
+    'LazyAttributeTests',
+    'PrefetchAttributeTests',
+    'RelatedAttributeDescriptorTests',
+    'RelatedAttributeManagerTests',
+    'SharedAttributeCacheTests',
+    'TypedAttributeTests',
+    'UpdateAttributeTests',
+    'UpdateAttributeTransactionTests',
+    'UpgradeAttributeColumnsTests',
+    'UpgradeAttributeIndexesTests',
+    'ValuesWithAttributesTests',
+]
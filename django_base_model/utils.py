@@ -0,0 +1,287 @@
+import threading
+from contextlib import contextmanager
+
+from django.core.signals import request_finished
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models.sql.subqueries import DeleteQuery
+from django.utils.datastructures import SortedDict
+
+_local = threading.local()
+
+
+def get_commit_callbacks(using=None):
+    """
+    Retrieves the list of callbacks of the current thread waiting for the
+    transaction of the given database to commit.
+    """
+
+    if not hasattr(_local, 'commit_callbacks'):
+        _local.commit_callbacks = {}
+
+    return _local.commit_callbacks.setdefault(using or DEFAULT_DB_ALIAS, [])
+
+
+def run_on_commit(callback, using=None):
+    """
+    Calls the given callback once the transaction of the given database has
+    been committed, or right away if transaction management isn't active.
+
+    Callbacks are run when a transaction started by managed_transaction is
+    committed, and when a request finishes (i.e., after TransactionMiddleware
+    has committed).  Code that commits a transaction it manages itself
+    should call run_commit_callbacks afterwards.
+
+    Keyword arguments:
+    callback -- a callable taking no arguments.
+    using -- the database alias of the transaction.
+    """
+
+    if transaction.is_managed(using=using):
+        get_commit_callbacks(using).append(callback)
+    else:
+        callback()
+
+
+def run_commit_callbacks(using=None):
+    """
+    Runs the callbacks of the current thread waiting for the transaction of
+    the given database to commit.
+    """
+
+    callbacks = get_commit_callbacks(using)
+
+    while callbacks:
+        callbacks.pop(0)()
+
+
+def run_all_commit_callbacks(**kwargs):
+    """
+    Runs the callbacks of the current thread waiting for the transaction of
+    any database to commit.  This is connected to the request_finished
+    signal.
+    """
+
+    for using in list(getattr(_local, 'commit_callbacks', {}).keys()):
+        run_commit_callbacks(using)
+
+
+request_finished.connect(run_all_commit_callbacks)
+
+
+@contextmanager
+def managed_transaction(using=None):
+    """
+    Runs the enclosed block in a single transaction on the given database.
+
+    If transaction management is already active (e.g., inside of a view
+    decorated with commit_on_success), the block simply joins the existing
+    transaction and leaves committing to it, the same way QuerySet.bulk_create
+    behaves.
+
+    Callbacks registered with run_on_commit within the block are run once
+    the transaction it started has ended.
+
+    Keyword arguments:
+    using -- the database alias the transaction should be run against.
+    """
+
+    if transaction.is_managed(using=using):
+        yield
+        return
+
+    transaction.enter_transaction_management(using=using)
+    transaction.managed(True, using=using)
+
+    try:
+        yield
+    except:
+        transaction.rollback(using=using)
+        raise
+    else:
+        transaction.commit(using=using)
+    finally:
+        transaction.leave_transaction_management(using=using)
+        run_commit_callbacks(using)
+
+
+def raw_delete(query_set):
+    """
+    Deletes the rows matched by the given QuerySet with a single DELETE
+    statement.  Unlike QuerySet.delete, the rows are not fetched first,
+    related objects are not collected and no pre/post delete signals are
+    sent, so the QuerySet may only filter on fields of its own table.
+
+    Returns the number of deleted rows.
+
+    Keyword arguments:
+    query_set -- the QuerySet whose rows should be deleted.
+    """
+
+    query = DeleteQuery(query_set.model)
+    query.tables = [query_set.model._meta.db_table]
+    query.where = query_set.query.where
+    db = query_set.db
+
+    with managed_transaction(using=db):
+        cursor = query.get_compiler(db).execute_sql(None)
+        transaction.set_dirty(using=db)
+
+    if cursor is None:
+        return 0
+
+    return cursor.rowcount
+
+
+def get_case_placeholder(field, connection):
+    """
+    Builds the placeholder for the value of the given field in a branch of a
+    CASE expression.  PostgreSQL can't infer the type of a parameter in one,
+    so the value is cast to the type of the field's column; other databases
+    convert it on assignment, and MySQL rejects most column types as a cast
+    target, so the placeholder is left as it is.
+
+    Keyword arguments:
+    field -- the field whose column is assigned the CASE expression.
+    connection -- the database connection the statement is built for.
+    """
+
+    if connection.vendor == 'postgresql':
+        return 'CAST(%%s AS %s)' % field.db_type(connection=connection)
+
+    return '%s'
+
+
+def get_field_tables(fields, common_fields=()):
+    """
+    Groups the fields being updated by the table they are stored in, which
+    for a field inherited through multi-table inheritance is the table of
+    the parent model that defines it.  Returns a SortedDict mapping the
+    options of each table's model to a tuple of its fields and its
+    (field, value) pairs from common_fields.
+
+    The rows of every table share the primary key values of the rows of the
+    child model, which are also those of their parent rows.
+    """
+
+    tables = SortedDict()
+
+    for field in fields:
+        tables.setdefault(field.model._meta, ([], []))[0].append(field)
+
+    for field, value in common_fields:
+        tables.setdefault(field.model._meta, ([], []))[1].append(
+            (field, value)
+        )
+
+    return tables
+
+
+def bulk_update_rows(model, values, using, batch_size, common_values=None):
+    """
+    Changes the fields of many rows of a model at once, issuing a single
+    UPDATE statement with a CASE expression per field and batch of rows
+    rather than one statement per row.  As with QuerySet.update, save() is
+    not called and no pre/post save signals are sent.
+
+    Rows are batched together with others whose same fields are being
+    changed, batch_size at a time when a single field is changed and
+    proportionally fewer when more fields are, which keeps the number of
+    parameters of each statement about the same.  Fields inherited through
+    multi-table inheritance are updated in the table of the parent model
+    that defines them, with a statement per table.
+
+    Returns the number of updated rows.
+
+    Keyword arguments:
+    model -- the model of the rows.
+    values -- a dictionary mapping primary keys to dictionaries of field names
+              and their new values.
+    using -- the database alias to update the rows in.
+    batch_size -- the number of rows to update per statement when a single
+                  field is changed.
+    common_values -- a dictionary of field names and the new values given to
+                     them in every row, which are set in the same statements
+                     without a CASE expression.
+    """
+
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    opts = model._meta
+    common_fields = [
+        (opts.get_field(name), value)
+        for name, value in (common_values or {}).items()
+    ]
+    groups = {}
+    count = 0
+
+    for pk, field_values in values.items():
+        groups.setdefault(tuple(sorted(field_values.keys())), []).append(
+            (pk, field_values)
+        )
+
+    with managed_transaction(using=using):
+        cursor = connection.cursor()
+
+        for field_names, items in groups.items():
+            fields = [opts.get_field(name) for name in field_names]
+            fields_batch_size = max(
+                1,
+                batch_size * 3 // (2 * len(fields) + 1)
+            )
+            tables = get_field_tables(fields, common_fields)
+
+            for start in range(0, len(items), fields_batch_size):
+                batch = items[start:start + fields_batch_size]
+                rowcount = 0
+
+                for table_opts, (table_fields, table_common_fields) in (
+                    tables.items()
+                ):
+                    assignments = []
+                    params = []
+
+                    for field in table_fields:
+                        branch = 'WHEN %%s THEN %s' % get_case_placeholder(
+                            field,
+                            connection
+                        )
+                        assignments.append(
+                            '%s = CASE %s %s END' % (
+                                qn(field.column),
+                                qn(table_opts.pk.column),
+                                ' '.join([branch] * len(batch))
+                            )
+                        )
+
+                        for pk, field_values in batch:
+                            params.extend([
+                                pk,
+                                field.get_db_prep_save(
+                                    field_values[field.name],
+                                    connection=connection
+                                )
+                            ])
+
+                    for field, value in table_common_fields:
+                        assignments.append('%s = %%s' % qn(field.column))
+                        params.append(
+                            field.get_db_prep_save(value, connection=connection)
+                        )
+
+                    params.extend([pk for pk, field_values in batch])
+                    cursor.execute(
+                        'UPDATE %s SET %s WHERE %s IN (%s)' % (
+                            qn(table_opts.db_table),
+                            ', '.join(assignments),
+                            qn(table_opts.pk.column),
+                            ', '.join(['%s'] * len(batch))
+                        ),
+                        params
+                    )
+                    rowcount = max(rowcount, cursor.rowcount)
+
+                count += rowcount
+
+        transaction.set_dirty(using=using)
+
+    return count
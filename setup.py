@@ -18,6 +18,8 @@ setup(
     long_description=open('README', 'r').read(),
     packages=[
         'django_base_model',
+        'django_base_model.management',
+        'django_base_model.management.commands',
     ],
     package_data={
     },
@@ -25,6 +27,8 @@ setup(
     requires=[
     ],
     install_requires=[
+        'Django>=1.4.2',
+        'futures>=2.1.3',
     ],
     classifiers=[
         'Development Status :: Pre Alpha',